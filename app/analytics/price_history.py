@@ -0,0 +1,201 @@
+"""
+Vectorized analytics over the stored price history.
+
+The history of a category is loaded with a single query into parallel NumPy arrays
+(part id, date ordinal, price in cents), sorted by part and date. Every metric is
+then computed for all parts at once with grouped array operations, instead of
+building one Python object per price row.
+
+A price row holds from the day it was first seen until the next row of the same
+part, so history recorded with change-only recording is read correctly.
+"""
+
+import sqlite3
+from datetime import date
+from typing import Optional
+import numpy as np
+from app.config import FETCH_CHUNK_SIZE
+
+EPOCH = date(1970, 1, 1).toordinal()
+
+
+class PriceHistory():
+    """The price history of one category as columnar arrays.
+
+    === Attributes ===
+    part_type: the category of the history (e.g. "gpu")
+    part_ids: the part id of every price row
+    days: the date ordinal (see date.toordinal) each price was first seen
+    cents: the price of every row in cents
+    starts: the index of the first row of every part
+    parts: the part id of every part, in the order of <starts>
+
+    === Representation Invariants ===
+    - rows are sorted by part id, then by day
+    - part_ids, days, and cents have the same length
+    """
+    part_type: str
+    part_ids: np.ndarray
+    days: np.ndarray
+    cents: np.ndarray
+    starts: np.ndarray
+    parts: np.ndarray
+
+    def __init__(self, part_type: str, part_ids: np.ndarray, days: np.ndarray, cents: np.ndarray) -> None:
+        """Initialize a new PriceHistory from rows sorted by part id, then by day."""
+        self.part_type = part_type
+        self.part_ids = part_ids
+        self.days = days
+        self.cents = cents
+
+        boundaries = np.ones(len(part_ids), dtype=bool)
+        boundaries[1:] = part_ids[1:] != part_ids[:-1]
+        self.starts = np.flatnonzero(boundaries)
+        self.parts = part_ids[self.starts]
+
+    @classmethod
+    def load(cls, connection: sqlite3.Connection, part_type: str,
+             chunk_size: int=FETCH_CHUNK_SIZE * 100) -> "PriceHistory":
+        """Return the priced history of '<part_type>s' in <connection>, read with one query."""
+        query = f"""
+        SELECT {part_type}_id, price_date, price_cents
+        FROM {part_type}_prices
+        WHERE price_cents IS NOT NULL AND {part_type}_id IS NOT NULL
+        ORDER BY {part_type}_id, price_date, id
+        """
+        part_ids, days, cents = [], [], []
+        cursor = connection.execute(query)
+        while rows := cursor.fetchmany(chunk_size):
+            ids, dates, prices = zip(*rows)
+            part_ids.append(np.array(ids, dtype=np.int64))
+            # YYYY-MM-DD dates parse to days since 1970-01-01
+            days.append(np.array(dates, dtype="datetime64[D]").astype(np.int64) + EPOCH)
+            cents.append(np.array(prices, dtype=np.int64))
+
+        if not part_ids:
+            return cls(part_type, *(np.empty(0, dtype=np.int64) for _ in range(3)))
+        return cls(part_type, np.concatenate(part_ids), np.concatenate(days), np.concatenate(cents))
+
+    def __len__(self) -> int:
+        """Return the number of price rows in this history."""
+        return len(self.part_ids)
+
+    def group_index(self) -> np.ndarray:
+        """Return, for every row, the position of its part in <parts>."""
+        return np.repeat(np.arange(len(self.starts)), np.diff(np.append(self.starts, len(self))))
+
+    def price_on(self, day: int) -> np.ndarray:
+        """Return the price in cents of every part on the date ordinal <day>, or -1 where
+        the part had not been priced yet.
+        """
+        # last row at or before <day> within each part's sorted block of rows
+        key = self.part_ids * (1 << 24) + self.days
+        index = np.searchsorted(key, self.parts * (1 << 24) + day, side="right") - 1
+
+        prices = np.full(len(self.parts), -1, dtype=np.int64)
+        priced = index >= self.starts
+        prices[priced] = self.cents[index[priced]]
+        return prices
+
+
+class PriceTrends():
+    """Per-part price metrics over a trailing window.
+
+    === Attributes ===
+    part_ids: the id of every part with a price on the last day of the window
+    latest_cents: the price of every part on the last day of the window
+    start_cents: the price of every part on the first day of the window, or its first price if
+                 it was first listed during the window
+    change_pct: the percentage change from <start_cents> to <latest_cents>
+    drop_from_high_pct: the percentage below its highest price ever that every part is now
+    average_cents: the time-weighted average price of every part over the window
+    volatility: the standard deviation of the log price changes of every part in the window
+    """
+    part_ids: np.ndarray
+    latest_cents: np.ndarray
+    start_cents: np.ndarray
+    change_pct: np.ndarray
+    drop_from_high_pct: np.ndarray
+    average_cents: np.ndarray
+    volatility: np.ndarray
+
+    def __init__(self, **columns: np.ndarray) -> None:
+        """Initialize a new PriceTrends from its columns."""
+        for name, column in columns.items():
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        """Return the number of parts in these trends."""
+        return len(self.part_ids)
+
+    def biggest_movers(self, count: int=10) -> np.ndarray:
+        """Return the positions of the <count> parts whose price changed the most (in either direction)
+        over the window, largest change first.
+        """
+        magnitude = np.nan_to_num(np.abs(self.change_pct), nan=-1)
+        order = np.argsort(-magnitude, kind="stable")[:count]
+        return order[magnitude[order] > 0]
+
+
+def compute_trends(history: PriceHistory, days: int=30, today: Optional[int]=None) -> PriceTrends:
+    """Return the price trends of every part of <history> over the <days> days ending on the
+    date ordinal <today> (the current date by default).
+    """
+    today = today if today is not None else date.today().toordinal()
+    window_start = today - days
+    groups = history.group_index()
+
+    latest = history.price_on(today)
+    start = history.price_on(window_start)
+    # parts first listed during the window change from their first price
+    listed = (start < 0) & (history.days[history.starts] <= today)
+    start[listed] = history.cents[history.starts[listed]]
+
+    # the highest price of every part up to today
+    current = history.days <= today
+    high = np.zeros(len(history.parts), dtype=np.int64)
+    np.maximum.at(high, groups[current], history.cents[current])
+
+    # every row holds until the next row of the same part (or until the end of the window)
+    next_days = np.append(history.days[1:], today + 1)
+    last_rows = np.append(history.starts[1:], len(history)) - 1
+    next_days[last_rows] = today + 1
+    held = np.clip(np.minimum(next_days, today + 1) - np.maximum(history.days, window_start), 0, None)
+
+    held_days = np.bincount(groups, weights=held, minlength=len(history.parts))
+    weighted = np.bincount(groups, weights=held * history.cents, minlength=len(history.parts))
+
+    # log returns between consecutive price changes of the same part within the window
+    same_part = np.zeros(len(history), dtype=bool)
+    same_part[1:] = history.part_ids[1:] == history.part_ids[:-1]
+    in_window = same_part & (history.days > window_start) & current
+    returns = np.zeros(len(history))
+    returns[1:] = np.diff(np.log(np.maximum(history.cents, 1)))
+    returns = np.where(in_window, returns, 0.0)
+
+    moves = np.bincount(groups, weights=in_window, minlength=len(history.parts))
+    mean = np.divide(np.bincount(groups, weights=returns, minlength=len(history.parts)), moves,
+                     out=np.zeros(len(history.parts)), where=moves > 0)
+    squares = np.divide(np.bincount(groups, weights=returns ** 2, minlength=len(history.parts)), moves,
+                        out=np.zeros(len(history.parts)), where=moves > 0)
+    volatility = np.sqrt(np.maximum(squares - mean ** 2, 0))
+
+    priced = latest >= 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(start > 0, (latest - start) / start * 100, np.nan)
+        drop = np.where(high > 0, (high - latest) / high * 100, np.nan)
+        average = np.where(held_days > 0, weighted / held_days, np.nan)
+
+    return PriceTrends(part_ids=history.parts[priced], latest_cents=latest[priced], start_cents=start[priced],
+                       change_pct=change[priced], drop_from_high_pct=drop[priced],
+                       average_cents=average[priced], volatility=volatility[priced])
+
+
+def part_names(connection: sqlite3.Connection, part_type: str, part_ids: np.ndarray) -> dict[int, str]:
+    """Return a mapping from id to name of the '<part_type>s' parts in <part_ids>."""
+    ids = [int(part_id) for part_id in part_ids]
+    if not ids:
+        return {}
+
+    query = f"SELECT id, name FROM {part_type}s WHERE id IN ({', '.join('?' * len(ids))})"
+    return dict(connection.execute(query, ids).fetchall())
@@ -0,0 +1,97 @@
+"""
+Non-interactive, machine-readable access to the local database.
+
+The query command writes the latest price of every matching part, and the export
+command the full matching price history, as JSON Lines or CSV to stdout or a file.
+Rows are streamed from the SQLite cursor to the output in chunks, so memory use
+stays constant however large the database is.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from typing import Iterator, TextIO
+import app.database.database as database
+import app.database.migrations as migrations
+from app.config import DB_PATH, FETCH_CHUNK_SIZE
+from app.database.connection import reader, writer
+from app.utils.parsing import price_to_cents
+
+
+FORMATS = ["jsonl", "csv"]
+
+# the rows and columns written by each command
+COMMANDS = {
+    "query": (database.iter_current_prices, database.CURRENT_COLUMNS),
+    "export": (database.iter_price_history, database.HISTORY_COLUMNS),
+}
+
+
+def write_rows(rows: Iterator[tuple], columns: tuple[str, ...], output: TextIO, output_format: str,
+               header: bool=True, chunk_size: int=FETCH_CHUNK_SIZE) -> int:
+    """Write every row of <rows> to <output> as JSON Lines or CSV, <chunk_size> rows at a time,
+    and return the number of rows written. A CSV <header> row of <columns> is written first if True.
+    """
+    written = 0
+    if output_format == "csv":
+        csv_writer = csv.writer(output)
+        if header:
+            csv_writer.writerow(columns)
+        while chunk := list(islice(rows, chunk_size)):
+            csv_writer.writerows(chunk)
+            written += len(chunk)
+    else:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        while chunk := list(islice(rows, chunk_size)):
+            output.write("".join([encode(dict(zip(columns, row))) + "\n" for row in chunk]))
+            written += len(chunk)
+    return written
+
+
+def stream(command: str, part_types: list[str], output: TextIO, output_format: str, **filters: object) -> int:
+    """Write the rows of <command> matching <filters> for every category in <part_types> to <output>,
+    and return the number of rows written.
+    """
+    iter_rows, columns = COMMANDS[command]
+    written = 0
+    with reader(DB_PATH) as connection:
+        for i, part_type in enumerate(part_types):
+            written += write_rows(iter_rows(connection, part_type, **filters), columns, output, output_format,
+                                  header=i == 0)
+    return written
+
+
+def run(command: str, args: argparse.Namespace) -> int:
+    """Run the query or export <command> with the parsed command-line <args>, and return
+    the exit status of the program.
+    """
+    filters = {"name": args.name, "brand": args.brand, "since": args.since, "until": args.until}
+    for bound, text in (("min_cents", args.min_price), ("max_cents", args.max_price)):
+        filters[bound] = price_to_cents(text) if text else None
+        if text and filters[bound] is None:
+            print(f"Error: invalid price {text!r}.", file=sys.stderr)
+            return 2
+
+    try:
+        with writer(DB_PATH) as connection:
+            migrations.migrate(connection)
+
+        if not args.output:
+            stream(command, args.category or migrations.PART_TYPES, sys.stdout, args.format, **filters)
+            sys.stdout.flush()
+            return 0
+
+        with open(args.output, "w", newline="", encoding="utf-8") as output:
+            written = stream(command, args.category or migrations.PART_TYPES, output, args.format, **filters)
+        print(f"wrote {written} rows to {args.output}.", file=sys.stderr)
+        return 0
+    except BrokenPipeError:
+        # the reader of stdout stopped early (e.g. piped into head), which is not an error
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
@@ -7,16 +7,58 @@ This module is designed for user-facing terminal interaction.
 """
 
 import app.database.database as database
-from app.config import DB_PATH
+import app.database.migrations as migrations
+from app.config import DB_PATH, FETCH_PAGE_SIZE
+from app.database.connection import reader, writer
+from app.database.query_cache import QueryCache
+
+
+def display_pages(queries: QueryCache, part_type: str, name_condition: str=None) -> None:
+    """Print the '<part_type>s' price entries matching <name_condition> one page at a time."""
+    parts, after = queries.call(database.fetch_parts_page, part_type, name_condition, FETCH_PAGE_SIZE, None)
+    if not parts:
+        print("No results found.")
+        return
+
+    while True:
+        for part in parts:
+            print(part)
+
+        if after is None or input("-- Press Enter for more, or q to stop -- ").strip().lower() == "q":
+            return
+        parts, after = queries.call(database.fetch_parts_page, part_type, name_condition, FETCH_PAGE_SIZE, after)
+
+
+def display_summaries(queries: QueryCache, part_type: str, name_condition: str=None) -> None:
+    """Print the price summary of every '<part_type>s' part matching <name_condition>."""
+    summaries = queries.call(database.fetch_price_summaries, part_type, name_condition)
+    if not summaries:
+        print("No results found.")
+
+    for summary in summaries:
+        print(summary)
 
 
 def run_ui() -> None:
-    """User interaction with the database."""
-    connection = database.get_connection(DB_PATH)
+    """User interaction with the database.
 
-    if not database.ensure_tables(connection):
-        return
+    The menus read through a read-only connection, so they are not blocked by an update
+    writing to the database at the same time.
+    """
+    with writer(DB_PATH) as connection:
+        if not database.ensure_tables(connection):
+            return
+        migrations.migrate(connection)
+
+    with reader(DB_PATH) as connection:
+        main_menu(QueryCache(connection))
+
+
+def main_menu(queries: QueryCache) -> None:
+    """Show the menus of the terminal UI, reading the parts through <queries>.
 
+    Repeated pages and searches are answered from <queries> until the database changes.
+    """
     print("\n==== PC Part Tracker ====")
     while True:
         print("1. View CPUs")
@@ -30,19 +72,19 @@ def run_ui() -> None:
                 print("\n==== CPUs ====")
                 print("1. Display all CPUs")
                 print("2. Search for a CPU by name")
-                print("3. Back")
+                print("3. Current, lowest, and highest CPU prices")
+                print("4. Back")
                 choice = input("Enter choice: ")
 
                 if choice == "1":
-                    cpus = database.fetch_cpus(connection)
-                    for cpu in cpus:
-                        print(cpu)
+                    display_pages(queries, "cpu")
                 elif choice == "2":
                     name = input("Enter CPU name: ").strip()
-                    cpus = database.fetch_cpus(connection, name)
-                    for cpu in cpus:
-                        print(cpu)
+                    display_pages(queries, "cpu", name)
                 elif choice == "3":
+                    name = input("Enter CPU name (blank for all): ").strip()
+                    display_summaries(queries, "cpu", name)
+                elif choice == "4":
                     break
                 else:
                     print("Invalid option.")
@@ -51,19 +93,19 @@ def run_ui() -> None:
                 print("\n==== GPUs ====")
                 print("1. Display all GPUs")
                 print("2. Search for a GPU by name")
-                print("3. Back")
+                print("3. Current, lowest, and highest GPU prices")
+                print("4. Back")
                 choice = input("Enter choice: ")
 
                 if choice == "1":
-                    gpus = database.fetch_gpus(connection)
-                    for gpu in gpus:
-                        print(gpu)
+                    display_pages(queries, "gpu")
                 elif choice == "2":
                     name = input("Enter GPU name: ").strip()
-                    gpus = database.fetch_gpus(connection, name)
-                    for gpu in gpus:
-                        print(gpu)
+                    display_pages(queries, "gpu", name)
                 elif choice == "3":
+                    name = input("Enter GPU name (blank for all): ").strip()
+                    display_summaries(queries, "gpu", name)
+                elif choice == "4":
                     break
                 else:
                     print("Invalid option.")
@@ -72,19 +114,19 @@ def run_ui() -> None:
                 print("\n==== Motherboards ====")
                 print("1. Display all motherboards")
                 print("2. Search for a motherboard by name")
-                print("3. Back")
+                print("3. Current, lowest, and highest motherboard prices")
+                print("4. Back")
                 choice = input("Enter choice: ")
 
                 if choice == "1":
-                    mobos = database.fetch_mobos(connection)
-                    for mobo in mobos:
-                        print(mobo)
+                    display_pages(queries, "mobo")
                 elif choice == "2":
                     name = input("Enter motherboard name: ").strip()
-                    mobos = database.fetch_mobos(connection, name)
-                    for mobo in mobos:
-                        print(mobo)
+                    display_pages(queries, "mobo", name)
                 elif choice == "3":
+                    name = input("Enter motherboard name (blank for all): ").strip()
+                    display_summaries(queries, "mobo", name)
+                elif choice == "4":
                     break
                 else:
                     print("Invalid option.")
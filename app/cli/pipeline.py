@@ -0,0 +1,209 @@
+"""
+Staged fetch -> parse -> store pipeline used to update the database.
+
+Listing pages are fetched by one stage, parsed into PartBatch objects by a second
+(optionally spread over a pool of worker processes), and written to the database
+by the caller's thread as soon as they arrive. Stages are connected by bounded
+queues, so they overlap, memory stays bounded, and an update takes roughly as
+long as its slowest stage instead of the sum of all stages. Every stage records its
+latency and throughput in the shared metrics.
+"""
+
+import functools
+import multiprocessing
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Collection, Optional
+import app.database.checkpoints as checkpoints
+import app.database.crawl_history as crawl_history
+import app.database.database as database
+import app.scraper.scraper as scraper
+from app.config import PIPELINE_QUEUE_SIZE, PARSE_WORKERS
+from app.models.part_batch import PartBatch
+from app.scraper.categories import Category, CATEGORIES
+from app.utils.metrics import get_metrics
+from app.utils.parsing import TitleInfo
+
+
+_DONE = object() # marks the end of a stage's output
+
+
+def _put(stage_queue: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """Put <item> on <stage_queue>, waiting for room unless the pipeline is stopped.
+
+    Return whether the item was put.
+    """
+    while True:
+        try:
+            stage_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                return False
+
+
+def _is_ready(future: Optional[Future]) -> bool:
+    """Return whether the parse of a pending page is finished (or was never needed)."""
+    return future is None or future.done()
+
+
+def _timed_parse(text: str, extract_info: Callable[[str], Optional[TitleInfo]]) -> tuple[list, list, float]:
+    """Return the result of scraper.parse_page_text on <text> and <extract_info>, and the seconds it took.
+
+    Runs in worker processes, whose metrics are not shared with this process.
+    """
+    start = time.perf_counter()
+    items, infos = scraper.parse_page_text(text, extract_info)
+    return items, infos, time.perf_counter() - start
+
+
+def _finish_parse(category: Category, page: scraper.Page, future: Optional[Future]) -> tuple[Category, str, PartBatch]:
+    """Return <category>, the url of <page>, and the listings on <page>, parsed by <future> or
+    from the cached items if None.
+    """
+    if future is None:
+        return category, page.url, scraper.parse_category_page(category, page)
+
+    items, infos, elapsed = future.result()
+    get_metrics().observe("parse_seconds", elapsed, category=category.name)
+    return category, page.url, scraper.build_category_batch(category, page, items, infos)
+
+
+def _record_page(connection: sqlite3.Connection, run_id: Optional[int], category: Category, url: str,
+                 batch: PartBatch) -> None:
+    """Record the fetch of the page at <url> listing <batch> in the crawl history, and as stored
+    by the update run <run_id> if given. Does not commit.
+    """
+    crawl_history.record_fetch(connection, category.name, url, batch)
+    if run_id is not None:
+        checkpoints.record_page(connection, run_id, category.name, url, len(batch))
+
+
+def run_pipeline(connection: sqlite3.Connection, categories: Optional[list[Category]]=None,
+                 queue_size: int=PIPELINE_QUEUE_SIZE, parse_workers: int=PARSE_WORKERS,
+                 run_id: Optional[int]=None, skip: Collection[str]=()) -> dict[str, int]:
+    """Scrape every category in <categories> (all registered categories by default) and
+    stream their listings into <connection>. Return the number of listings stored per category.
+
+    Pages are parsed in this process, or by <parse_workers> worker processes when more
+    than one. Every page is committed as soon as it is parsed. If a stage fails, the pipeline
+    stops and the error is raised once everything already parsed has been stored. If storing a
+    page fails, the pipeline stops and the error is raised.
+
+    Every page is recorded in the crawl history in the transaction of its listings. With a
+    <run_id>, it is also recorded as stored by that update run, and pages the run already stored
+    are not fetched again. Pages whose url is in <skip> are not fetched either, except for the
+    first page of each listing, which gives the page count.
+    """
+    categories = categories or list(CATEGORIES.values())
+    stored = checkpoints.get_stored_pages(connection, run_id) if run_id is not None else set()
+    stored |= set(skip)
+    pages = queue.Queue(maxsize=queue_size)
+    batches = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    metrics = get_metrics()
+
+    def fetch_stage() -> None:
+        try:
+            for category in categories:
+                for page in scraper.iter_category_pages(category, skip=stored):
+                    if stop.is_set(): # closing the page iterator cancels the pending fetches
+                        return
+                    metrics.inc("pages_fetched_total", category=category.name)
+                    if not _put(pages, (category, page), stop):
+                        return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(pages, _DONE, stop)
+
+    def parse_stage() -> None:
+        try:
+            if parse_workers > 1:
+                _parse_in_processes()
+            else:
+                while (item := pages.get()) is not _DONE and not stop.is_set():
+                    category, page = item
+                    if not _put(batches, (category, page.url, scraper.parse_category_page(category, page)), stop):
+                        return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            _put(batches, _DONE, stop)
+
+    def _parse_in_processes() -> None:
+        # raw page bodies are parsed by worker processes, at most twice as many at once as there are
+        # workers; results are collected in page order
+        context = multiprocessing.get_context("spawn") # forking a threaded process is unsafe
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=context) as pool:
+            pending = deque()
+            try:
+                while (item := pages.get()) is not _DONE and not stop.is_set():
+                    category, page = item
+                    if page.items is not None: # unchanged page, nothing to parse
+                        pending.append((category, page, None))
+                    else:
+                        pending.append((category, page, pool.submit(_timed_parse, page.text, category.extract_info)))
+
+                    while len(pending) > parse_workers * 2 or (pending and _is_ready(pending[0][2])):
+                        if not _put(batches, _finish_parse(*pending.popleft()), stop):
+                            return
+
+                while pending:
+                    if not _put(batches, _finish_parse(*pending.popleft()), stop):
+                        return
+            finally:
+                for _, _, future in pending:
+                    if future:
+                        future.cancel()
+
+    fetcher = threading.Thread(target=fetch_stage, name="fetch", daemon=True)
+    parser = threading.Thread(target=parse_stage, name="parse", daemon=True)
+    fetcher.start()
+    parser.start()
+
+    counts = {category.name: 0 for category in categories}
+    if run_id is not None:
+        previous = checkpoints.get_stored_counts(connection, run_id)
+        counts = {name: previous.get(name, 0) for name in counts}
+    try:
+        while True:
+            try:
+                item = batches.get(timeout=0.1)
+            except queue.Empty:
+                if not parser.is_alive() and batches.empty():
+                    break
+                continue
+
+            if item is _DONE:
+                break
+
+            category, url, batch = item
+            checkpoint = functools.partial(_record_page, run_id=run_id, category=category, url=url, batch=batch)
+            try:
+                with metrics.timer("db_write_seconds", category=category.name):
+                    inserted = database.insert_parts(connection, batch, checkpoint=checkpoint)
+            except Exception as e: # the page is not recorded as stored, so a resumed run fetches it again
+                errors.append(e)
+                break
+            metrics.inc("rows_inserted_total", inserted, category=category.name)
+            counts[category.name] += inserted
+    finally:
+        stop.set() # also stops the stages if storing fails or is interrupted
+    fetcher.join()
+    parser.join()
+
+    for category in categories:
+        print(f"found {counts[category.name]} {category.label}.") # indicate how many parts were stored
+
+    if errors:
+        raise errors[0]
+
+    return counts
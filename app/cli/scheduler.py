@@ -0,0 +1,142 @@
+"""
+Adaptive scheduling of the listing pages fetched by database updates.
+
+Rather than fetching every listing page on every update, an update can spend a
+request budget on the pages most likely to have changed since they were last
+fetched. The changes of a page are modeled as a Poisson process: a page changing
+<rate> times a day that was fetched <age> days ago has changed with probability
+1 - exp(-rate * age).
+
+The rate of a page is estimated from its crawl history (see crawl_history.py),
+shrunk towards the rate of its category, so a page watched only briefly behaves
+like the rest of its category. The rate of a category is in turn estimated from
+the crawl history of all its pages, shrunk towards the rate implied by the price
+history of its parts.
+
+Pages not fetched for CRAWL_MAX_STALENESS days are always fetched, even beyond the
+budget, so no page is ever staler than that, and so is the first page of every
+listing, which gives the page count. Pages never fetched before are not part of the
+plan and are always fetched.
+"""
+
+import math
+import sqlite3
+from datetime import datetime
+from typing import Collection, Optional
+import app.database.crawl_history as crawl_history
+from app.config import CRAWL_MAX_STALENESS
+from app.database.crawl_history import PageHistory
+from app.scraper.categories import Category, CATEGORIES
+
+
+PRIOR_DAYS = 7.0 # days of watching a page that the rate of its category is worth in its estimate
+DEFAULT_RATE = 1.0 # changes per day assumed of a page in a category without any history
+
+
+class CrawlPlan():
+    """The known listing pages an update fetches.
+
+    === Attributes ===
+    selected: the urls of the pages to fetch, the overdue ones first, then the most likely changed
+    skipped: the urls of the pages not fetched
+    overdue: the number of selected pages that are fetched regardless of the budget
+    expected_changes: the expected number of selected pages that changed since they were last fetched
+    total_expected_changes: the expected number of pages that changed since they were last fetched
+    """
+    selected: list[str]
+    skipped: list[str]
+    overdue: int
+    expected_changes: float
+    total_expected_changes: float
+
+    def __init__(self, selected: list[str], skipped: list[str], overdue: int, expected_changes: float,
+                 total_expected_changes: float) -> None:
+        """Initialize a new CrawlPlan."""
+        self.selected = selected
+        self.skipped = skipped
+        self.overdue = overdue
+        self.expected_changes = expected_changes
+        self.total_expected_changes = total_expected_changes
+
+    def __str__(self) -> str:
+        """Return a summary of this plan."""
+        known = len(self.selected) + len(self.skipped)
+        found = self.expected_changes / self.total_expected_changes if self.total_expected_changes else 1
+        return (f"fetching {len(self.selected)} of {known} known pages ({self.overdue} due regardless of the budget), "
+                f"expected to find {self.expected_changes:.1f} of {self.total_expected_changes:.1f} "
+                f"changed pages ({found:.0%})")
+
+
+def change_probability(rate: float, age: float) -> float:
+    """Return the probability that a page changing <rate> times a day changed in <age> days."""
+    return 1 - math.exp(-rate * age)
+
+
+def estimate_rates(history: dict[str, PageHistory], priors: Optional[dict[str, float]]=None) -> dict[str, float]:
+    """Return a mapping from url to the estimated changes per day of every page in <history>.
+
+    The rate of a category is the changes per day watched over all its pages, shrunk towards
+    <priors>[category] (DEFAULT_RATE if missing), and the rate of a page is its own changes
+    per day watched, shrunk towards the rate of its category.
+    """
+    priors = priors or {}
+    totals = {}
+    for page in history.values():
+        changes, days = totals.get(page.category, (0, 0.0))
+        totals[page.category] = (changes + page.changes, days + page.observed_days)
+
+    category_rates = {category: (changes + PRIOR_DAYS * priors.get(category, DEFAULT_RATE)) / (days + PRIOR_DAYS)
+                      for category, (changes, days) in totals.items()}
+    return {url: (page.changes + PRIOR_DAYS * category_rates[page.category]) / (page.observed_days + PRIOR_DAYS)
+            for url, page in history.items()}
+
+
+def plan_crawl(history: dict[str, PageHistory], rates: dict[str, float], budget: Optional[int],
+               max_staleness: float=CRAWL_MAX_STALENESS, now: Optional[datetime]=None,
+               always: Collection[str]=()) -> CrawlPlan:
+    """Return the plan fetching, of the pages in <history> changing at <rates>, those most likely
+    to have changed by <now>, up to <budget> pages (every page if None).
+
+    The pages in <always> and the pages not fetched for <max_staleness> days are selected first,
+    even if there are more of them than <budget>.
+    """
+    now = now or datetime.now()
+    overdue, candidates = [], []
+    for url, page in history.items():
+        age = (now - page.last_fetched).total_seconds() / 86400
+        probability = change_probability(rates[url], age)
+        if url in always or age >= max_staleness:
+            overdue.append((age, probability, url))
+        else:
+            candidates.append((probability, url))
+
+    overdue.sort(reverse=True)
+    candidates.sort(reverse=True)
+    room = len(candidates) if budget is None else max(0, budget - len(overdue))
+
+    return CrawlPlan(selected=[url for _, _, url in overdue] + [url for _, url in candidates[:room]],
+                     skipped=[url for _, url in candidates[room:]],
+                     overdue=len(overdue),
+                     expected_changes=sum(p for _, p, _ in overdue) + sum(p for p, _ in candidates[:room]),
+                     total_expected_changes=sum(p for _, p, _ in overdue) + sum(p for p, _ in candidates))
+
+
+def plan_update(connection: sqlite3.Connection, budget: int, categories: Optional[list[Category]]=None,
+                max_staleness: float=CRAWL_MAX_STALENESS, now: Optional[datetime]=None) -> CrawlPlan:
+    """Return the plan of an update of <categories> (all registered categories by default) fetching
+    about <budget> pages, from the crawl and price history in <connection>.
+    """
+    categories = categories or list(CATEGORIES.values())
+    names = {category.name for category in categories}
+    history = {url: page for url, page in crawl_history.get_page_history(connection).items() if page.category in names}
+
+    # a page listing n parts that each change price r times a day changes about n * r times a day
+    priors = {}
+    for name in names:
+        listings = [page.listings for page in history.values() if page.category == name]
+        part_rate = crawl_history.get_price_change_rate(connection, name) if listings else None
+        if part_rate is not None:
+            priors[name] = part_rate * sum(listings) / len(listings)
+
+    first_pages = {url.format(page=1) for category in categories for url in category.listing_urls}
+    return plan_crawl(history, estimate_rates(history, priors), budget, max_staleness, now, always=first_pages)
@@ -0,0 +1,350 @@
+"""
+Local HTTP API serving price lookups from the database.
+
+`python -m app.main --serve` answers JSON GET requests, so other tools can look up
+prices without running the CLI or opening the database themselves:
+
+    GET /health                                   liveness check
+    GET /metrics                                  request counts and latencies (Prometheus text format)
+    GET /<category>/parts?name=&limit=&after=     price entries, paged by the "next" key of the previous page
+    GET /<category>/summaries?name=&limit=&offset= latest, lowest, and highest price of every part
+    GET /<category>/search?q=&limit=              parts matching a search, best matches first
+    GET /<category>/latest?id=1&id=2              price summaries of parts by id (e.g. from a search)
+
+Connections are handled by an asyncio event loop, while the queries run on a small
+pool of threads, each with a read-only connection, so slow queries never block the
+loop and WAL lets them run while an update writes. Responses are cached until the
+database changes, and concurrent requests for the same uncached response share one query.
+"""
+
+import asyncio
+import json
+import queue
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+import app.database.database as database
+import app.database.migrations as migrations
+from app.config import (DB_PATH, FETCH_PAGE_SIZE, SERVER_HOST, SERVER_PORT, SERVER_READERS, SERVER_CACHE_SIZE,
+                        SERVER_MAX_PAGE_SIZE, SERVER_IDLE_TIMEOUT)
+from app.database.connection import connect, writer
+from app.models.pc_part import PcPart
+from app.models.price_summary import PriceSummary
+from app.utils.metrics import get_metrics
+
+
+class ApiError(Exception):
+    """An error answered to the client with the HTTP <status> and a JSON error message."""
+
+    def __init__(self, status: int, message: str) -> None:
+        """Initialize a new ApiError answered with <status> and <message>."""
+        super().__init__(message)
+        self.status = status
+
+
+class ReadPool():
+    """A fixed pool of read-only connections to a database, shared by the threads answering queries.
+
+    A connection is used by one thread at a time, but may move between threads.
+
+    === Attributes ===
+    size: the number of connections in the pool
+    """
+    size: int
+
+    def __init__(self, db_path: str, size: int) -> None:
+        """Initialize a new ReadPool of <size> read-only connections to the database at <db_path>."""
+        self.size = size
+        self._connections = queue.Queue()
+        for _ in range(size):
+            self._connections.put(connect(db_path, readonly=True, check_same_thread=False))
+
+    def run(self, query: Callable, *args: object) -> object:
+        """Return query(connection, *<args>) on a connection of the pool, waiting for one to be free."""
+        connection = self._connections.get()
+        try:
+            return query(connection, *args)
+        finally:
+            self._connections.put(connection)
+
+    def close(self) -> None:
+        """Close every connection of the pool."""
+        for _ in range(self.size):
+            self._connections.get().close()
+
+
+def _int_param(params: dict[str, str], name: str, default: int, maximum: Optional[int]=None) -> int:
+    """Return the non-negative integer query parameter <name> of <params>, or <default> if missing.
+    Raises ApiError if it is not an integer in range.
+    """
+    text = params.get(name)
+    if text is None:
+        return default
+    if not (text.isascii() and text.isdigit()) or (maximum is not None and int(text) > maximum):
+        bound = f" up to {maximum}" if maximum is not None else ""
+        raise ApiError(400, f"{name} must be a non-negative integer{bound}")
+    return int(text)
+
+
+def _limit(params: dict[str, str]) -> int:
+    """Return the page size requested in <params>."""
+    limit = _int_param(params, "limit", FETCH_PAGE_SIZE, SERVER_MAX_PAGE_SIZE)
+    if limit == 0:
+        raise ApiError(400, "limit must be at least 1")
+    return limit
+
+
+def _part_to_dict(part: PcPart) -> dict:
+    """Return the attributes of <part> as a JSON-serializable dict."""
+    return {attribute: getattr(part, attribute) for attribute in PcPart.__slots__}
+
+
+def _summary_to_dict(summary: PriceSummary) -> dict:
+    """Return the attributes of <summary> as a JSON-serializable dict."""
+    return {attribute: getattr(summary, attribute) for attribute in PriceSummary.__slots__}
+
+
+def get_parts(connection: sqlite3.Connection, part_type: str, params: dict[str, str]) -> dict:
+    """Return a page of price entries, continuing after the key <params>["after"]."""
+    after = _int_param(params, "after", 0)
+    parts, next_key = database.fetch_parts_page(connection, part_type, params.get("name"), _limit(params), after)
+    return {"items": [_part_to_dict(part) for part in parts], "next": next_key}
+
+
+def get_summaries(connection: sqlite3.Connection, part_type: str, params: dict[str, str]) -> dict:
+    """Return a page of price summaries, starting at <params>["offset"]."""
+    limit, offset = _limit(params), _int_param(params, "offset", 0)
+    # one more than the page, to know whether there is a next page
+    summaries = database.fetch_price_summaries(connection, part_type, params.get("name"), limit + 1, offset)
+    return {"items": [_summary_to_dict(summary) for summary in summaries[:limit]],
+            "next": offset + limit if len(summaries) > limit else None}
+
+
+def get_search(connection: sqlite3.Connection, part_type: str, params: dict[str, str]) -> dict:
+    """Return the id, name, and brand of the parts best matching <params>["q"]."""
+    if not params.get("q"):
+        raise ApiError(400, "q is required")
+    rows = database.search_parts(connection, part_type, params["q"], _limit(params))
+    return {"items": [{"id": part_id, "name": name, "brand": brand} for part_id, name, brand in rows]}
+
+
+def get_latest(connection: sqlite3.Connection, part_type: str, params: dict[str, str]) -> dict:
+    """Return the price summaries of the parts with the comma-separated ids of <params>["id"], in id order."""
+    ids = [text.strip() for text in params.get("id", "").split(",") if text.strip()]
+    if not ids or not all(text.isascii() and text.isdigit() for text in ids):
+        raise ApiError(400, "id must be one or more part ids")
+    if len(ids) > SERVER_MAX_PAGE_SIZE:
+        raise ApiError(400, f"at most {SERVER_MAX_PAGE_SIZE} ids may be looked up at once")
+
+    summaries = database.get_price_summaries(connection, part_type, sorted({int(text) for text in ids}))
+    return {"items": [{"id": part_id, **_summary_to_dict(summary)} for part_id, summary in sorted(summaries.items())]}
+
+
+ROUTES = {
+    "parts": get_parts,
+    "summaries": get_summaries,
+    "search": get_search,
+    "latest": get_latest,
+}
+
+
+def _render(connection: sqlite3.Connection, route: Callable, part_type: str, params: dict[str, str]) -> bytes:
+    """Return the JSON body answering <route> with <params>."""
+    return json.dumps(route(connection, part_type, params), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _response(status: int, body: bytes, keep_alive: bool, content_type: str="application/json",
+              headers: tuple[str, ...]=()) -> bytes:
+    """Return the HTTP/1.1 response with <status>, <body>, and the extra <headers> lines."""
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}", *headers]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+def _error_body(message: str) -> bytes:
+    """Return the JSON body of an error response with <message>."""
+    return json.dumps({"error": message}).encode()
+
+
+class ApiServer():
+    """The read API over the database at <db_path>.
+
+    === Attributes ===
+    db_path: the path of the database served
+    readers: the number of read-only connections (and threads) answering queries
+    cache_size: the number of responses cached until the database changes (0 disables caching)
+    """
+    db_path: str
+    readers: int
+    cache_size: int
+
+    def __init__(self, db_path: str=DB_PATH, readers: int=SERVER_READERS, cache_size: int=SERVER_CACHE_SIZE) -> None:
+        """Initialize a new ApiServer, which opens its connections when started."""
+        self.db_path = db_path
+        self.readers = readers
+        self.cache_size = cache_size
+        self._pool = None
+        self._executor = None
+        self._monitor = None
+        self._responses = OrderedDict()
+        self._pending = {}
+        self._version = None
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Open the connections of this server and start listening on <host>:<port>."""
+        self._pool = ReadPool(self.db_path, self.readers)
+        self._executor = ThreadPoolExecutor(self.readers, thread_name_prefix="api-reader")
+        # used by the event loop only, to notice commits of other connections
+        self._monitor = connect(self.db_path, readonly=True, check_same_thread=False)
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        """Stop the query threads and close the connections of this server."""
+        if self._executor:
+            self._executor.shutdown()
+            self._pool.close()
+            self._monitor.close()
+            self._executor = None
+
+    async def handle(self, reader: asyncio.StreamReader, stream: asyncio.StreamWriter) -> None:
+        """Answer the requests of one client connection until it closes or stays idle too long."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), SERVER_IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.split(" ")
+                    body_length = int(headers.get("content-length", 0))
+                    if body_length < 0:
+                        raise ValueError(f"invalid content length {body_length}")
+                except ValueError:
+                    stream.write(_response(400, _error_body("malformed request"), False))
+                    break
+                if body_length:
+                    await reader.readexactly(body_length)
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                stream.write(await self.respond(method, target, keep_alive))
+                await stream.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            stream.close()
+
+    async def respond(self, method: str, target: str, keep_alive: bool=True) -> bytes:
+        """Return the HTTP response to the request <method> <target>."""
+        start = time.perf_counter()
+        url = urlsplit(target)
+        segments = url.path.strip("/").split("/")
+        endpoint = segments[-1] if segments[-1] in ROUTES or segments[-1] in ("health", "metrics") else "unknown"
+        cache = "none"
+
+        try:
+            if method != "GET":
+                raise ApiError(405, "only GET requests are supported")
+            if segments == ["health"]:
+                status, body = 200, b'{"status":"ok"}'
+            elif segments == ["metrics"]:
+                body = get_metrics().to_prometheus().encode()
+                return _response(200, body, keep_alive, "text/plain; version=0.0.4")
+            elif len(segments) == 2 and segments[0] in migrations.PART_TYPES and segments[1] in ROUTES:
+                params = dict(parse_qsl(url.query))
+                if "id" in params:
+                    # repeated ids (?id=1&id=2) are looked up like comma-separated ones
+                    params["id"] = ",".join(value for name, value in parse_qsl(url.query) if name == "id")
+                key = (segments[0], segments[1], tuple(sorted(params.items())))
+                body, cache = await self._cached(key, ROUTES[segments[1]], segments[0], params)
+                status = 200
+            else:
+                raise ApiError(404, f"no such endpoint: {url.path}")
+        except ApiError as e:
+            status, body = e.status, _error_body(str(e))
+        except Exception as e:
+            print(f"Error: {e}")
+            status, body = 500, _error_body("internal error")
+
+        metrics = get_metrics()
+        metrics.inc("server_requests_total", endpoint=endpoint, status=status, cache=cache)
+        metrics.observe("server_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+        headers = (f"X-Cache: {cache.upper()}",) if cache != "none" else ()
+        if status == 405:
+            headers += ("Allow: GET",)
+        return _response(status, body, keep_alive, headers=headers)
+
+    async def _cached(self, key: tuple, route: Callable, part_type: str, params: dict[str, str]) -> tuple[bytes, str]:
+        """Return the body answering <route> with <params>, and whether it was a cache "hit",
+        "shared" with a concurrent identical request, or a "miss".
+        """
+        loop = asyncio.get_running_loop()
+        if not self.cache_size:
+            return await loop.run_in_executor(self._executor, self._pool.run, _render, route, part_type, params), "miss"
+
+        version = self._monitor.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._responses.clear()
+            self._version = version
+
+        if key in self._responses:
+            self._responses.move_to_end(key)
+            return self._responses[key], "hit"
+        if (version, key) in self._pending:
+            return await asyncio.shield(self._pending[(version, key)]), "shared"
+
+        pending = self._pending[(version, key)] = loop.create_future()
+        try:
+            body = await loop.run_in_executor(self._executor, self._pool.run, _render, route, part_type, params)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception() # retrieved, so asyncio does not log it when nobody else waited
+            raise
+        finally:
+            del self._pending[(version, key)]
+        pending.set_result(body)
+
+        # a response to a query that started before the database changed is not kept
+        if version == self._version:
+            self._responses[key] = body
+            if len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+        return body, "miss"
+
+
+async def serve(host: str, port: int, db_path: str=DB_PATH) -> None:
+    """Serve the API over the database at <db_path> on <host>:<port> until cancelled."""
+    server = ApiServer(db_path)
+    listener = await server.start(host, port)
+    try:
+        print(f"serving {db_path} on http://{host}:{listener.sockets[0].getsockname()[1]} (Ctrl+C to stop)")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def run_server(host: str=SERVER_HOST, port: int=SERVER_PORT, db_path: str=DB_PATH) -> None:
+    """Migrate the database at <db_path>, then serve the API on <host>:<port> until interrupted."""
+    try:
+        with writer(db_path) as connection:
+            migrations.migrate(connection)
+        asyncio.run(serve(host, port, db_path))
+    except KeyboardInterrupt:
+        print("stopped.")
+    except Exception as e:
+        print(f"Error: {e}")
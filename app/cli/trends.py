@@ -0,0 +1,43 @@
+"""
+Prints price trends of the parts in the local database: the parts whose price
+moved the most over a trailing window, with their drop from the highest price
+ever recorded, time-weighted average, and volatility.
+"""
+
+import app.analytics.price_history as price_history
+import app.database.migrations as migrations
+from app.config import DB_PATH
+from app.database.connection import reader, writer
+from app.models.price_summary import format_cents
+
+
+def display_trends(connection, part_type: str, days: int, top: int) -> None:
+    """Print the <top> '<part_type>s' parts whose price moved the most over the last <days> days."""
+    history = price_history.PriceHistory.load(connection, part_type)
+    trends = price_history.compute_trends(history, days)
+    movers = trends.biggest_movers(top)
+
+    print(f"\n==== {part_type.upper()} biggest movers, last {days} days ====")
+    if not len(movers):
+        print("No price changes found.")
+        return
+
+    names = price_history.part_names(connection, part_type, trends.part_ids[movers])
+    for i in movers:
+        print(f"({names.get(int(trends.part_ids[i]), '?')}, "
+              f"{format_cents(int(trends.start_cents[i]))} -> {format_cents(int(trends.latest_cents[i]))} "
+              f"({trends.change_pct[i]:+.1f}%), {trends.drop_from_high_pct[i]:.1f}% below high, "
+              f"avg {format_cents(int(round(trends.average_cents[i])))}, volatility {trends.volatility[i]:.3f})")
+
+
+def show_trends(part_types: list[str]=None, days: int=30, top: int=10) -> None:
+    """Print the biggest price movers of every category in <part_types> (all categories by default)."""
+    with writer(DB_PATH) as connection:
+        migrations.migrate(connection)
+
+    with reader(DB_PATH) as connection:
+        try:
+            for part_type in part_types or migrations.PART_TYPES:
+                display_trends(connection, part_type, days, top)
+        except Exception as e:
+            print(f"Error: {e}")
@@ -1,40 +1,104 @@
 """
 Handles the scraping of PC part listings from Newegg and populates the local
 SQLite database with the retrieved data. This includes creating tables (if needed)
-and inserting both part specifications and pricing data.
+and inserting both part specifications and pricing data. Listings stream into
+the database through the staged pipeline in pipeline.py while scraping continues,
+and an interrupted update resumes from the pages it had not stored yet. With a
+crawl budget, an update only fetches the pages scheduler.py expects to have changed.
 
 Intended to be run manually or on a schedule to keep the database current.
 """
 
-import app.scraper.scraper as scraper
+import os
+import time
+from typing import Optional
+import app.cli.scheduler as scheduler
+import app.database.checkpoints as checkpoints
+import app.database.crawl_history as crawl_history
 import app.database.database as database
-from app.config import DB_PATH
+import app.database.migrations as migrations
+from app.config import DB_PATH, METRICS_DIR, CRAWL_BUDGET, CRAWL_MAX_STALENESS
+from app.database.connection import writer
+from app.utils.metrics import Metrics, set_metrics
 
 
-def update_database() -> None:
+def update_database(resume: bool=True, profile: bool=False, budget: Optional[int]=None) -> None:
     """Scrapes all CPUs, GPUs, and motherboards from Newegg and inserts them into the 
     local database given by <DB_PATH>.
+
+    If the previous update was interrupted, it is resumed from the pages it had not
+    stored yet, unless <resume> is False. With a <budget> (<CRAWL_BUDGET> by default,
+    where 0 means no budget), only about that many pages are fetched: the ones most likely
+    to have changed, and every page not fetched for <CRAWL_MAX_STALENESS> days. The metrics
+    of the run are written to <METRICS_DIR>, together with a profile of the run if <profile> is True.
     """
-    connection = database.get_connection(DB_PATH)
+    # the scraping stack is imported here, so compacting the database does not load it
+    import app.cli.pipeline as pipeline
+    import app.utils.profiling as profiling
+
+    with writer(DB_PATH) as connection:
+        # create/upgrade all tables
+        migrations.migrate(connection)
+
+        run_id, resumed = checkpoints.start_run(connection, resume)
+        spent = len(checkpoints.get_stored_pages(connection, run_id))
+        if resumed:
+            print(f"resuming update {run_id} ({spent} pages already stored).")
+
+        budget = budget if budget is not None else CRAWL_BUDGET
+        skip = ()
+        if budget > 0:
+            plan = scheduler.plan_update(connection, max(0, budget - spent))
+            print(f"{plan}.")
+            skip = plan.skipped
+
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        metrics = set_metrics(None)
+        status = "finished"
+
+        # scrape data, storing every page as soon as it is parsed
+        try:
+            if profile:
+                with profiling.profiled(os.path.join(METRICS_DIR, "update.pstats")):
+                    pipeline.run_pipeline(connection, run_id=run_id, skip=skip)
+            else:
+                pipeline.run_pipeline(connection, run_id=run_id, skip=skip)
+            checkpoints.finish_run(connection, run_id)
+            crawl_history.forget_pages(connection, 2 * CRAWL_MAX_STALENESS)
+        except Exception as e:
+            status = "failed"
+            print(f"Error: {e}. Database update incomplete, run it again to resume.")
+        except KeyboardInterrupt:
+            status = "interrupted"
+            print("Database update interrupted, run it again to resume.")
 
-    # create/reload all tables
-    database.create_cpus_table(connection)
-    database.create_part_prices_table(connection, 'cpu')
+    _report(metrics, run_id, status)
 
-    database.create_gpus_table(connection)
-    database.create_part_prices_table(connection, 'gpu')
 
-    database.create_mobos_table(connection)
-    database.create_part_prices_table(connection, 'mobo')
+def _report(metrics: Metrics, run_id: int, status: str) -> None:
+    """Print a summary of <metrics> and write them to <METRICS_DIR>."""
+    print(f"{status} in {time.time() - metrics.started:.1f}s: {metrics.counter('http_requests_total'):.0f} requests "
+          f"({metrics.counter('http_response_bytes_total') / 2**20:.1f} MiB, "
+          f"{metrics.counter('http_retries_total'):.0f} retries), "
+          f"{metrics.counter('rows_inserted_total'):.0f} prices stored, "
+          f"{metrics.counter('ratelimit_wait_seconds_total'):.1f}s rate limited.")
 
-    # scrape data
     try:
-        cpus = scraper.scrape_newegg_cpus()
-        gpus = scraper.scrape_newegg_gpus()
-        mobos = scraper.scrape_newegg_mobos()
-
-        database.insert_all_cpus(connection, cpus)
-        database.insert_all_gpus(connection, gpus)
-        database.insert_all_mobos(connection, mobos)
-    except Exception as e:
-        print(f"Error: {e}. Database update incomplete.")
+        metrics.write_reports(os.path.join(METRICS_DIR, "update.json"), os.path.join(METRICS_DIR, "update.prom"),
+                              run_id=run_id, status=status)
+    except OSError as e:
+        print(f"Error: {e}. Metrics not written.")
+
+
+def compact_database() -> None:
+    """Compacts the price history of the local database given by <DB_PATH>, so every run
+    of unchanged prices is stored as a single row.
+    """
+    with writer(DB_PATH) as connection:
+        migrations.migrate(connection)
+
+        for part_type in migrations.PART_TYPES:
+            removed = database.compact_price_history(connection, part_type)
+            print(f"removed {removed} redundant {part_type}_prices rows.")
+
+        connection.execute("VACUUM")
@@ -4,4 +4,51 @@ import os
 
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
-DB_PATH = os.path.join(PROJECT_ROOT, "parts.db")
\ No newline at end of file
+DB_PATH = os.path.join(PROJECT_ROOT, "parts.db")
+METRICS_DIR = os.environ.get("METRICS_DIR", os.path.join(PROJECT_ROOT, "metrics")) # update reports and profiles
+
+# scraping
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", 4)) # number of pages fetched concurrently
+SCRAPER_RATE = float(os.environ.get("SCRAPER_RATE", 0.5)) # allowed requests per second, per host
+SCRAPER_BURST = int(os.environ.get("SCRAPER_BURST", 2)) # requests allowed back to back before limiting
+CRAWL_BUDGET = int(os.environ.get("CRAWL_BUDGET", 0)) # pages fetched per update, the most likely changed first (0 fetches every page)
+CRAWL_MAX_STALENESS = float(os.environ.get("CRAWL_MAX_STALENESS", 7)) # days after which a page is fetched regardless of the budget
+
+# http client
+HTTP_TIMEOUT = float(os.environ.get("HTTP_TIMEOUT", 15)) # seconds before a request is abandoned
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", 4)) # retries after the first attempt
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", 1.0)) # base delay in seconds, doubled per retry
+HTTP_BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 30)) # upper bound on a single retry delay
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10)) # keep-alive connections kept per host
+HTTP_USER_AGENT = os.environ.get("HTTP_USER_AGENT", "Mozilla/5.0 (compatible; PcPartScraper/1.0)")
+
+# http cache
+CACHE_ENABLED = os.environ.get("CACHE_ENABLED", "1") != "0"
+CACHE_PATH = os.path.join(PROJECT_ROOT, "http_cache.db")
+CACHE_TTL = int(os.environ.get("CACHE_TTL", 7 * 24 * 60 * 60)) # seconds before an entry is discarded
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 200 * 1024 * 1024)) # cap on stored (compressed) bodies
+
+# html parsing
+HTML_PARSER = os.environ.get("HTML_PARSER", "auto") # "auto", "selectolax", "lxml", or "html.parser"
+
+# database
+DB_BUSY_TIMEOUT = int(os.environ.get("DB_BUSY_TIMEOUT", 10_000)) # milliseconds to wait on a lock before failing
+DB_SYNCHRONOUS = os.environ.get("DB_SYNCHRONOUS", "NORMAL") # "NORMAL" is durable across crashes in WAL mode, "FULL" across power loss
+DB_CACHE_SIZE = int(os.environ.get("DB_CACHE_SIZE", 64 * 1024)) # page cache per connection, in KiB
+DB_MMAP_SIZE = int(os.environ.get("DB_MMAP_SIZE", 256 * 1024 * 1024)) # bytes of the database file memory mapped
+DB_BATCH_SIZE = int(os.environ.get("DB_BATCH_SIZE", 5000)) # parts written per transaction
+FETCH_CHUNK_SIZE = int(os.environ.get("FETCH_CHUNK_SIZE", 1000)) # rows read from a cursor at a time
+FETCH_PAGE_SIZE = int(os.environ.get("FETCH_PAGE_SIZE", 25)) # rows per page of paginated queries
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 128)) # query results kept per interactive session
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1") # interface the --serve API listens on
+SERVER_PORT = int(os.environ.get("SERVER_PORT", 8080)) # port the --serve API listens on
+SERVER_READERS = int(os.environ.get("SERVER_READERS", 4)) # read-only connections (and threads) answering API queries
+SERVER_CACHE_SIZE = int(os.environ.get("SERVER_CACHE_SIZE", 1024)) # API responses kept until the database changes (0 disables)
+SERVER_MAX_PAGE_SIZE = int(os.environ.get("SERVER_MAX_PAGE_SIZE", 100)) # largest page an API request may ask for
+SERVER_IDLE_TIMEOUT = float(os.environ.get("SERVER_IDLE_TIMEOUT", 30)) # seconds an idle keep-alive connection stays open
+PIPELINE_QUEUE_SIZE = int(os.environ.get("PIPELINE_QUEUE_SIZE", 8)) # items buffered between update stages
+
+# parsing
+TITLE_CACHE_SIZE = int(os.environ.get("TITLE_CACHE_SIZE", 8192)) # listing titles memoized per extractor
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", 1)) # processes parsing pages during updates (1 parses in-process)
+PRICE_RECORDING = os.environ.get("PRICE_RECORDING", "changes") # "changes": one row per run of an unchanged price, "all": one row per observation
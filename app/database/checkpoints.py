@@ -0,0 +1,63 @@
+"""
+Crawl checkpoints of database updates.
+
+Every update is a run in the 'update_runs' table. Each listing page a run stores is
+recorded in 'update_pages' in the same transaction as its listings, so the stored
+pages of an interrupted run are exactly the pages whose listings are in the database.
+The next update resumes that run and only fetches the pages it has not stored yet.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Optional
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def get_unfinished_run(connection: sqlite3.Connection) -> Optional[int]:
+    """Return the id of the latest update run in <connection> that did not finish, or None."""
+    row = connection.execute("SELECT id FROM update_runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1").fetchone()
+    return row[0] if row else None
+
+
+def start_run(connection: sqlite3.Connection, resume: bool=True) -> tuple[int, bool]:
+    """Return the id of the update run to perform in <connection> and whether it resumes
+    an interrupted run. A new run is started if there is none to resume or <resume> is False.
+    """
+    run_id = get_unfinished_run(connection) if resume else None
+    if run_id is not None:
+        return run_id, True
+
+    with connection:
+        # a new run supersedes any interrupted one
+        connection.execute("UPDATE update_runs SET finished_at = ? WHERE finished_at IS NULL", (_now(),))
+        run_id = connection.execute("INSERT INTO update_runs (started_at) VALUES (?)", (_now(),)).lastrowid
+    return run_id, False
+
+
+def finish_run(connection: sqlite3.Connection, run_id: int) -> None:
+    """Mark the update run <run_id> in <connection> as finished."""
+    with connection:
+        connection.execute("UPDATE update_runs SET finished_at = ? WHERE id = ?", (_now(), run_id))
+
+
+def record_page(connection: sqlite3.Connection, run_id: int, category: str, url: str, stored: int) -> None:
+    """Record that the update run <run_id> stored <stored> listings of <category> from the page at <url>.
+
+    Does not commit, so it can share the transaction of the listings.
+    """
+    connection.execute("INSERT OR REPLACE INTO update_pages (run_id, category, url, stored) VALUES (?, ?, ?, ?)",
+                       (run_id, category, url, stored))
+
+
+def get_stored_pages(connection: sqlite3.Connection, run_id: int) -> set[str]:
+    """Return the urls of every page stored by the update run <run_id>."""
+    return {url for url, in connection.execute("SELECT url FROM update_pages WHERE run_id = ?", (run_id,))}
+
+
+def get_stored_counts(connection: sqlite3.Connection, run_id: int) -> dict[str, int]:
+    """Return the number of listings stored per category by the update run <run_id>."""
+    query = "SELECT category, SUM(stored) FROM update_pages WHERE run_id = ? GROUP BY category"
+    return dict(connection.execute(query, (run_id,)).fetchall())
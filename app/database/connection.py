@@ -0,0 +1,62 @@
+"""
+Connections to the local SQLite database.
+
+The database runs in WAL mode, so readers see the last committed state without
+waiting for a writer, and the writer never waits for readers. Each command opens
+one writer connection (the updater, migrations) and/or read-only connections (the
+interactive UI, reports) through the writer() and reader() context managers, which
+close them on exit. Every connection waits on locks for up to DB_BUSY_TIMEOUT
+instead of failing with "database is locked".
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+from app.config import DB_PATH, DB_BUSY_TIMEOUT, DB_SYNCHRONOUS, DB_CACHE_SIZE, DB_MMAP_SIZE
+
+
+def connect(db_path: str=DB_PATH, readonly: bool=False, check_same_thread: bool=True) -> sqlite3.Connection:
+    """Return a new connection to the database at <db_path>, in WAL mode with the configured pragmas.
+
+    A <readonly> connection rejects every write. Raises sqlite3.Error if the database cannot be opened.
+    """
+    connection = sqlite3.connect(db_path, timeout=DB_BUSY_TIMEOUT / 1000, check_same_thread=check_same_thread)
+    try:
+        connection.execute(f"PRAGMA busy_timeout = {DB_BUSY_TIMEOUT}")
+        if not readonly:
+            # persistent: stored in the database file, so later connections also use WAL
+            connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        connection.execute(f"PRAGMA cache_size = {-DB_CACHE_SIZE}") # negative sizes are in KiB
+        connection.execute(f"PRAGMA mmap_size = {DB_MMAP_SIZE}")
+        connection.execute("PRAGMA temp_store = MEMORY")
+        if readonly:
+            connection.execute("PRAGMA query_only = ON")
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+@contextmanager
+def writer(db_path: str=DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Yield a connection for writing to the database at <db_path>, closed on exit.
+
+    On exit, SQLite's query planner statistics are refreshed for the tables the connection used.
+    """
+    connection = connect(db_path)
+    try:
+        yield connection
+        connection.execute("PRAGMA optimize")
+    finally:
+        connection.close()
+
+
+@contextmanager
+def reader(db_path: str=DB_PATH) -> Iterator[sqlite3.Connection]:
+    """Yield a read-only connection to the database at <db_path>, closed on exit."""
+    connection = connect(db_path, readonly=True)
+    try:
+        yield connection
+    finally:
+        connection.close()
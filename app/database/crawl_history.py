@@ -0,0 +1,137 @@
+"""
+Change history of the listing pages fetched by database updates.
+
+Every stored listing page is recorded in 'crawl_pages' with a signature of its
+listings, in the transaction of those listings. A page whose signature differs from
+the one of its previous fetch has changed, so over many updates every page
+accumulates how many times it was fetched, how many of those found it changed, and
+over how many days it was watched, from which the crawl scheduler estimates how
+often it changes.
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import Optional
+from app.models.part_batch import PartBatch
+
+
+class PageHistory():
+    """The fetch history of a listing page.
+
+    === Attributes ===
+    url: the URL of the page
+    category: the name of the category listed on the page
+    listings: the number of listings on the page when it was last fetched
+    fetches: the number of times the page was fetched
+    changes: the number of fetches that found the page changed since the previous one
+    observed_days: the days between the first and the last fetch of the page
+    last_fetched: when the page was last fetched
+    last_changed: when the page was last found changed (or first fetched)
+    """
+    __slots__ = ("url", "category", "listings", "fetches", "changes", "observed_days", "last_fetched", "last_changed")
+
+    url: str
+    category: str
+    listings: int
+    fetches: int
+    changes: int
+    observed_days: float
+    last_fetched: datetime
+    last_changed: datetime
+
+    def __init__(self, url: str, category: str, listings: int, fetches: int, changes: int,
+                 observed_days: float, last_fetched: datetime, last_changed: datetime) -> None:
+        """Initialize a new PageHistory object."""
+        self.url = url
+        self.category = category
+        self.listings = listings
+        self.fetches = fetches
+        self.changes = changes
+        self.observed_days = observed_days
+        self.last_fetched = last_fetched
+        self.last_changed = last_changed
+
+
+def page_signature(batch: PartBatch) -> str:
+    """Return a digest of the name, price, and link of every listing in <batch>, in order.
+
+    Only the stored listings are covered, so changes to the rest of the page (ads,
+    recommendations) do not count as changes.
+    """
+    digest = hashlib.sha1()
+    for row in zip(batch.names, batch.prices, batch.links):
+        digest.update("\x1f".join(value or "" for value in row).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def record_fetch(connection: sqlite3.Connection, category: str, url: str, batch: PartBatch,
+                 fetched_at: Optional[datetime]=None) -> bool:
+    """Record that the page at <url> listing <category> was fetched at <fetched_at> (now by
+    default) with the listings <batch>, and return whether it changed since its previous fetch.
+
+    Does not commit, so it can share the transaction of the listings.
+    """
+    fetched_at = fetched_at or datetime.now()
+    signature = page_signature(batch)
+    row = connection.execute("SELECT signature, last_fetched FROM crawl_pages WHERE url = ?", (url,)).fetchone()
+
+    if row is None:
+        connection.execute("""
+        INSERT INTO crawl_pages (url, category, signature, listings, fetches, changes, observed_days,
+                                 last_fetched, last_changed)
+        VALUES (?, ?, ?, ?, 1, 0, 0, ?, ?)
+        """, (url, category, signature, len(batch), fetched_at.isoformat(timespec="seconds"),
+              fetched_at.isoformat(timespec="seconds")))
+        return False
+
+    changed = signature != row[0]
+    elapsed = max(0.0, (fetched_at - datetime.fromisoformat(row[1])).total_seconds() / 86400)
+    connection.execute("""
+    UPDATE crawl_pages
+    SET category = ?, signature = ?, listings = ?, fetches = fetches + 1, changes = changes + ?,
+        observed_days = observed_days + ?, last_fetched = ?, last_changed = CASE WHEN ? THEN ? ELSE last_changed END
+    WHERE url = ?
+    """, (category, signature, len(batch), changed, elapsed, fetched_at.isoformat(timespec="seconds"),
+          changed, fetched_at.isoformat(timespec="seconds"), url))
+    return changed
+
+
+def get_page_history(connection: sqlite3.Connection) -> dict[str, PageHistory]:
+    """Return a mapping from url to the fetch history of every listing page ever stored."""
+    query = """
+    SELECT url, category, listings, fetches, changes, observed_days, last_fetched, last_changed FROM crawl_pages
+    """
+    return {row[0]: PageHistory(*row[:6], datetime.fromisoformat(row[6]), datetime.fromisoformat(row[7]))
+            for row in connection.execute(query)}
+
+
+def forget_pages(connection: sqlite3.Connection, days: float) -> int:
+    """Remove the history of the pages not fetched within <days> of the latest fetch of their
+    category, such as pages past the end of a listing that got shorter, and return how many were removed.
+    """
+    with connection:
+        return connection.execute("""
+        DELETE FROM crawl_pages
+        WHERE julianday(last_fetched) < (SELECT julianday(MAX(latest.last_fetched)) FROM crawl_pages AS latest
+                                         WHERE latest.category = crawl_pages.category) - ?
+        """, (days,)).rowcount
+
+
+def get_price_change_rate(connection: sqlite3.Connection, part_type: str) -> Optional[float]:
+    """Return the average number of times a '<part_type>s' part changed price per day in the
+    stored price history, or None if the history does not span any time yet.
+    """
+    query = f"""
+    SELECT SUM(changes), SUM(span) FROM (
+        SELECT SUM(previous IS NOT NULL AND price_cents IS NOT previous) AS changes,
+               julianday(MAX(COALESCE(last_seen, price_date))) - julianday(MIN(price_date)) AS span
+        FROM (SELECT {part_type}_id AS part_id, website, price_cents, price_date, last_seen,
+                     LAG(price_cents) OVER (PARTITION BY {part_type}_id, website ORDER BY id) AS previous
+              FROM {part_type}_prices)
+        GROUP BY part_id, website
+    )
+    """
+    changes, span = connection.execute(query).fetchone()
+    return changes / span if span else None
@@ -2,38 +2,360 @@
 Handles all database-related operations for the PC parts web scraping tool.
 
 This module establishes a connection to a SQLite database and defines functions
-to create and populate tables for storing product and pricing information.
+to create and populate tables for storing product and pricing information. The
+schema is upgraded to its latest version by migrations.py.
 """
 
+import re
 import sqlite3
-from typing import Optional
+import time
+from typing import Callable, Iterable, Iterator, Optional
+from app.config import DB_BATCH_SIZE, FETCH_CHUNK_SIZE, FETCH_PAGE_SIZE, PRICE_RECORDING
+from app.database.connection import connect
 from app.models.pc_part import PcPart
 from app.models.cpu import CPU
 from app.models.gpu import GPU
 from app.models.motherboard import MOBO
+from app.models.part_batch import PartBatch
+from app.models.price_summary import PriceSummary
+from app.utils.parsing import price_to_cents, to_external_id
+
+
+PART_CLASSES = {"cpu": CPU, "gpu": GPU, "mobo": MOBO}
 
 
 # === Universal database functions ===
 def get_connection(db_name: str) -> sqlite3.Connection:
-    """Return a connection to database <db_name>."""
-    try:
-        return sqlite3.connect(db_name)
-    except Exception as e:
-        print(f"Error: {e}")
+    """Return a writer connection to database <db_name>, configured as in connection.py.
+
+    Prefer the connection.writer() and connection.reader() context managers, which close
+    the connection. Raises sqlite3.Error if the database cannot be opened.
+    """
+    return connect(db_name)
 
 
 def get_part_id(connection: sqlite3.Connection, part: PcPart) -> Optional[int]:
-    """Return the id of <part>, or None if not found."""
-    query = f"SELECT id FROM {type(part).__name__.lower()}s WHERE name=?"
+    """Return the id of <part>, or None if not found.
+
+    A part is found by the retailer item number in its link, and a part whose link has
+    none by any name it was listed under.
+    """
+    part_type = type(part).__name__.lower()
+    external_id = to_external_id(part.website, part.link)
     try:
         with connection:
-            result = connection.execute(query, (part.name,)).fetchone()
-            return result[0] if result else None
+            if external_id:
+                result = connection.execute(f"SELECT id FROM {part_type}s WHERE external_id=?", (external_id,)).fetchone()
+                if result:
+                    return result[0]
+            return get_part_ids(connection, part_type, [part.name]).get(part.name)
     except Exception as e:
         print(f"Error: {e}")
         return None
     
 
+def to_search_query(text: str) -> Optional[str]:
+    """Return an FTS5 query matching parts whose name or brand contain every word of <text>
+    as a prefix, or None if <text> has no words.
+    """
+    tokens = re.findall(r"\w+", text)
+    return " ".join(f'"{token}"*' for token in tokens) or None
+
+
+def _name_search_condition(part_type: str, text: str) -> tuple[str, tuple]:
+    """Return the SQL clause (appended after the joins of a '<part_type>s' query) and its
+    parameters that keep only parts matching <text>, best matches first.
+    """
+    search = to_search_query(text)
+    if not search:
+        return f" WHERE {part_type}s.name LIKE ?", (f"%{text}%",)
+
+    return (f" JOIN {part_type}s_fts ON {part_type}s_fts.rowid = {part_type}s.id"
+            f" WHERE {part_type}s_fts MATCH ? ORDER BY {part_type}s_fts.rank"), (search,)
+
+
+def search_parts(connection: sqlite3.Connection, part_type: str, text: str, limit: int=20) -> list[tuple[int, str, str]]:
+    """Return the (id, name, brand) of up to <limit> '<part_type>s' matching <text>, best matches first."""
+    search = to_search_query(text)
+    if not search:
+        return []
+
+    query = f"""
+    SELECT {part_type}s.id, {part_type}s.name, {part_type}s.brand
+    FROM {part_type}s_fts
+    JOIN {part_type}s ON {part_type}s.id = {part_type}s_fts.rowid
+    WHERE {part_type}s_fts MATCH ?
+    ORDER BY {part_type}s_fts.rank
+    LIMIT ?
+    """
+    try:
+        with connection:
+            return connection.execute(query, (search, limit)).fetchall()
+    except Exception as e:
+        print(f"Error: {e}")
+        return []
+
+
+def _name_filter(part_type: str, text: str) -> tuple[str, tuple]:
+    """Return a WHERE condition (and its parameters) keeping the '<part_type>s' parts whose
+    name matches the search <text>, without changing the order of the rows.
+    """
+    search = to_search_query(text)
+    if search:
+        return f"{part_type}s.id IN (SELECT rowid FROM {part_type}s_fts WHERE {part_type}s_fts MATCH ?)", (search,)
+    return f"{part_type}s.name LIKE ?", (f"%{text}%",)
+
+
+def _parts_query(part_type: str, name_condition: str=None) -> tuple[str, tuple]:
+    """Return the query (and its parameters) joining '<part_type>s' with their pricing
+    information, filtered through <name_condition> if given.
+
+    Selected columns are the price row id, name, brand, website, link, price, and price date.
+    """
+    query = f"""
+    SELECT {part_type}_prices.id, {part_type}s.name, {part_type}s.brand, {part_type}_prices.website,
+           {part_type}_prices.link, {part_type}_prices.price, {part_type}_prices.price_date
+    FROM {part_type}s
+    JOIN {part_type}_prices ON {part_type}s.id = {part_type}_prices.{part_type}_id
+    """
+    params = ()
+
+    if name_condition:
+        condition, params = _name_search_condition(part_type, name_condition)
+        query += condition
+
+    return query, params
+
+
+def _row_to_part(part_type: str, row: tuple) -> PcPart:
+    """Return the part of type <part_type> described by a <row> of _parts_query."""
+    return PART_CLASSES[part_type](name=row[1], brand=row[2], website=row[3], link=row[4], price=row[5], date=row[6])
+
+
+def iter_parts(connection: sqlite3.Connection, part_type: str, name_condition: str=None,
+               chunk_size: int=FETCH_CHUNK_SIZE) -> Iterator[PcPart]:
+    """Yield every '<part_type>s' price entry as a part object, filtered through <name_condition>.
+
+    Rows are read from the cursor <chunk_size> at a time, so memory use does not grow
+    with the size of the price history.
+    """
+    query, params = _parts_query(part_type, name_condition)
+
+    try:
+        cursor = connection.execute(query, params)
+        while rows := cursor.fetchmany(chunk_size):
+            for row in rows:
+                yield _row_to_part(part_type, row)
+    except Exception as e:
+        print(f"Error: {e}")
+
+
+def fetch_parts_batch(connection: sqlite3.Connection, part_type: str, name_condition: str=None,
+                      chunk_size: int=FETCH_CHUNK_SIZE) -> PartBatch:
+    """Return every '<part_type>s' price entry, filtered through <name_condition>, as a PartBatch.
+
+    This is the compact alternative to fetch_* for loading large price histories.
+    """
+    query, params = _parts_query(part_type, name_condition)
+
+    batch = PartBatch(PART_CLASSES[part_type])
+    try:
+        cursor = connection.execute(query, params)
+        while rows := cursor.fetchmany(chunk_size):
+            for row in rows:
+                batch.append(row[1], row[3], row[4], row[5], row[6], row[2])
+    except Exception as e:
+        print(f"Error: {e}")
+
+    return batch
+
+
+def fetch_parts_page(connection: sqlite3.Connection, part_type: str, name_condition: str=None,
+                     limit: int=FETCH_PAGE_SIZE, after: Optional[int]=None) -> tuple[list[PcPart], Optional[int]]:
+    """Return a page of at most <limit> '<part_type>s' price entries, filtered through <name_condition>,
+    and the key to pass as <after> for the next page (None on the last page).
+
+    Pages use keyset pagination over the price row id, so every page is a short indexed
+    query no matter how deep it is. Search results are in price row order rather than by rank.
+    """
+    query = _parts_query(part_type)[0] + f" WHERE {part_type}_prices.id > ?"
+    params = (after or 0,)
+
+    if name_condition:
+        condition, name_params = _name_filter(part_type, name_condition)
+        query += f" AND {condition}"
+        params += name_params
+
+    query += f" ORDER BY {part_type}_prices.id LIMIT ?"
+    params += (limit,)
+
+    try:
+        rows = connection.execute(query, params).fetchall()
+    except Exception as e:
+        print(f"Error: {e}")
+        return [], None
+
+    next_key = rows[-1][0] if len(rows) == limit else None
+    return [_row_to_part(part_type, row) for row in rows], next_key
+
+
+def fetch_price_summaries(connection: sqlite3.Connection, part_type: str, name_condition: str=None,
+                          limit: Optional[int]=None, offset: int=0) -> list[PriceSummary]:
+    """Return the price summary of every '<part_type>s' part, filtered through <name_condition>,
+    or only the page of at most <limit> summaries starting at <offset> if <limit> is given.
+
+    Summaries are read from the '<part_type>_price_summary' table, so this takes time
+    proportional to the number of parts rather than to the length of their price history.
+    """
+    query = f"""
+    SELECT {part_type}s.name, {part_type}s.brand, summary.latest_price, summary.latest_date, summary.latest_link,
+           summary.lowest_cents, summary.lowest_date, summary.highest_cents, summary.highest_date, summary.observations
+    FROM {part_type}s
+    JOIN {part_type}_price_summary AS summary ON {part_type}s.id = summary.{part_type}_id
+    """
+    params = ()
+
+    if name_condition:
+        condition, params = _name_search_condition(part_type, name_condition)
+        query += condition
+    else:
+        query += f" ORDER BY {part_type}s.name"
+
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params += (limit, offset)
+
+    try:
+        with connection:
+            return [PriceSummary(*row) for row in connection.execute(query, params)]
+    except Exception as e:
+        print(f"Error: {e}")
+        return []
+
+
+def get_price_summaries(connection: sqlite3.Connection, part_type: str,
+                        part_ids: Iterable[int]) -> dict[int, PriceSummary]:
+    """Return a mapping from part id to the price summary of every '<part_type>s' part in <part_ids>.
+    Parts that are not in the database are left out.
+    """
+    query = f"""
+    SELECT {part_type}s.id, {part_type}s.name, {part_type}s.brand, summary.latest_price, summary.latest_date,
+           summary.latest_link, summary.lowest_cents, summary.lowest_date, summary.highest_cents,
+           summary.highest_date, summary.observations
+    FROM {part_type}s
+    JOIN {part_type}_price_summary AS summary ON {part_type}s.id = summary.{part_type}_id
+    WHERE {part_type}s.id IN ({{}})
+    """
+    try:
+        with connection:
+            summaries = {}
+            for chunk in _chunks(part_ids):
+                rows = connection.execute(query.format(", ".join("?" * len(chunk))), chunk)
+                summaries.update((row[0], PriceSummary(*row[1:])) for row in rows)
+            return summaries
+    except Exception as e:
+        print(f"Error: {e}")
+        return {}
+
+
+HISTORY_COLUMNS = ("category", "name", "brand", "website", "price", "price_cents", "link",
+                   "first_seen", "last_seen", "observations")
+CURRENT_COLUMNS = ("category", "name", "brand", "price", "price_cents", "link", "date",
+                   "lowest_cents", "highest_cents", "observations")
+
+
+def _export_filters(part_type: str, name: Optional[str], brand: Optional[str], cents_column: str,
+                    price_range: tuple[Optional[int], Optional[int]]) -> tuple[list[str], tuple]:
+    """Return the WHERE conditions (and their parameters) shared by the export queries."""
+    conditions, params = [], ()
+    if name:
+        condition, params = _name_filter(part_type, name)
+        conditions.append(condition)
+    if brand:
+        conditions.append(f"{part_type}s.brand = ? COLLATE NOCASE")
+        params += (brand,)
+
+    low, high = price_range
+    if low is not None:
+        conditions.append(f"{cents_column} >= ?")
+        params += (low,)
+    if high is not None:
+        conditions.append(f"{cents_column} <= ?")
+        params += (high,)
+    return conditions, params
+
+
+def _iter_rows(connection: sqlite3.Connection, query: str, params: tuple, chunk_size: int) -> Iterator[tuple]:
+    """Yield the rows of <query>, read from the cursor <chunk_size> at a time."""
+    cursor = connection.execute(query, params)
+    while rows := cursor.fetchmany(chunk_size):
+        yield from rows
+
+
+def iter_price_history(connection: sqlite3.Connection, part_type: str, name: Optional[str]=None,
+                       brand: Optional[str]=None, since: Optional[str]=None, until: Optional[str]=None,
+                       min_cents: Optional[int]=None, max_cents: Optional[int]=None,
+                       chunk_size: int=FETCH_CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield every '<part_type>_prices' row matching the filters as a tuple of HISTORY_COLUMNS,
+    in the order the rows were stored.
+
+    A row matches the dates <since> and <until> (YYYY-MM-DD) if the price was in effect at some
+    point between them, and the price range if its price in cents is within [<min_cents>, <max_cents>].
+    Rows are streamed from the cursor, so memory use does not grow with the size of the history.
+    Database errors are raised, so a failed export is never mistaken for a complete one.
+    """
+    conditions, params = _export_filters(part_type, name, brand, "prices.price_cents", (min_cents, max_cents))
+    if since:
+        conditions.append("COALESCE(prices.last_seen, prices.price_date) >= ?")
+        params += (since,)
+    if until:
+        conditions.append("prices.price_date <= ?")
+        params += (until,)
+
+    query = f"""
+    SELECT '{part_type}', {part_type}s.name, {part_type}s.brand, prices.website, prices.price, prices.price_cents,
+           prices.link, prices.price_date, COALESCE(prices.last_seen, prices.price_date), prices.observations
+    FROM {part_type}_prices AS prices
+    JOIN {part_type}s ON {part_type}s.id = prices.{part_type}_id
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY prices.id"
+
+    return _iter_rows(connection, query, params, chunk_size)
+
+
+def iter_current_prices(connection: sqlite3.Connection, part_type: str, name: Optional[str]=None,
+                        brand: Optional[str]=None, since: Optional[str]=None, until: Optional[str]=None,
+                        min_cents: Optional[int]=None, max_cents: Optional[int]=None,
+                        chunk_size: int=FETCH_CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield the latest price of every '<part_type>s' part matching the filters as a tuple of
+    CURRENT_COLUMNS, ordered by name.
+
+    The filters are those of iter_price_history, applied to the latest price and the date it
+    was last seen. Database errors are raised.
+    """
+    conditions, params = _export_filters(part_type, name, brand, "summary.latest_cents", (min_cents, max_cents))
+    if since:
+        conditions.append("summary.latest_date >= ?")
+        params += (since,)
+    if until:
+        conditions.append("summary.latest_date <= ?")
+        params += (until,)
+
+    query = f"""
+    SELECT '{part_type}', {part_type}s.name, {part_type}s.brand, summary.latest_price, summary.latest_cents,
+           summary.latest_link, summary.latest_date, summary.lowest_cents, summary.highest_cents, summary.observations
+    FROM {part_type}_price_summary AS summary
+    JOIN {part_type}s ON {part_type}s.id = summary.{part_type}_id
+    """
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {part_type}s.name"
+
+    return _iter_rows(connection, query, params, chunk_size)
+
+
 def create_part_prices_table(connection: sqlite3.Connection, part_type: str) -> None:
     """Create a '<part_type>_prices' table in <connection> that stores pricing 
     information for the given <part_type>.
@@ -62,18 +384,325 @@ def create_part_prices_table(connection: sqlite3.Connection, part_type: str) ->
 def insert_part_price(connection: sqlite3.Connection, part: PcPart) -> None:
     """Insert <part>'s pricing information into the '<part>_prices' table within
     <connection>."""
-    part_type = type(part).__name__.lower()
+    insert_parts(connection, [part])
+
 
+def _chunks(values: Iterable, size: int=500) -> Iterator[list]:
+    """Yield the items of <values> in lists of at most <size>, few enough to bind as query parameters."""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def get_part_ids(connection: sqlite3.Connection, part_type: str,
+                 names: Optional[Iterable[str]]=None) -> dict[str, int]:
+    """Return a mapping from name to id of every name a '<part_type>s' part was listed under,
+    or only of the names in <names> if given.
+
+    Former names come from the '<part_type>_aliases' table. A current name shared by several
+    parts maps to the first of them, and current names take precedence over former ones.
+    """
     query = f"""
-    INSERT INTO {part_type}_prices ({part_type}_id, website, price, link, price_date)
-    VALUES (?, ?, ?, ?, ?)
+    SELECT name, {part_type}_id FROM {part_type}_aliases {{}}
+    UNION ALL
+    SELECT name, MIN(id) FROM {part_type}s WHERE name IS NOT NULL {{}} GROUP BY name
     """
-    part_id = get_part_id(connection, part)
     try:
         with connection:
-            connection.execute(query, (part_id, part.website, part.price, part.link, part.date))
+            if names is None:
+                return dict(connection.execute(query.format("", "")).fetchall())
+
+            part_ids = {}
+            for chunk in _chunks(names):
+                condition = f"name IN ({', '.join('?' * len(chunk))})"
+                part_ids.update(connection.execute(query.format(f"WHERE {condition}", f"AND {condition}"), chunk * 2))
+            return part_ids
     except Exception as e:
+        print(f"Error: {e}")
+        return {}
+
+
+def get_external_part_ids(connection: sqlite3.Connection, part_type: str,
+                          external_ids: Iterable[str]) -> dict[str, tuple[int, str]]:
+    """Return a mapping from external id to the (id, name) of every '<part_type>s' part in <external_ids>.
+
+    External ids are indexed, so each lookup is a single index probe.
+    """
+    query = f"SELECT external_id, id, name FROM {part_type}s WHERE external_id IN ({{}})"
+    try:
+        with connection:
+            part_ids = {}
+            for chunk in _chunks(external_ids):
+                rows = connection.execute(query.format(", ".join("?" * len(chunk))), chunk)
+                part_ids.update((external_id, (part_id, name)) for external_id, part_id, name in rows)
+            return part_ids
+    except Exception as e:
+        print(f"Error: {e}")
+        return {}
+
+
+def _get_unkeyed_part_ids(connection: sqlite3.Connection, part_type: str, names: Iterable[str]) -> dict[str, int]:
+    """Return a mapping from name to id of the '<part_type>s' parts named in <names> that have no external id,
+    such as parts only listed without an item number so far.
+    """
+    query = f"SELECT name, MIN(id) FROM {part_type}s WHERE external_id IS NULL AND name IN ({{}}) GROUP BY name"
+    try:
+        with connection:
+            part_ids = {}
+            for chunk in _chunks(names):
+                part_ids.update(connection.execute(query.format(", ".join("?" * len(chunk))), chunk))
+            return part_ids
+    except Exception as e:
+        print(f"Error: {e}")
+        return {}
+
+
+def get_latest_prices(connection: sqlite3.Connection, part_type: str,
+                      part_ids: Optional[Iterable[int]]=None) -> dict[tuple[int, str], tuple[int, str, str]]:
+    """Return a mapping from (part id, website) to the (row id, price, link) of the latest
+    '<part_type>_prices' row of every part, or only of the parts in <part_ids> if given.
+    """
+    query = f"""
+    SELECT {part_type}_id, website, id, price, link FROM {part_type}_prices
+    WHERE id IN (SELECT MAX(id) FROM {part_type}_prices {{}} GROUP BY {part_type}_id, website)
+    """
+    try:
+        with connection:
+            if part_ids is None:
+                return {(row[0], row[1]): row[2:] for row in connection.execute(query.format(""))}
+
+            latest = {}
+            for chunk in _chunks(part_ids):
+                condition = f"WHERE {part_type}_id IN ({', '.join('?' * len(chunk))})"
+                latest.update({(row[0], row[1]): row[2:] for row in connection.execute(query.format(condition), chunk)})
+            return latest
+    except Exception as e:
+        print(f"Error: {e}")
+        return {}
+
+
+def summary_upsert_query(part_type: str) -> str:
+    """Return the query folding one price observation into the '<part_type>_price_summary' table.
+
+    Parameters are the part id, price, price in cents, link, date first and last seen, and
+    number of observations. Missing prices (NULL cents) update the latest price but never
+    the lowest or highest.
+    """
+    return f"""
+    INSERT INTO {part_type}_price_summary
+        ({part_type}_id, latest_price, latest_cents, latest_link, latest_date,
+         lowest_cents, lowest_date, highest_cents, highest_date, observations)
+    VALUES (?1, ?2, ?3, ?4, ?6, ?3, CASE WHEN ?3 IS NULL THEN NULL ELSE ?5 END,
+            ?3, CASE WHEN ?3 IS NULL THEN NULL ELSE ?5 END, ?7)
+    ON CONFLICT ({part_type}_id) DO UPDATE SET
+        latest_price = CASE WHEN excluded.latest_date >= latest_date THEN excluded.latest_price ELSE latest_price END,
+        latest_cents = CASE WHEN excluded.latest_date >= latest_date THEN excluded.latest_cents ELSE latest_cents END,
+        latest_link = CASE WHEN excluded.latest_date >= latest_date THEN excluded.latest_link ELSE latest_link END,
+        latest_date = MAX(latest_date, excluded.latest_date),
+        lowest_date = CASE WHEN excluded.lowest_cents < COALESCE(lowest_cents, excluded.lowest_cents + 1)
+                           THEN excluded.lowest_date ELSE lowest_date END,
+        lowest_cents = MIN(COALESCE(lowest_cents, excluded.lowest_cents), COALESCE(excluded.lowest_cents, lowest_cents)),
+        highest_date = CASE WHEN excluded.highest_cents > COALESCE(highest_cents, excluded.highest_cents - 1)
+                            THEN excluded.highest_date ELSE highest_date END,
+        highest_cents = MAX(COALESCE(highest_cents, excluded.highest_cents), COALESCE(excluded.highest_cents, highest_cents)),
+        observations = observations + excluded.observations
+    """
+
+
+def insert_parts(connection: sqlite3.Connection, parts: PartBatch | list[PcPart],
+                 batch_size: int=DB_BATCH_SIZE, recording: str=PRICE_RECORDING,
+                 checkpoint: Optional[Callable[[sqlite3.Connection], None]]=None) -> int:
+    """Insert every part in <parts> and its pricing information into <connection>, and
+    return the number of price observations recorded.
+
+    All parts must be of the same type. A PartBatch is read column by column without
+    building part objects. Only the ids and latest prices of the parts in each batch are
+    looked up (and kept for later batches), so storing a page costs the same however large
+    the tables are. Each batch of <batch_size> parts is written with executemany in one
+    transaction, together with the matching updates of the '<part_type>_price_summary' table.
+
+    Listings are matched to parts by the retailer item number in their link, so a part keeps
+    its history when its listing title changes (the part is renamed, and its former name kept
+    as an alias), and different products listed under the same name stay apart. Listings
+    without an item number are matched by name.
+
+    With <recording> "changes", a price row covers a run of identical observations: an
+    observation with the same price and link as the part's latest row only extends that
+    row's last_seen date and observation count. With "all", every observation is a new row.
+
+    If given, <checkpoint> is called with <connection> inside the transaction of the last
+    batch, so whatever it records is committed if and only if the parts are. A batch that
+    fails is then raised rather than skipped, so the caller knows the checkpoint was not recorded.
+    """
+    if not parts:
+        if checkpoint:
+            with connection:
+                checkpoint(connection)
+        return 0
+    if not isinstance(parts, PartBatch):
+        parts = PartBatch.from_parts(type(parts[0]), parts)
+
+    part_type = parts.part_type
+    external_ids = {} # external id -> (id, name) of the parts listed with an item number
+    part_ids = {} # name -> id of the parts listed without one
+    latest = {}
+    loaded = set() # ids of the parts whose latest prices are in <latest>
+
+    part_query = f"INSERT INTO {part_type}s (brand, name, external_id) VALUES (?, ?, ?)"
+    rename_query = f"UPDATE {part_type}s SET name = ? WHERE id = ?"
+    adopt_query = f"UPDATE {part_type}s SET external_id = ? WHERE id = ?"
+    new_ids_query = f"SELECT id FROM {part_type}s WHERE id > ? ORDER BY id"
+    alias_query = f"INSERT OR REPLACE INTO {part_type}_aliases (name, {part_type}_id) VALUES (?, ?)"
+    price_query = f"""
+    INSERT INTO {part_type}_prices ({part_type}_id, website, price, price_cents, link, price_date, last_seen)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    summary_query = summary_upsert_query(part_type)
+    seen_query = f"""
+    UPDATE {part_type}_prices SET last_seen = MAX(last_seen, ?), observations = observations + 1 WHERE id = ?
+    """
+
+    inserted = 0
+    for start in range(0, len(parts), batch_size):
+        end = start + batch_size
+        names = parts.names[start:end]
+        keys = [to_external_id(website, link) for website, link in zip(parts.websites[start:end], parts.links[start:end])]
+
+        external_ids.update(get_external_part_ids(connection, part_type,
+                                                  {key for key in keys if key and key not in external_ids}))
+        part_ids.update(get_part_ids(connection, part_type,
+                                     {name for name, key in zip(names, keys) if not key and name not in part_ids}))
+        # parts stored before they were listed with an item number take the first one they are listed with
+        unkeyed = _get_unkeyed_part_ids(connection, part_type,
+                                        {name for name, key in zip(names, keys) if key and key not in external_ids})
+        if recording == "changes":
+            known = {external_ids[key][0] if key else part_ids[name] for name, key in zip(names, keys)
+                     if (key in external_ids if key else name in part_ids)} | set(unkeyed.values())
+            latest.update(get_latest_prices(connection, part_type, known - loaded))
+            loaded |= known
+
+        try:
+            with connection:
+                new_parts = {} # external id, or name if listed without one -> (brand, name, external id)
+                renames = {} # part id -> name of the parts whose listing title changed
+                aliases = [] # (former name, part id) of the renamed parts
+                adoptions = [] # (external id, part id) of the parts first listed with an item number
+                for name, brand, key in zip(names, parts.brands[start:end], keys):
+                    if not key:
+                        if name not in part_ids:
+                            new_parts.setdefault(name, (brand, name, None))
+                    elif key in external_ids:
+                        part_id, stored_name = external_ids[key]
+                        if stored_name != name: # the listing title changed, the product did not
+                            renames[part_id] = name
+                            aliases.append((stored_name, part_id))
+                            external_ids[key] = (part_id, name)
+                    elif name in unkeyed:
+                        part_id = unkeyed.pop(name)
+                        adoptions.append((key, part_id))
+                        external_ids[key] = (part_id, name)
+                    else:
+                        new_parts.setdefault(key, (brand, name, key))
+
+                if new_parts:
+                    last_id = connection.execute(f"SELECT COALESCE(MAX(id), 0) FROM {part_type}s").fetchone()[0]
+                    connection.executemany(part_query, new_parts.values())
+                    # ids are assigned in insertion order
+                    for (_, name, key), (part_id,) in zip(new_parts.values(), connection.execute(new_ids_query, (last_id,))):
+                        if key:
+                            external_ids[key] = (part_id, name)
+                        else:
+                            part_ids[name] = part_id
+                connection.executemany(rename_query, ((name, part_id) for part_id, name in renames.items()))
+                connection.executemany(adopt_query, adoptions)
+                connection.executemany(alias_query, aliases)
+
+                ids = [external_ids[key][0] if key else part_ids[name] for name, key in zip(names, keys)]
+                rows = list(zip(ids, parts.websites[start:end], parts.prices[start:end],
+                                parts.links[start:end], parts.dates[start:end]))
+                connection.executemany(summary_query, ((part_id, price, price_to_cents(price), link, date, date, 1)
+                                                       for part_id, _, price, link, date in rows))
+
+                if recording == "changes":
+                    seen = []
+                    for part_id, website, price, link, date in rows:
+                        previous = latest.get((part_id, website))
+                        if previous and previous[1] == price and previous[2] == link:
+                            seen.append((date, previous[0]))
+                        else:
+                            row_id = connection.execute(price_query, (part_id, website, price, price_to_cents(price),
+                                                                      link, date, date)).lastrowid
+                            latest[(part_id, website)] = (row_id, price, link)
+                    connection.executemany(seen_query, seen)
+                else:
+                    connection.executemany(price_query, ((part_id, website, price, price_to_cents(price), link, date, date)
+                                                         for part_id, website, price, link, date in rows))
+
+                if checkpoint and end >= len(parts):
+                    checkpoint(connection)
+            inserted += len(names)
+        except Exception as e:
             print(f"Error: {e}")
+            # drop the ids and prices of the rolled back rows
+            external_ids, part_ids, latest, loaded = {}, {}, {}, set()
+            if checkpoint:
+                raise
+
+    return inserted
+
+
+def compact_price_history(connection: sqlite3.Connection, part_type: str, chunk_size: int=FETCH_CHUNK_SIZE) -> int:
+    """Rewrite the '<part_type>_prices' table so every run of consecutive observations with
+    the same price and link is a single row, and return the number of rows removed.
+
+    The first row of a run is kept, with its last_seen date and observation count covering
+    the whole run, so the price in effect at every observed date is preserved.
+    """
+    query = f"""
+    SELECT id, {part_type}_id, website, price, link, price_date, last_seen, observations
+    FROM {part_type}_prices
+    ORDER BY {part_type}_id, website, price_date, id
+    """
+    update_query = f"UPDATE {part_type}_prices SET last_seen = ?, observations = ? WHERE id = ?"
+    delete_query = f"DELETE FROM {part_type}_prices WHERE id = ?"
+
+    updates, deletes = [], []
+    run = None # [id, part id, website, price, link, last_seen, observations] of the current run
+    try:
+        with connection:
+            cursor = connection.execute(query)
+            while rows := cursor.fetchmany(chunk_size):
+                for row_id, part_id, website, price, link, date, last_seen, observations in rows:
+                    if run and run[1:5] == [part_id, website, price, link]:
+                        run[5] = max(run[5], last_seen or date)
+                        run[6] += observations
+                        deletes.append((row_id,))
+                        continue
+
+                    if run:
+                        updates.append((run[5], run[6], run[0]))
+                    run = [row_id, part_id, website, price, link, last_seen or date, observations]
+
+            if run:
+                updates.append((run[5], run[6], run[0]))
+
+            connection.executemany(update_query, updates)
+            connection.executemany(delete_query, deletes)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 0
+
+    return len(deletes)
+
+
+def _insert_all(connection: sqlite3.Connection, parts: PartBatch | list[PcPart], label: str) -> None:
+    """Insert all parts in <parts> into <connection> and report the ingestion rate."""
+    start = time.perf_counter()
+    inserted = insert_parts(connection, parts)
+    elapsed = time.perf_counter() - start
+
+    rate = inserted / elapsed if elapsed > 0 else 0
+    print(f"inserted {inserted} {label} prices ({rate:.0f} rows/sec).")
 
 
 def ensure_tables(connection: sqlite3.Connection) -> bool:
@@ -114,10 +743,9 @@ def create_cpus_table(connection: sqlite3.Connection) -> None:
         print(f"Error: {e}")
 
 
-def insert_all_cpus(connection: sqlite3.Connection, cpus: list[CPU]) -> None:
+def insert_all_cpus(connection: sqlite3.Connection, cpus: PartBatch | list[CPU]) -> None:
     """Insert all CPUs in <cpus> into <connection>."""
-    for cpu in cpus:
-        insert_cpu(connection, cpu)
+    _insert_all(connection, cpus, "CPU")
         
 
 def insert_cpu(connection: sqlite3.Connection, cpu: CPU) -> None:
@@ -141,24 +769,18 @@ def fetch_cpus(connection: sqlite3.Connection, name_condition: str=None) -> list
     """Return a list of CPU objects reconstructed from the cpus and cpu_prices tables. The returned CPU 
     objects can be filtered through <name_condition> (and more in the future).
     """
-    query = """
-    SELECT cpus.name, cpus.brand, cpu_prices.website, cpu_prices.link, cpu_prices.price, cpu_prices.price_date
-    FROM cpus
-    JOIN cpu_prices ON cpus.id = cpu_prices.cpu_id
-    """
-    params = ()
+    return list(iter_cpus(connection, name_condition))
 
-    if name_condition:
-        query += " WHERE cpus.name LIKE ?"
-        params = (f"%{name_condition}%",)
 
-    try:
-        with connection:
-            rows = connection.execute(query, params).fetchall()
-        return [CPU(name=row[0], brand=row[1], website=row[2], link=row[3], price=row[4], date=row[5]) for row in rows]
-    except Exception as e:
-        print(f"Error: {e}")
-        return []
+def iter_cpus(connection: sqlite3.Connection, name_condition: str=None) -> Iterator[CPU]:
+    """Yield the CPU objects of fetch_cpus one at a time, reading the database in chunks."""
+    return iter_parts(connection, "cpu", name_condition)
+
+
+def fetch_cpus_page(connection: sqlite3.Connection, name_condition: str=None, limit: int=FETCH_PAGE_SIZE,
+                    after: Optional[int]=None) -> tuple[list[CPU], Optional[int]]:
+    """Return a page of at most <limit> CPU objects after the key <after>, and the key of the next page."""
+    return fetch_parts_page(connection, "cpu", name_condition, limit, after)
 
 
 # === GPU table functions ===
@@ -180,10 +802,9 @@ def create_gpus_table(connection: sqlite3.Connection) -> None:
         print(f"Error: {e}")
 
 
-def insert_all_gpus(connection: sqlite3.Connection, gpus: list[GPU]) -> None:
+def insert_all_gpus(connection: sqlite3.Connection, gpus: PartBatch | list[GPU]) -> None:
     """Insert all GPUs in <gpus> into <connection>."""
-    for gpu in gpus:
-        insert_gpu(connection, gpu)
+    _insert_all(connection, gpus, "GPU")
 
 
 def insert_gpu(connection: sqlite3.Connection, gpu: GPU) -> None:
@@ -203,28 +824,22 @@ def insert_gpu(connection: sqlite3.Connection, gpu: GPU) -> None:
     insert_part_price(connection, gpu)
 
 
-def fetch_gpus(connection: sqlite3.Connection, name_condition: str=None) -> list[CPU]:
+def fetch_gpus(connection: sqlite3.Connection, name_condition: str=None) -> list[GPU]:
     """Return a list of GPU objects reconstructed from the gpus and gpu_prices tables. The returned GPU 
     objects can be filtered through <name_condition> (and more in the future).
     """
-    query = """
-    SELECT gpus.name, gpus.brand, gpu_prices.website, gpu_prices.link, gpu_prices.price, gpu_prices.price_date
-    FROM gpus
-    JOIN gpu_prices ON gpus.id = gpu_prices.gpu_id
-    """
-    params = ()
+    return list(iter_gpus(connection, name_condition))
 
-    if name_condition:
-        query += " WHERE gpus.name LIKE ?"
-        params = (f"%{name_condition}%",)
 
-    try:
-        with connection:
-            rows = connection.execute(query, params).fetchall()
-        return [GPU(name=row[0], brand=row[1], website=row[2], link=row[3], price=row[4], date=row[5]) for row in rows]
-    except Exception as e:
-        print(f"Error: {e}")
-        return []
+def iter_gpus(connection: sqlite3.Connection, name_condition: str=None) -> Iterator[GPU]:
+    """Yield the GPU objects of fetch_gpus one at a time, reading the database in chunks."""
+    return iter_parts(connection, "gpu", name_condition)
+
+
+def fetch_gpus_page(connection: sqlite3.Connection, name_condition: str=None, limit: int=FETCH_PAGE_SIZE,
+                    after: Optional[int]=None) -> tuple[list[GPU], Optional[int]]:
+    """Return a page of at most <limit> GPU objects after the key <after>, and the key of the next page."""
+    return fetch_parts_page(connection, "gpu", name_condition, limit, after)
 
 
 # === motherboard table functions ===
@@ -246,10 +861,9 @@ def create_mobos_table(connection: sqlite3.Connection) -> None:
         print(f"Error: {e}")
 
 
-def insert_all_mobos(connection: sqlite3.Connection, mobos: list[MOBO]) -> None:
+def insert_all_mobos(connection: sqlite3.Connection, mobos: PartBatch | list[MOBO]) -> None:
     """Insert all motherboards in <mobos> into <connection>."""
-    for mobo in mobos:
-        insert_mobo(connection, mobo)
+    _insert_all(connection, mobos, "motherboard")
 
 
 def insert_mobo(connection: sqlite3.Connection, mobo: MOBO) -> None:
@@ -269,25 +883,19 @@ def insert_mobo(connection: sqlite3.Connection, mobo: MOBO) -> None:
     insert_part_price(connection, mobo)
 
 
-def fetch_mobos(connection: sqlite3.Connection, name_condition: str=None) -> list[CPU]:
+def fetch_mobos(connection: sqlite3.Connection, name_condition: str=None) -> list[MOBO]:
     """Return a list of MOBO objects reconstructed from the mobos and mobo_prices tables. The returned MOBO 
     objects can be filtered through <name_condition> (and more in the future).
     """
-    query = """
-    SELECT mobos.name, mobos.brand, mobo_prices.website, mobo_prices.link, mobo_prices.price, mobo_prices.price_date
-    FROM mobos
-    JOIN mobo_prices ON mobos.id = mobo_prices.mobo_id
-    """
-    params = ()
+    return list(iter_mobos(connection, name_condition))
 
-    if name_condition:
-        query += " WHERE mobos.name LIKE ?"
-        params = (f"%{name_condition}%",)
 
-    try:
-        with connection:
-            rows = connection.execute(query, params).fetchall()
-        return [MOBO(name=row[0], brand=row[1], website=row[2], link=row[3], price=row[4], date=row[5]) for row in rows]
-    except Exception as e:
-        print(f"Error: {e}")
-        return []
+def iter_mobos(connection: sqlite3.Connection, name_condition: str=None) -> Iterator[MOBO]:
+    """Yield the MOBO objects of fetch_mobos one at a time, reading the database in chunks."""
+    return iter_parts(connection, "mobo", name_condition)
+
+
+def fetch_mobos_page(connection: sqlite3.Connection, name_condition: str=None, limit: int=FETCH_PAGE_SIZE,
+                     after: Optional[int]=None) -> tuple[list[MOBO], Optional[int]]:
+    """Return a page of at most <limit> MOBO objects after the key <after>, and the key of the next page."""
+    return fetch_parts_page(connection, "mobo", name_condition, limit, after)
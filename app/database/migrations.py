@@ -0,0 +1,319 @@
+"""
+Versioned schema migrations for the local SQLite database.
+
+The schema version of a database is stored in PRAGMA user_version. Each entry of
+MIGRATIONS upgrades the schema by one version, and migrate() applies every
+migration the database has not seen yet, so an existing parts.db is upgraded in
+place. Each migration runs in its own transaction together with its version bump.
+"""
+
+import sqlite3
+import app.database.database as database
+from app.config import FETCH_CHUNK_SIZE
+from app.utils.parsing import price_to_cents, to_external_id
+
+
+PART_TYPES = ["cpu", "gpu", "mobo"]
+
+
+def _create_base_tables(connection: sqlite3.Connection) -> None:
+    """Version 1: the original part and price tables.
+
+    Tables are only created if they don't exist yet, so databases created before
+    versioning keep their data.
+    """
+    database.create_cpus_table(connection)
+    database.create_gpus_table(connection)
+    database.create_mobos_table(connection)
+
+    for part_type in PART_TYPES:
+        database.create_part_prices_table(connection, part_type)
+
+
+def _add_indexes_and_price_cents(connection: sqlite3.Connection) -> None:
+    """Version 2: unique part names, indexed price history, and integer prices.
+
+    - Parts sharing a name are merged into the one with the lowest id.
+    - Adds a unique index on the name of every part table.
+    - Adds a (<part_type>_id, price_date) index on every price table.
+    - Adds a price_cents column holding the price in cents, or NULL when missing,
+      and fills it from the existing text prices.
+    """
+    connection.create_function("price_to_cents", 1, price_to_cents, deterministic=True)
+
+    for part_type in PART_TYPES:
+        parts = f"{part_type}s"
+        prices = f"{part_type}_prices"
+        foreign_key = f"{part_type}_id"
+
+        connection.execute(f"""
+        UPDATE {prices} SET {foreign_key} = (
+            SELECT MIN(other.id) FROM {parts} AS part JOIN {parts} AS other ON part.name = other.name
+            WHERE part.id = {prices}.{foreign_key}
+        )
+        WHERE {foreign_key} NOT IN (SELECT MIN(id) FROM {parts} GROUP BY name)
+        """)
+        connection.execute(f"DELETE FROM {parts} WHERE id NOT IN (SELECT MIN(id) FROM {parts} GROUP BY name)")
+        connection.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{parts}_name ON {parts} (name)")
+
+        connection.execute(f"ALTER TABLE {prices} ADD COLUMN price_cents INTEGER")
+        connection.execute(f"UPDATE {prices} SET price_cents = price_to_cents(price)")
+        connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{prices}_part_date ON {prices} ({foreign_key}, price_date)")
+
+
+def _add_name_search_index(connection: sqlite3.Connection) -> None:
+    """Version 3: an FTS5 full-text index over the name and brand of every part.
+
+    The index is an external content table kept in sync with its part table by
+    triggers, and is built from the parts already stored.
+    """
+    for part_type in PART_TYPES:
+        parts = f"{part_type}s"
+        fts = f"{parts}_fts"
+
+        connection.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            name, brand, content='{parts}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+        connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {parts} BEGIN
+            INSERT INTO {fts} (rowid, name, brand) VALUES (new.id, new.name, new.brand);
+        END
+        """)
+        connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {parts} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, name, brand) VALUES ('delete', old.id, old.name, old.brand);
+        END
+        """)
+        connection.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE ON {parts} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, name, brand) VALUES ('delete', old.id, old.name, old.brand);
+            INSERT INTO {fts} (rowid, name, brand) VALUES (new.id, new.name, new.brand);
+        END
+        """)
+        connection.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _add_price_validity(connection: sqlite3.Connection) -> None:
+    """Version 4: price rows can cover a run of identical observations.
+
+    Adds a last_seen date and an observation count to every price table. Existing
+    rows are single observations, so last_seen starts as their price_date.
+    """
+    for part_type in PART_TYPES:
+        prices = f"{part_type}_prices"
+
+        connection.execute(f"ALTER TABLE {prices} ADD COLUMN last_seen TEXT")
+        connection.execute(f"ALTER TABLE {prices} ADD COLUMN observations INTEGER NOT NULL DEFAULT 1")
+        connection.execute(f"UPDATE {prices} SET last_seen = price_date")
+
+
+def _add_price_summaries(connection: sqlite3.Connection) -> None:
+    """Version 5: a '<part_type>_price_summary' table per category holding the latest,
+    lowest, and highest price and the observation count of every part.
+
+    The tables are kept up to date by the ingestion path, and are filled here from the
+    price history already stored.
+    """
+    for part_type in PART_TYPES:
+        foreign_key = f"{part_type}_id"
+
+        connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {part_type}_price_summary (
+            {foreign_key} INTEGER PRIMARY KEY,
+            latest_price TEXT,
+            latest_cents INTEGER,
+            latest_link TEXT,
+            latest_date TEXT,
+            lowest_cents INTEGER,
+            lowest_date TEXT,
+            highest_cents INTEGER,
+            highest_date TEXT,
+            observations INTEGER NOT NULL,
+            FOREIGN KEY ({foreign_key}) REFERENCES {part_type}s(id)
+        )
+        """)
+
+        _fill_price_summaries(connection, part_type)
+
+
+def _fill_price_summaries(connection: sqlite3.Connection, part_type: str) -> None:
+    """Fill the empty '<part_type>_price_summary' table from the stored price history."""
+    history = connection.execute(f"""
+    SELECT {part_type}_id, price, price_cents, link, price_date, last_seen, observations FROM {part_type}_prices
+    WHERE {part_type}_id IS NOT NULL
+    ORDER BY price_date, id
+    """)
+    while rows := history.fetchmany(FETCH_CHUNK_SIZE):
+        connection.executemany(database.summary_upsert_query(part_type), rows)
+
+
+def _add_update_runs(connection: sqlite3.Connection) -> None:
+    """Version 6: the 'update_runs' and 'update_pages' tables, recording every database
+    update and the listing pages it has stored, so an interrupted update can resume.
+    """
+    connection.execute("""
+    CREATE TABLE IF NOT EXISTS update_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT NOT NULL,
+        finished_at TEXT
+    )
+    """)
+
+    connection.execute("""
+    CREATE TABLE IF NOT EXISTS update_pages (
+        run_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        url TEXT NOT NULL,
+        stored INTEGER NOT NULL,
+        PRIMARY KEY (run_id, url),
+        FOREIGN KEY (run_id) REFERENCES update_runs(id)
+    )
+    """)
+
+
+def _add_crawl_pages(connection: sqlite3.Connection) -> None:
+    """Version 7: the 'crawl_pages' table, recording how often every listing page was fetched
+    and found changed, from which updates schedule the pages they fetch.
+    """
+    connection.execute("""
+    CREATE TABLE IF NOT EXISTS crawl_pages (
+        url TEXT PRIMARY KEY,
+        category TEXT NOT NULL,
+        signature TEXT NOT NULL,
+        listings INTEGER NOT NULL,
+        fetches INTEGER NOT NULL,
+        changes INTEGER NOT NULL,
+        observed_days REAL NOT NULL,
+        last_fetched TEXT NOT NULL,
+        last_changed TEXT NOT NULL
+    )
+    """)
+
+
+def _add_external_ids(connection: sqlite3.Connection) -> None:
+    """Version 8: parts are identified by the retailer item number in the links of their listings.
+
+    - Adds an external_id column (e.g. "newegg:N82E16819113843") with a unique index to every
+      part table, and makes the index on names non-unique, since different products can
+      share an extracted name.
+    - Adds a '<part_type>_aliases' table mapping the former names of renamed parts to their id.
+    - Re-keys the stored history by the item numbers of its links: parts listed with the same
+      item number under several names (title edits) are merged into the one listed first,
+      renamed to the most recent name, and a part listed with several item numbers (products
+      sharing a name) is split into one part per item number. Summaries are then rebuilt.
+    """
+    connection.create_function("external_id", 2, to_external_id, deterministic=True)
+
+    for part_type in PART_TYPES:
+        parts = f"{part_type}s"
+        prices = f"{part_type}_prices"
+        foreign_key = f"{part_type}_id"
+
+        connection.execute(f"ALTER TABLE {parts} ADD COLUMN external_id TEXT")
+        connection.execute(f"DROP INDEX IF EXISTS idx_{parts}_name")
+        connection.execute(f"CREATE INDEX idx_{parts}_name ON {parts} (name)")
+        connection.execute(f"CREATE UNIQUE INDEX idx_{parts}_external_id ON {parts} (external_id)")
+        connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {part_type}_aliases (
+            name TEXT PRIMARY KEY,
+            {foreign_key} INTEGER NOT NULL,
+            FOREIGN KEY ({foreign_key}) REFERENCES {parts}(id)
+        )
+        """)
+
+        # every (part, item number) pair of the history, in the order they were first listed
+        pairs = connection.execute(f"""
+        SELECT {foreign_key}, external_id(website, link) AS external_id, MIN(id), MAX(id) FROM {prices}
+        WHERE {foreign_key} IS NOT NULL AND external_id IS NOT NULL
+        GROUP BY {foreign_key}, external_id
+        ORDER BY MIN(id)
+        """).fetchall()
+        names = dict(connection.execute(f"SELECT id, name FROM {parts}").fetchall())
+
+        owners = {} # item number -> id of the part it identifies
+        claimed = set() # ids of the parts in <owners>
+        newest = {} # part id -> (latest price row id, name it was listed under)
+        moves = [] # (owner, part, item number) of the price rows to move to their owner
+        for part_id, external_id, _, last_row in pairs:
+            if part_id not in names:
+                continue
+            if external_id not in owners:
+                owner = part_id
+                if part_id in claimed: # another product listed under the same name
+                    owner = connection.execute(f"INSERT INTO {parts} (brand, name) SELECT brand, name FROM {parts} "
+                                               f"WHERE id = ?", (part_id,)).lastrowid
+                    names[owner] = names[part_id]
+                owners[external_id] = owner
+                claimed.add(owner)
+                connection.execute(f"UPDATE {parts} SET external_id = ? WHERE id = ?", (external_id, owner))
+
+            owner = owners[external_id]
+            if owner != part_id:
+                moves.append((owner, part_id, external_id))
+            if last_row > newest.get(owner, (0, None))[0]:
+                newest[owner] = (last_row, names[part_id])
+
+        connection.executemany(f"UPDATE {prices} SET {foreign_key} = ? WHERE {foreign_key} = ? "
+                               f"AND external_id(website, link) = ?", moves)
+
+        alias_query = f"INSERT OR REPLACE INTO {part_type}_aliases (name, {foreign_key}) VALUES (?, ?)"
+        for owner, (_, name) in newest.items():
+            if name != names[owner]:
+                connection.execute(f"UPDATE {parts} SET name = ? WHERE id = ?", (name, owner))
+                connection.execute(alias_query, (names[owner], owner))
+                names[owner] = name
+
+        # parts whose whole history moved are merged into the part of their item number
+        for owner, part_id, _ in moves:
+            if part_id in names and not connection.execute(f"SELECT 1 FROM {prices} WHERE {foreign_key} = ?",
+                                                           (part_id,)).fetchone():
+                connection.execute(f"UPDATE {part_type}_aliases SET {foreign_key} = ? WHERE {foreign_key} = ?",
+                                   (owner, part_id))
+                if names[part_id] != names[owner]:
+                    connection.execute(alias_query, (names[part_id], owner))
+                connection.execute(f"DELETE FROM {parts} WHERE id = ?", (part_id,))
+                del names[part_id]
+
+        if moves:
+            connection.execute(f"DELETE FROM {part_type}_price_summary")
+            _fill_price_summaries(connection, part_type)
+
+
+MIGRATIONS = [
+    _create_base_tables,
+    _add_indexes_and_price_cents,
+    _add_name_search_index,
+    _add_price_validity,
+    _add_price_summaries,
+    _add_update_runs,
+    _add_crawl_pages,
+    _add_external_ids,
+]
+
+
+def get_version(connection: sqlite3.Connection) -> int:
+    """Return the schema version of <connection>."""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """Apply every pending migration to <connection> and return its new schema version.
+
+    A failed migration is rolled back and re-raised, leaving the database at the
+    last version that was fully applied.
+    """
+    version = get_version(connection)
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        connection.execute("BEGIN")
+        try:
+            migration(connection)
+            connection.execute(f"PRAGMA user_version = {number}")
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+    return get_version(connection)
@@ -0,0 +1,75 @@
+"""
+Session-level cache of query results.
+
+Within an interactive session the same pages and searches are often requested
+again, while the data only changes when an update commits. QueryCache keeps the
+results of the most recent queries on a connection and drops all of them as soon
+as the database changes, which it detects before every lookup from
+PRAGMA data_version (bumped by commits of other connections, such as a running
+update) and the connection's own total_changes.
+"""
+
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, Hashable
+from app.config import QUERY_CACHE_SIZE
+
+
+class QueryCache():
+    """A bounded LRU cache of the results of queries on one connection.
+
+    Cached results are shared between callers, so they must not be modified.
+
+    === Attributes ===
+    connection: the connection the queries run on
+    max_entries: the number of results kept before the least recently used is dropped
+    hits: the number of lookups answered from the cache
+    misses: the number of lookups that ran their query
+    """
+    connection: sqlite3.Connection
+    max_entries: int
+    hits: int
+    misses: int
+
+    def __init__(self, connection: sqlite3.Connection, max_entries: int=QUERY_CACHE_SIZE) -> None:
+        """Initialize a new, empty QueryCache on <connection>."""
+        self.connection = connection
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._version = None
+
+    def _database_version(self) -> tuple[int, int]:
+        """Return a value that changes whenever the database of <connection> is changed."""
+        return self.connection.execute("PRAGMA data_version").fetchone()[0], self.connection.total_changes
+
+    def call(self, query: Callable, *args: Hashable) -> object:
+        """Return query(<connection>, *<args>), from the cache if it was called with the same
+        arguments since the database last changed.
+        """
+        version = self._database_version()
+        if version != self._version:
+            self._results.clear()
+            self._version = version
+
+        key = (query, args)
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        self.misses += 1
+        result = query(self.connection, *args)
+        self._results[key] = result
+        if len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._results.clear()
+
+    def __len__(self) -> int:
+        """Return the number of cached results."""
+        return len(self._results)
@@ -8,23 +8,74 @@ in a local SQLite database.
 
 Future versions may expand to additional part types, websites, 
 and application features such as filtering, comparison, and price tracking.
+
+Every command imports its module only when it runs, so a command (or --help)
+never pays for the dependencies of the others: the scraping stack (requests,
+bs4) is only loaded by --update, and numpy only by --trends.
 """
 
 import argparse
-from app.cli import interactive, updater
+import sys
 
 
 def main():
     parser = argparse.ArgumentParser(description="PC Part Scraper CLI")
     parser.add_argument("--interactive", action="store_true", help="Run interactive terminal app")
     parser.add_argument("--update", action="store_true", help="Update the local database")
+    parser.add_argument("--restart", action="store_true",
+                        help="With --update, start over instead of resuming an interrupted update")
+    parser.add_argument("--budget", type=int, default=None, metavar="PAGES",
+                        help="With --update, fetch about this many pages, the most likely to have changed "
+                             "(default: CRAWL_BUDGET; 0 fetches every page)")
+    parser.add_argument("--profile", action="store_true",
+                        help="With --update, profile the run and print its hottest functions and allocations")
+    parser.add_argument("--compact", action="store_true", help="Store each run of unchanged prices as a single row")
+    parser.add_argument("--trends", action="store_true", help="Show the biggest price movers in the database")
+    parser.add_argument("--days", type=int, default=30, help="Window of --trends in days (default: 30)")
+    parser.add_argument("--category", choices=["cpu", "gpu", "mobo"], action="append",
+                        help="Category of --trends; may be repeated (default: all)")
+    parser.add_argument("--top", type=int, default=10, help="Number of parts shown per category by --trends")
+    parser.add_argument("--serve", action="store_true", help="Serve price lookups as a local JSON HTTP API")
+    parser.add_argument("--host", default=None, help="Interface --serve listens on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=None, help="Port --serve listens on (default: 8080)")
+
+    subparsers = parser.add_subparsers(dest="command", metavar="{query,export}")
+    for command, description in [("query", "Write the latest price of every matching part"),
+                                 ("export", "Write the full price history of every matching part")]:
+        subparser = subparsers.add_parser(command, help=description, description=description)
+        # SUPPRESS keeps the subcommand from resetting a --category given before it
+        subparser.add_argument("--category", choices=["cpu", "gpu", "mobo"], action="append", default=argparse.SUPPRESS,
+                               help="Category to include; may be repeated (default: all)")
+        subparser.add_argument("--name", help="Only parts whose name matches this search")
+        subparser.add_argument("--brand", help="Only parts of this brand")
+        subparser.add_argument("--since", metavar="YYYY-MM-DD", help="Only prices seen on or after this date")
+        subparser.add_argument("--until", metavar="YYYY-MM-DD", help="Only prices seen on or before this date")
+        subparser.add_argument("--min-price", metavar="PRICE", help="Only prices of at least this amount")
+        subparser.add_argument("--max-price", metavar="PRICE", help="Only prices of at most this amount")
+        subparser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Output format (default: jsonl)")
+        subparser.add_argument("--output", "-o", metavar="PATH", help="File to write (default: stdout)")
 
     args = parser.parse_args()
 
-    if args.interactive:
+    if args.command:
+        from app.cli import export
+        sys.exit(export.run(args.command, args))
+    elif args.interactive:
+        from app.cli import interactive
         interactive.run_ui()
     elif args.update:
-        updater.update_database()
+        from app.cli import updater
+        updater.update_database(resume=not args.restart, profile=args.profile, budget=args.budget)
+    elif args.compact:
+        from app.cli import updater
+        updater.compact_database()
+    elif args.trends:
+        from app.cli import trends
+        trends.show_trends(args.category, args.days, args.top)
+    elif args.serve:
+        from app.cli import server
+        from app.config import SERVER_HOST, SERVER_PORT
+        server.run_server(args.host or SERVER_HOST, args.port if args.port is not None else SERVER_PORT)
     else:
         parser.print_help()
 
@@ -8,6 +8,8 @@ class CPU(PcPart):
     
     This class holds relevant CPU specification (expand?).
     """
+    __slots__ = ()
+
     name: str
     website: str
     link: str
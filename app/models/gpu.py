@@ -8,6 +8,8 @@ class GPU(PcPart):
     
     This class holds relevant GPU specficiation (expand?).
     """
+    __slots__ = ()
+
     name: str
     website: str
     link: str
@@ -8,6 +8,8 @@ class MOBO(PcPart):
     
     This class holds relevant motherboard specficiation (expand?).
     """
+    __slots__ = ()
+
     name: str
     website: str
     link: str
@@ -0,0 +1,96 @@
+"""Defines the PartBatch class used to hold many listings of one part type column by column."""
+
+import sys
+from typing import Iterable, Iterator, Optional
+from app.models.pc_part import PcPart
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Return the interned copy of <value>, or None if <value> is None."""
+    return sys.intern(value) if value is not None else None
+
+
+class PartBatch():
+    """A columnar collection of pc part listings of a single type.
+
+    Listings are stored as parallel lists instead of one object each. Strings that
+    repeat across listings (names, brands, websites, links, and dates) are interned, so
+    every repeat costs one pointer. Iterating a PartBatch yields part objects,
+    so it can be used wherever a list of parts is expected.
+
+    === Attributes ===
+    part_class: the PcPart subclass of every listing in this batch
+    names: the name of each listing
+    websites: the website of each listing
+    links: the website link of each listing
+    prices: the price of each listing
+    dates: the date each price was found
+    brands: the brand of each listing
+
+    === Representation Invariants ===
+    - all columns have the same length
+    """
+    __slots__ = ("part_class", "names", "websites", "links", "prices", "dates", "brands")
+
+    part_class: type
+    names: list[str]
+    websites: list[str]
+    links: list[str]
+    prices: list[str]
+    dates: list[str]
+    brands: list[str]
+
+    def __init__(self, part_class: type) -> None:
+        """Initialize a new, empty PartBatch of <part_class> listings."""
+        self.part_class = part_class
+        self.names = []
+        self.websites = []
+        self.links = []
+        self.prices = []
+        self.dates = []
+        self.brands = []
+
+    @classmethod
+    def from_parts(cls, part_class: type, parts: Iterable[PcPart]) -> "PartBatch":
+        """Return a new PartBatch of <part_class> holding every part in <parts>."""
+        batch = cls(part_class)
+        for part in parts:
+            batch.append(part.name, part.website, part.link, part.price, part.date, part.brand)
+        return batch
+
+    @property
+    def part_type(self) -> str:
+        """Return the lowercase type name of this batch's parts (e.g. "cpu"), as used by the database."""
+        return self.part_class.__name__.lower()
+
+    def append(self, name: str, website: str, link: str, price: str, date: str, brand: str) -> None:
+        """Add a listing to the end of this batch."""
+        self.names.append(_intern(name))
+        self.websites.append(_intern(website))
+        self.links.append(_intern(link))
+        self.prices.append(price)
+        self.dates.append(_intern(date))
+        self.brands.append(_intern(brand))
+
+    def extend(self, other: "PartBatch") -> None:
+        """Add every listing of <other> to the end of this batch."""
+        self.names.extend(other.names)
+        self.websites.extend(other.websites)
+        self.links.extend(other.links)
+        self.prices.extend(other.prices)
+        self.dates.extend(other.dates)
+        self.brands.extend(other.brands)
+
+    def __len__(self) -> int:
+        """Return the number of listings in this batch."""
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> PcPart:
+        """Return the listing at <index> as a part object."""
+        return self.part_class(self.names[index], self.websites[index], self.links[index],
+                               self.prices[index], self.dates[index], self.brands[index])
+
+    def __iter__(self) -> Iterator[PcPart]:
+        """Yield every listing in this batch as a part object."""
+        for row in zip(self.names, self.websites, self.links, self.prices, self.dates, self.brands):
+            yield self.part_class(*row)
@@ -18,6 +18,8 @@ class PcPart():
     - website == "newegg" or website == "bestbuy" or 
       website == "amazon".
     """
+    __slots__ = ("name", "website", "link", "price", "date", "brand")
+
     name: str
     website: str
     link: str
@@ -0,0 +1,60 @@
+"""Defines the PriceSummary class used to represent the price statistics of a pc part."""
+
+from typing import Optional
+
+
+def format_cents(cents: Optional[int]) -> str:
+    """Return <cents> formatted like a scraped price (e.g. "1,299.99"), or "N/A" if None."""
+    return f"{cents / 100:,.2f}" if cents is not None else "N/A"
+
+
+class PriceSummary():
+    """The current, lowest, and highest price of a pc part.
+
+    === Attributes ===
+    name: the name of the pc part
+    brand: the brand that makes the pc part
+    latest_price: the most recently observed price
+    latest_date: the date of the most recent observation
+    latest_link: the website link of the most recent observation
+    lowest_cents: the lowest price ever observed in cents, or None if never priced
+    lowest_date: the date the lowest price was first observed
+    highest_cents: the highest price ever observed in cents, or None if never priced
+    highest_date: the date the highest price was first observed
+    observations: the number of times the price of the pc part was observed
+    """
+    __slots__ = ("name", "brand", "latest_price", "latest_date", "latest_link", "lowest_cents",
+                 "lowest_date", "highest_cents", "highest_date", "observations")
+
+    name: str
+    brand: str
+    latest_price: str
+    latest_date: str
+    latest_link: str
+    lowest_cents: Optional[int]
+    lowest_date: Optional[str]
+    highest_cents: Optional[int]
+    highest_date: Optional[str]
+    observations: int
+
+    def __init__(self, name: str, brand: str, latest_price: str, latest_date: str, latest_link: str,
+                 lowest_cents: Optional[int], lowest_date: Optional[str], highest_cents: Optional[int],
+                 highest_date: Optional[str], observations: int) -> None:
+        """Initialize a new PriceSummary object."""
+        self.name = name
+        self.brand = brand
+        self.latest_price = latest_price
+        self.latest_date = latest_date
+        self.latest_link = latest_link
+        self.lowest_cents = lowest_cents
+        self.lowest_date = lowest_date
+        self.highest_cents = highest_cents
+        self.highest_date = highest_date
+        self.observations = observations
+
+    def __str__(self) -> str:
+        """Return a formatted version of this PriceSummary's attributes."""
+        return (f"({self.name}, now {self.latest_price} ({self.latest_date}), "
+                f"low {format_cents(self.lowest_cents)} ({self.lowest_date or 'never'}), "
+                f"high {format_cents(self.highest_cents)} ({self.highest_date or 'never'}), "
+                f"{self.observations} observations)")
@@ -0,0 +1,198 @@
+"""
+Persistent, conditional HTTP response cache for the web scrapers.
+
+Responses are stored in a SQLite file keyed by URL, together with their ETag,
+Last-Modified header, and a hash of the body. Later fetches of the same URL send
+conditional headers, and the items previously extracted from a page are kept
+alongside it so an unchanged page never has to be parsed again. Entries are
+evicted once older than a TTL, and least recently used entries are evicted once
+the stored bodies exceed a size cap.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+from app.config import CACHE_PATH, CACHE_TTL, CACHE_MAX_BYTES
+
+
+class CacheEntry():
+    """A cached response.
+
+    === Attributes ===
+    url: the URL the response was fetched from
+    text: the body of the response
+    body_hash: the sha256 hex digest of the body
+    etag: the ETag header of the response, if any
+    last_modified: the Last-Modified header of the response, if any
+    items: the items previously extracted from the body, or None if never parsed
+    """
+    url: str
+    text: str
+    body_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    items: Optional[list]
+
+    def __init__(self, url: str, text: str, body_hash: str, etag: Optional[str],
+                 last_modified: Optional[str], items: Optional[list]) -> None:
+        """Initialize a new CacheEntry."""
+        self.url = url
+        self.text = text
+        self.body_hash = body_hash
+        self.etag = etag
+        self.last_modified = last_modified
+        self.items = items
+
+    def conditional_headers(self) -> dict:
+        """Return the request headers that ask the server to skip an unchanged body."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def hash_body(text: str) -> str:
+    """Return the sha256 hex digest of <text>."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class PageCache():
+    """A SQLite-backed HTTP response cache, safe to share between threads.
+
+    === Attributes ===
+    path: the path of the cache database
+    ttl: the number of seconds an entry is kept after it was last fetched
+    max_bytes: the maximum total size of the stored (compressed) bodies
+    """
+    path: str
+    ttl: int
+    max_bytes: int
+
+    def __init__(self, path: str=CACHE_PATH, ttl: int=CACHE_TTL, max_bytes: int=CACHE_MAX_BYTES) -> None:
+        """Initialize a new PageCache, creating its table if needed."""
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                body BLOB,
+                items TEXT,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL
+            )
+            """)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for <url>, or None if absent or expired."""
+        query = """
+        SELECT etag, last_modified, body_hash, body, items, fetched_at
+        FROM responses WHERE url=?
+        """
+        with self._lock, self._connection:
+            row = self._connection.execute(query, (url,)).fetchone()
+            if not row:
+                return None
+
+            if time.time() - row[5] > self.ttl:
+                self._connection.execute("DELETE FROM responses WHERE url=?", (url,))
+                return None
+
+            self._connection.execute("UPDATE responses SET accessed_at=? WHERE url=?", (time.time(), url))
+
+        items = json.loads(row[4]) if row[4] is not None else None
+        return CacheEntry(url, zlib.decompress(row[3]).decode(), row[2], row[0], row[1], items)
+
+    def put(self, url: str, text: str, etag: Optional[str]=None,
+            last_modified: Optional[str]=None) -> CacheEntry:
+        """Store the response for <url> with body <text> and return its entry.
+
+        Previously extracted items are kept when the body is unchanged.
+        """
+        body_hash = hash_body(text)
+        body = zlib.compress(text.encode())
+        now = time.time()
+
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT items FROM responses WHERE url=? AND body_hash=?", (url, body_hash)).fetchone()
+            items = row[0] if row else None
+
+            self._connection.execute("""
+            INSERT OR REPLACE INTO responses
+            (url, etag, last_modified, body_hash, body, items, size, fetched_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (url, etag, last_modified, body_hash, body, items, len(body), now, now))
+
+            self._evict()
+
+        return CacheEntry(url, text, body_hash, etag, last_modified, json.loads(items) if items else None)
+
+    def refresh(self, url: str) -> None:
+        """Mark the entry for <url> as freshly fetched (e.g. after a 304 response)."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE responses SET fetched_at=?, accessed_at=? WHERE url=?", (now, now, url))
+
+    def set_items(self, url: str, body_hash: str, items: list) -> None:
+        """Store the <items> extracted from the body of <url> with hash <body_hash>."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE responses SET items=? WHERE url=? AND body_hash=?", (json.dumps(items), url, body_hash))
+
+    def _evict(self) -> None:
+        """Delete expired entries, then least recently used entries until under <max_bytes>.
+
+        Must be called while holding the lock.
+        """
+        self._connection.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl,))
+
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._connection.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM responses WHERE url=?", (url,))
+            total -= size
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self._connection.close()
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> PageCache:
+    """Return the PageCache shared by all scrapers, creating it if needed."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+        return _cache
+
+
+def set_cache(cache: Optional[PageCache]) -> None:
+    """Replace the shared PageCache with <cache> (or reset it when None)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,63 @@
+"""
+Registry of the part categories scraped from each website.
+
+A category declares where its listings are found and how a listing title is
+turned into a part, so every category is scraped by the same code. Adding a
+category (or another listing of an existing one) only means adding an entry here.
+"""
+
+from typing import Callable, Optional
+from app.models.pc_part import PcPart
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+from app.models.motherboard import MOBO
+from app.utils.parsing import TitleInfo, extract_cpu_info, extract_gpu_info, extract_mobo_info
+
+
+class Category():
+    """A category of pc parts listed on a website.
+
+    === Attributes ===
+    name: the name of this category, matching its database tables (e.g. "cpu")
+    label: the plural name shown to users (e.g. "CPUs")
+    part_class: the PcPart subclass of this category's listings
+    website: the website the listings are scraped from
+    listing_urls: URL templates of every listing of this category, with a {page} placeholder
+    extract_info: returns the name and brand of a part from its listing title, or None if unrecognised
+    """
+    name: str
+    label: str
+    part_class: type
+    website: str
+    listing_urls: list[str]
+    extract_info: Callable[[str], Optional[TitleInfo]]
+
+    def __init__(self, name: str, label: str, part_class: type[PcPart], website: str,
+                 listing_urls: list[str], extract_info: Callable[[str], Optional[TitleInfo]]) -> None:
+        """Initialize a new Category."""
+        self.name = name
+        self.label = label
+        self.part_class = part_class
+        self.website = website
+        self.listing_urls = listing_urls
+        self.extract_info = extract_info
+
+
+CATEGORIES = {
+    "cpu": Category(
+        "cpu", "CPUs", CPU, "newegg",
+        ["https://www.newegg.ca/p/pl?N=100007670%204814%208000&page={page}&ComboBundle=true"],
+        extract_cpu_info,
+    ),
+    "gpu": Category(
+        "gpu", "GPUs", GPU, "newegg",
+        ["https://www.newegg.ca/p/pl?N=100007708%208000&page={page}&ComboBundle=true"],
+        extract_gpu_info,
+    ),
+    "mobo": Category(
+        "mobo", "motherboards", MOBO, "newegg",
+        ["https://www.newegg.ca/p/pl?N=100007624%20601413462%20601413455%208000&page={page}&ComboBundle=true", # AMD
+         "https://www.newegg.ca/p/pl?N=100007626%208000%20601413471%20601458446&page={page}&ComboBundle=true"], # Intel
+        extract_mobo_info,
+    ),
+}
@@ -0,0 +1,121 @@
+"""
+Shared HTTP client for the web scrapers.
+
+Every request goes through one pooled requests.Session, so connections are kept
+alive and reused across pages. Requests have a timeout, respect the per-host rate
+limit, and are retried with exponential backoff and jitter on connection errors,
+429, and 5xx responses. Every attempt is recorded in the shared metrics.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import (HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_BACKOFF, HTTP_BACKOFF_MAX,
+                        HTTP_POOL_SIZE, HTTP_USER_AGENT)
+from app.scraper.ratelimit import get_limiter
+from app.utils.metrics import get_metrics
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient():
+    """A pooled HTTP client with timeouts and retries.
+
+    === Attributes ===
+    timeout: seconds to wait for a response before giving up on an attempt
+    max_retries: the number of times a failed request is retried
+    backoff: the base retry delay in seconds, doubled on every retry
+    backoff_max: the largest delay between two attempts
+    rate_limit: whether requests wait on the shared per-host rate limit
+    session: the underlying session holding the connection pool
+    """
+    timeout: float
+    max_retries: int
+    backoff: float
+    backoff_max: float
+    rate_limit: bool
+    session: requests.Session
+
+    def __init__(self, timeout: float=HTTP_TIMEOUT, max_retries: int=HTTP_MAX_RETRIES,
+                 backoff: float=HTTP_BACKOFF, backoff_max: float=HTTP_BACKOFF_MAX,
+                 pool_size: int=HTTP_POOL_SIZE, rate_limit: bool=True) -> None:
+        """Initialize a new HttpClient with its own connection pool."""
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.rate_limit = rate_limit
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = HTTP_USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str, headers: Optional[dict]=None) -> requests.Response:
+        """Return the response of a GET request to <url>.
+
+        Raises requests.HTTPError if the final attempt still has an error status,
+        or the last connection error if every attempt failed to connect.
+        """
+        metrics = get_metrics()
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                metrics.inc("http_retries_total")
+            if self.rate_limit:
+                metrics.inc("ratelimit_wait_seconds_total", get_limiter(url).acquire())
+            try:
+                with metrics.timer("http_request_seconds"):
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.inc("http_errors_total")
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            metrics.inc("http_requests_total", status=response.status_code)
+            metrics.inc("http_response_bytes_total", len(response.content))
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response
+
+            time.sleep(self._delay(attempt, response.headers.get("Retry-After")))
+
+    def _delay(self, attempt: int, retry_after: Optional[str]=None) -> float:
+        """Return the number of seconds to wait before retry number <attempt> + 1.
+
+        Uses full jitter over an exponentially growing window, unless the server
+        asked for a specific delay through <retry_after>.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the HttpClient shared by all scrapers, creating it if needed."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_client(client: Optional[HttpClient]) -> None:
+    """Replace the shared HttpClient with <client> (or reset it when None)."""
+    global _client
+    with _client_lock:
+        _client = client
@@ -0,0 +1,171 @@
+"""
+HTML parser backends for the Newegg listing pages.
+
+Every backend extracts the same (title, link, price) items from a listing page
+and the same page count from its pagination, so they can be swapped freely:
+
+- "html.parser": builds the full BeautifulSoup tree with the standard library
+  parser. Always available, and identical to the original scraping behaviour.
+- "lxml": BeautifulSoup on top of the lxml C parser, only materialising the
+  item cells of the product grid. Requires lxml.
+- "selectolax": the selectolax C parser queried with CSS selectors. Requires
+  selectolax.
+
+"auto" picks the fastest backend that is installed.
+"""
+
+import importlib.util
+from functools import lru_cache
+from typing import Callable, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from app.config import HTML_PARSER
+
+
+Item = tuple[str, Optional[str], str]
+
+
+def _has_class(class_name: str) -> Callable[[Optional[str]], bool]:
+    """Return a SoupStrainer predicate matching tags with <class_name> among their classes.
+
+    While straining, BeautifulSoup passes the raw class attribute (e.g. "item-cell is-sponsored"),
+    so a plain string would only match tags with exactly that one class.
+    """
+    def matches(value: Optional[str]) -> bool:
+        return value is not None and class_name in value.split()
+    return matches
+
+
+class NeweggParser():
+    """Extracts listings from Newegg pages.
+
+    This is an abstract class. Only subclasses should be instantiated.
+
+    === Attributes ===
+    name: the name of this backend
+    """
+    name: str
+
+    def parse_items(self, text: str) -> list[Item]:
+        """Return the (title, link, price) of every listing in the page <text>.
+
+        The price is "N/A" when a listing has no current price.
+        """
+        raise NotImplementedError
+
+    def parse_page_count(self, text: str) -> int:
+        """Return the number of listing pages given in the pagination of the page <text>."""
+        raise NotImplementedError
+
+
+class SoupParser(NeweggParser):
+    """A BeautifulSoup backend.
+
+    === Attributes ===
+    features: the parser BeautifulSoup builds its tree with
+    restrict: whether only the item cells of the page are materialised
+    """
+    features: str
+    restrict: bool
+
+    def __init__(self, features: str="html.parser", restrict: bool=False) -> None:
+        """Initialize a new SoupParser."""
+        self.name = features
+        self.features = features
+        self.restrict = restrict
+
+    def parse_items(self, text: str) -> list[Item]:
+        """Return the (title, link, price) of every listing in the page <text>."""
+        strainer = SoupStrainer(name="div", class_=_has_class("item-cell")) if self.restrict else None
+        soup = BeautifulSoup(text, self.features, parse_only=strainer)
+        items = []
+
+        for tag in soup.find_all(name="div", class_="item-cell"):
+            title_tag = tag.find(name="a", class_="item-title")
+            title = title_tag.text # contains all relevant info about product
+            link = title_tag.get(key="href")
+
+            try: # make sure price exists
+                price_tag = tag.find(name="li", class_="price-current")
+                price = price_tag.find(name="strong").text + price_tag.find(name="sup").text
+            except AttributeError:
+                price = "N/A"
+
+            items.append((title, link, price))
+
+        return items
+
+    def parse_page_count(self, text: str) -> int:
+        """Return the number of listing pages given in the pagination of the page <text>."""
+        strainer = SoupStrainer(name="span", class_=_has_class("list-tool-pagination-text")) if self.restrict else None
+        soup = BeautifulSoup(text, self.features, parse_only=strainer)
+
+        pages_tag = soup.find(name="span", class_="list-tool-pagination-text").find(name="strong")
+        return int(pages_tag.text.split('/')[-1])
+
+
+class SelectolaxParser(NeweggParser):
+    """A selectolax backend."""
+
+    def __init__(self) -> None:
+        """Initialize a new SelectolaxParser."""
+        from selectolax.lexbor import LexborHTMLParser
+        self.name = "selectolax"
+        self._html_parser = LexborHTMLParser
+
+    def parse_items(self, text: str) -> list[Item]:
+        """Return the (title, link, price) of every listing in the page <text>."""
+        tree = self._html_parser(text)
+        items = []
+
+        for tag in tree.css("div.item-cell"):
+            title_tag = tag.css_first("a.item-title")
+            title = title_tag.text()
+            link = title_tag.attributes.get("href")
+
+            price = "N/A"
+            price_tag = tag.css_first("li.price-current")
+            if price_tag is not None:
+                dollars = price_tag.css_first("strong")
+                cents = price_tag.css_first("sup")
+                if dollars is not None and cents is not None:
+                    price = dollars.text() + cents.text()
+
+            items.append((title, link, price))
+
+        return items
+
+    def parse_page_count(self, text: str) -> int:
+        """Return the number of listing pages given in the pagination of the page <text>."""
+        pages_tag = self._html_parser(text).css_first("span.list-tool-pagination-text strong")
+        return int(pages_tag.text().split('/')[-1])
+
+
+def available_backends() -> list[str]:
+    """Return the names of the installed backends, fastest first."""
+    backends = []
+    if importlib.util.find_spec("selectolax"):
+        backends.append("selectolax")
+    if importlib.util.find_spec("lxml"):
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+@lru_cache(maxsize=None)
+def get_parser(backend: str=HTML_PARSER) -> NeweggParser:
+    """Return a parser for <backend>, or for the fastest installed backend if "auto".
+
+    Parsers hold no state, so one instance per backend is shared.
+    Raises ValueError if <backend> is unknown or not installed.
+    """
+    if backend == "auto":
+        backend = available_backends()[0]
+
+    if backend not in available_backends():
+        raise ValueError(f"HTML parser backend '{backend}' is not available.")
+
+    if backend == "selectolax":
+        return SelectolaxParser()
+    if backend == "lxml":
+        return SoupParser("lxml", restrict=True)
+    return SoupParser("html.parser")
@@ -0,0 +1,67 @@
+"""
+Rate limiting for the web scrapers.
+
+Provides a thread-safe token bucket, and a registry holding one bucket per host
+so that concurrent fetches to the same website share a single request budget.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+from app.config import SCRAPER_RATE, SCRAPER_BURST
+
+
+class TokenBucket():
+    """A thread-safe token bucket rate limiter.
+
+    === Attributes ===
+    rate: the number of tokens added to the bucket per second
+    capacity: the maximum number of tokens the bucket can hold
+
+    === Representation Invariants ===
+    - rate > 0
+    - capacity >= 1
+    """
+    rate: float
+    capacity: int
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a new, full TokenBucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available, consume it, and return the number of
+        seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url: str) -> TokenBucket:
+    """Return the shared TokenBucket for the host of <url>, creating it if needed."""
+    host = urlparse(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(SCRAPER_RATE, SCRAPER_BURST)
+        return _limiters[host]
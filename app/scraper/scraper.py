@@ -1,183 +1,187 @@
 """
 Handles all web scraping functionality.
 
-This module currently scrapes CPU listings from Newegg using requests and
-BeautifulSoup. The extracted data is formatted into CPU objects.
+This module currently scrapes the categories registered in categories.py (CPU,
+GPU, and motherboard listings from Newegg) using requests and a pluggable HTML
+parser backend (see parsers.py). Listing pages are fetched concurrently by a
+thread pool, through a shared pooled HTTP client that rate limits each host and
+retries transient failures. The extracted data is formatted into PartBatch
+columns of PcPart listings.
 
 Will be updated for additional parts, websites, and more advanced parsing.
 """
 
-import requests
-from bs4 import BeautifulSoup
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
-import random
-from app.models.cpu import CPU
-from app.models.gpu import GPU
-from app.models.motherboard import MOBO
-from app.utils.parsing import extract_cpu_info, extract_gpu_info, extract_mobo_info
+from typing import Callable, Collection, Iterator, Optional
+from app.config import SCRAPER_WORKERS, CACHE_ENABLED
+from app.scraper.cache import get_cache
+from app.scraper.client import get_client
+from app.scraper.parsers import get_parser
+from app.scraper.categories import Category, CATEGORIES
+from app.models.part_batch import PartBatch
+from app.utils.metrics import get_metrics
+from app.utils.parsing import TitleInfo
+
+
+class Page():
+    """A fetched webpage.
+
+    === Attributes ===
+    url: the URL of this page
+    text: the body of this page
+    body_hash: the sha256 hex digest of the body, or None if the cache is disabled
+    items: the items extracted from this page by a previous run, or None if it must be parsed
+    """
+    url: str
+    text: str
+    body_hash: Optional[str]
+    items: Optional[list]
+
+    def __init__(self, url: str, text: str, body_hash: Optional[str]=None, items: Optional[list]=None) -> None:
+        """Initialize a new Page object."""
+        self.url = url
+        self.text = text
+        self.body_hash = body_hash
+        self.items = items
+
+
+def fetch_page(url: str) -> Page:
+    """Return the webpage at <url>, fetched through the shared HTTP client.
+
+    When the cache is enabled the request is conditional, and an unchanged page
+    is returned with the items extracted from it on a previous run.
+    """
+    with get_metrics().timer("fetch_seconds"):
+        return _fetch_page(url)
+
+
+def _fetch_page(url: str) -> Page:
+    """Return the webpage at <url>, as described in fetch_page."""
+    if not CACHE_ENABLED:
+        return Page(url, get_client().get(url).text)
+
+    cache = get_cache()
+    entry = cache.get(url)
+    response = get_client().get(url, headers=entry.conditional_headers() if entry else None)
+
+    if response.status_code == 304 and entry:
+        cache.refresh(url)
+    else:
+        entry = cache.put(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
 
+    return Page(url, entry.text, entry.body_hash, entry.items)
 
-def get_newegg_pages(url: str) -> int:
-    """Returns the number of pages for a Newegg Pc part."""
-    soup = BeautifulSoup(requests.get(url).text, "html.parser")
 
-    pages_tag = soup.find(name="span", class_="list-tool-pagination-text").find(name="strong")
-    last_page_number = int(pages_tag.text.split('/')[-1])
+def iter_pages(urls: list[str], workers: Optional[int]=None) -> Iterator[Page]:
+    """Yield the webpages at <urls>, in the same order as <urls>, as soon as each is fetched.
 
-    return last_page_number
+    Pages are fetched concurrently by up to <workers> threads (SCRAPER_WORKERS by default),
+    and at most twice that many pages are fetched ahead of the consumer.
+    """
+    workers = workers or SCRAPER_WORKERS
+    if workers <= 1:
+        for url in urls:
+            yield fetch_page(url)
+        return
 
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for url in urls:
+                pending.append(executor.submit(fetch_page, url))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
 
-def scrape_newegg_cpus() -> list[CPU]:
-    """Returns a list of CPU objects from scraping all available CPU data on Newegg."""
-    cpus = []
-    pages = get_newegg_pages("https://www.newegg.ca/p/pl?N=100007670%204814%208000&page=1&ComboBundle=true")
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending: # stop early if the consumer stops
+                future.cancel()
 
-    for page in range(1, pages + 1):
-        # fetch the webpage
-        url = f"https://www.newegg.ca/p/pl?N=100007670%204814%208000&page={page}&ComboBundle=true"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser") 
 
-        # extract all CPUs on page
-        cpu_tags = soup.find_all(name="div", class_="item-cell")
+def iter_category_pages(category: Category, skip: Collection[str]=()) -> Iterator[Page]:
+    """Yield every listing page of <category> whose url is not in <skip>, in order.
 
-        # extract relevant cpu information
-        for cpu in cpu_tags:
-            title = cpu.find(name="a", class_="item-title").text # contains all relevant info about product
-            name, brand = extract_cpu_info(title)
+    The first page of each listing also gives its page count, so it is only fetched once
+    (and always, since the page count is needed).
+    """
+    for listing_url in category.listing_urls:
+        first_page = fetch_page(listing_url.format(page=1))
+        pages = get_parser().parse_page_count(first_page.text)
 
-            link = cpu.find(name="a", class_="item-title").get(key="href")
+        if first_page.url not in skip:
+            yield first_page
+        yield from iter_pages([url for url in (listing_url.format(page=page) for page in range(2, pages + 1))
+                               if url not in skip])
 
-            try: # make sure price exists
-                price_dollars = cpu.find(name="li", class_="price-current").find(name="strong").text
-                price_cents = cpu.find(name="li", class_="price-current").find(name="sup").text
-                price = price_dollars + price_cents # current price with discounts
-            except:
-                price = "N/A"
 
-            date = datetime.now().isoformat()[:10] # YYYY-MM-DD format
+def parse_page_text(text: str, extract_info: Callable[[str], Optional[TitleInfo]]) -> tuple[list, list]:
+    """Return the (title, link, price) items of the listing page body <text>, and the
+    result of <extract_info> on every item's title.
 
-            new_cpu = CPU(name, "newegg", link, price, date, brand)
-            cpus.append(new_cpu)
+    Only takes and returns picklable values, so it can run in a worker process.
+    """
+    items = get_parser().parse_items(text)
+    return items, [extract_info(title) for title, _, _ in items]
 
-        time.sleep(random.uniform(1.5, 3.0)) # limit scraping rate
 
-    print(f"found {len(cpus)} CPUs.") # indicate how many CPUs were found when updating database
+def build_category_batch(category: Category, page: Page, items: list, infos: list) -> PartBatch:
+    """Return the listings of <category> given by the <items> parsed from <page> and their title <infos>,
+    skipping titles the category does not recognise. Newly parsed items are cached.
+    """
+    if page.items is None and page.body_hash:
+        get_cache().set_items(page.url, page.body_hash, items)
 
-    return cpus
+    parts = PartBatch(category.part_class)
+    date = datetime.now().isoformat()[:10] # YYYY-MM-DD format
 
+    for (_, link, price), info in zip(items, infos):
+        if info is None: # not a listing of this category
+            continue
+        parts.append(info.name, category.website, link, price, date, info.brand)
 
-def scrape_newegg_gpus() -> list[GPU]:
-    """Returns a list of CPU objects from scraping all available CPU data on Newegg."""
-    gpus = []
-    pages = get_newegg_pages("https://www.newegg.ca/p/pl?N=100007708%208000&page=1&ComboBundle=true")
+    return parts
 
-    for page in range(1, pages + 1):
-        # fetch the webpage
-        url = f"https://www.newegg.ca/p/pl?N=100007708%208000&page={page}&ComboBundle=true"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        # extract all GPUs on page
-        gpu_tags = soup.find_all(name="div", class_="item-cell")
+def parse_category_page(category: Category, page: Page) -> PartBatch:
+    """Return the listings of <category> found on <page>, skipping titles it does not recognise.
 
-        # extract relevant cpu information
-        for gpu in gpu_tags:
-            title = gpu.find(name="a", class_="item-title").text # contains all relevant info about product
-            name, brand = extract_gpu_info(title)
+    The page is only parsed if it changed since the last run.
+    """
+    with get_metrics().timer("parse_seconds", category=category.name):
+        if page.items is not None:
+            items = [tuple(item) for item in page.items]
+            infos = [category.extract_info(title) for title, _, _ in items]
+        else:
+            items, infos = parse_page_text(page.text, category.extract_info)
 
-            link = gpu.find(name="a", class_="item-title").get(key="href")
+        return build_category_batch(category, page, items, infos)
 
-            try: # make sure price exists
-                price_dollars = gpu.find(name="li", class_="price-current").find(name="strong").text
-                price_cents = gpu.find(name="li", class_="price-current").find(name="sup").text
-                price = price_dollars + price_cents # current price with discounts
-            except:
-                price = "N/A"
 
-            date = datetime.now().isoformat()[:10] # YYYY-MM-DD format
+def scrape_category(category: Category) -> PartBatch:
+    """Returns a batch of every <category> listing found by scraping its website."""
+    parts = PartBatch(category.part_class)
 
-            new_gpu = GPU(name, "newegg", link, price, date, brand)
-            gpus.append(new_gpu)
+    for page in iter_category_pages(category):
+        parts.extend(parse_category_page(category, page))
 
-        time.sleep(random.uniform(1.5, 3.0)) # limit scraping rate
-            
-    print(f"found {len(gpus)} GPUs.") # indicate how many GPUs were found when updating database
+    print(f"found {len(parts)} {category.label}.") # indicate how many parts were found when updating database
 
-    return gpus
+    return parts
 
 
-def scrape_newegg_mobos() -> list[MOBO]:
-    """Returns a list of MOBO objects from scraping all available desktop motherboard data on Newegg."""
-    mobos = []
-    amd_pages = get_newegg_pages("https://www.newegg.ca/p/pl?N=100007624%20601413462%20601413455%208000&page=1&ComboBundle=true")
-    intel_pages = get_newegg_pages("https://www.newegg.ca/p/pl?N=100007626%208000%20601413471%20601458446&page=1&ComboBundle=true")
+def scrape_newegg_cpus() -> PartBatch:
+    """Returns a batch of CPU listings from scraping all available CPU data on Newegg."""
+    return scrape_category(CATEGORIES["cpu"])
 
-    # get all AMD motherboards
-    for page in range(1, amd_pages + 1):
-        # fetch the webpage
-        url = f"https://www.newegg.ca/p/pl?N=100007624%20601413462%20601413455%208000&page={page}&ComboBundle=true"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        # extract all motherboards on page
-        mobo_tags = soup.find_all(name="div", class_="item-cell")
+def scrape_newegg_gpus() -> PartBatch:
+    """Returns a batch of GPU listings from scraping all available GPU data on Newegg."""
+    return scrape_category(CATEGORIES["gpu"])
 
-        # extract relevant cpu information
-        for mobo in mobo_tags:
-            title = mobo.find(name="a", class_="item-title").text # contains all relevant info about product
 
-            name, brand = extract_mobo_info(title)
-
-            link = mobo.find(name="a", class_="item-title").get(key="href")
-
-            try: # make sure price exists
-                price_dollars = mobo.find(name="li", class_="price-current").find(name="strong").text
-                price_cents = mobo.find(name="li", class_="price-current").find(name="sup").text
-                price = price_dollars + price_cents # current price with discounts
-            except:
-                price = "N/A"
-
-            date = datetime.now().isoformat()[:10] # YYYY-MM-DD format
-
-            new_mobo = MOBO(name, "newegg", link, price, date, brand)
-            mobos.append(new_mobo)
-
-        time.sleep(random.uniform(1.5, 3.0)) # limit scraping rate
-
-    # get all Intel motherboards
-    for page in range(1, intel_pages + 1):
-        # fetch the webpage
-        url = f"https://www.newegg.ca/p/pl?N=100007626%208000%20601413471%20601458446&page={page}&ComboBundle=true"
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-         # extract all motherboards on page
-        mobo_tags = soup.find_all(name="div", class_="item-cell")
-
-        # extract relevant cpu information
-        for mobo in mobo_tags:
-            title = mobo.find(name="a", class_="item-title").text # contains all relevant info about product
-
-            name, brand = extract_mobo_info(title)
-
-            link = mobo.find(name="a", class_="item-title").get(key="href")
-
-            try: # make sure price exists
-                price_dollars = mobo.find(name="li", class_="price-current").find(name="strong").text
-                price_cents = mobo.find(name="li", class_="price-current").find(name="sup").text
-                price = price_dollars + price_cents # current price with discounts
-            except:
-                price = "N/A"
-
-            date = datetime.now().isoformat()[:10] # YYYY-MM-DD format
-
-            new_mobo = MOBO(name, "newegg", link, price, date, brand)
-            mobos.append(new_mobo)
-
-        time.sleep(random.uniform(1.5, 3.0)) # limit scraping rate
-
-    print(f"found {len(mobos)} motherboards.") # indicate how many motherboards were found when updating database
-
-    return mobos
+def scrape_newegg_mobos() -> PartBatch:
+    """Returns a batch of MOBO listings from scraping all available desktop motherboard data on Newegg."""
+    return scrape_category(CATEGORIES["mobo"])
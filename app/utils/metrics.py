@@ -0,0 +1,203 @@
+"""
+In-process metrics of database updates and of the API server.
+
+Stages record counters (e.g. HTTP requests by status) and latency histograms (e.g.
+seconds to parse a page) in a shared Metrics registry. At the end of an update the
+registry is written as a JSON report and as a Prometheus text-format file, which
+the node_exporter textfile collector can pick up. The API server exposes its
+registry at /metrics instead.
+"""
+
+import json
+import os
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+PREFIX = "pcparts_"
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+DESCRIPTIONS = {
+    "http_requests_total": "HTTP responses received, by status code",
+    "http_errors_total": "HTTP attempts that failed to connect or timed out",
+    "http_retries_total": "HTTP attempts retried",
+    "http_response_bytes_total": "Bytes of HTTP response bodies received",
+    "http_request_seconds": "Latency of single HTTP attempts",
+    "ratelimit_wait_seconds_total": "Seconds spent waiting on the per-host rate limit",
+    "fetch_seconds": "Latency of fetching a listing page, including retries and the cache",
+    "pages_fetched_total": "Listing pages fetched, by category",
+    "parse_seconds": "Latency of parsing a listing page",
+    "db_write_seconds": "Latency of storing the listings of a page",
+    "rows_inserted_total": "Price observations stored, by category",
+    "server_requests_total": "API requests answered, by endpoint, status code, and cache result",
+    "server_request_seconds": "Latency of answering an API request, by endpoint",
+}
+
+
+class Histogram():
+    """A distribution of observed values over fixed buckets.
+
+    === Attributes ===
+    buckets: the upper bound of every bucket, in increasing order
+    counts: the number of observations of every bucket (not cumulative), then of values above all buckets
+    total: the sum of all observations
+    count: the number of observations
+    """
+    buckets: tuple[float, ...]
+    counts: list[int]
+    total: float
+    count: int
+
+    def __init__(self, buckets: tuple[float, ...]=LATENCY_BUCKETS) -> None:
+        """Initialize a new, empty Histogram."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record the observation <value>."""
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the <q> quantile, or None if empty."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def to_dict(self) -> dict:
+        """Return this histogram as a JSON-serializable dict."""
+        return {"count": self.count, "sum": self.total, "mean": self.total / self.count if self.count else None,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95),
+                "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}}
+
+
+def _labels(labels: tuple[tuple[str, str], ...], extra: str="") -> str:
+    """Return <labels> in Prometheus format (e.g. '{status="200"}'), followed by the label <extra>."""
+    parts = [f'{name}="{value}"' for name, value in labels] + ([extra] if extra else [])
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics():
+    """A thread-safe registry of counters and histograms, keyed by name and labels.
+
+    === Attributes ===
+    counters: the value of every counter
+    histograms: every histogram
+    started: the time this registry was created, in seconds since the epoch
+    """
+    counters: dict[tuple[str, tuple], float]
+    histograms: dict[tuple[str, tuple], Histogram]
+    started: float
+
+    def __init__(self) -> None:
+        """Initialize a new, empty Metrics registry."""
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float=1, **labels: str) -> None:
+        """Add <amount> to the counter <name> with <labels>."""
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record <value> in the histogram <name> with <labels>."""
+        key = (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+        with self._lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Record the seconds spent in the with block in the histogram <name> with <labels>."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return the value of the counter <name> with <labels>, or its total over all labels if none are given."""
+        with self._lock:
+            if labels:
+                return self.counters.get((name, tuple(sorted((k, str(v)) for k, v in labels.items()))), 0)
+            return sum(value for (metric, _), value in self.counters.items() if metric == name)
+
+    def to_dict(self) -> dict:
+        """Return every metric as a JSON-serializable dict."""
+        report = {"started": self.started, "duration": time.time() - self.started, "counters": {}, "histograms": {}}
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                report["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                report["histograms"].setdefault(name, []).append({"labels": dict(labels), **histogram.to_dict()})
+        return report
+
+    def to_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self.counters), ("histogram", self.histograms)):
+                described = set()
+                for (name, labels), value in sorted(metrics.items()):
+                    full_name = PREFIX + name
+                    if name not in described:
+                        described.add(name)
+                        lines.append(f"# HELP {full_name} {DESCRIPTIONS.get(name, name)}")
+                        lines.append(f"# TYPE {full_name} {kind}")
+
+                    if kind == "counter":
+                        lines.append(f"{full_name}{_labels(labels)} {value:g}")
+                        continue
+
+                    cumulative = 0
+                    for bound, count in zip(value.buckets + ("+Inf",), value.counts):
+                        cumulative += count
+                        bucket = 'le="' + str(bound) + '"'
+                        lines.append(f"{full_name}_bucket{_labels(labels, bucket)} {cumulative}")
+                    lines.append(f"{full_name}_sum{_labels(labels)} {value.total:g}")
+                    lines.append(f"{full_name}_count{_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, json_path: str, prometheus_path: str, **extra: object) -> None:
+        """Write every metric as JSON to <json_path>, with the fields <extra>, and in the
+        Prometheus text format to <prometheus_path>.
+        """
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({**extra, **self.to_dict()}, f, indent=2)
+
+        # written then renamed, so a collector never reads a partial file
+        with open(prometheus_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(prometheus_path + ".tmp", prometheus_path)
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the Metrics registry shared by all stages."""
+    return _metrics
+
+
+def set_metrics(metrics: Optional[Metrics]) -> Metrics:
+    """Replace the shared Metrics registry with <metrics> (or a new, empty one when None), and return it."""
+    global _metrics
+    _metrics = metrics if metrics is not None else Metrics()
+    return _metrics
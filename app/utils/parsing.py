@@ -1,32 +1,96 @@
-"""This module contains functions for extracting specific Pc part information."""
+"""This module contains functions for extracting specific Pc part information.
+
+Listing titles are matched against precompiled patterns, and results are memoized
+per raw title since the same titles recur across pages and runs. Titles that don't
+match return None instead of raising, so one odd listing can't stop a scrape.
+"""
 
 import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from app.config import TITLE_CACHE_SIZE
+
+
+class TitleInfo(NamedTuple):
+    """The clean name and brand extracted from a listing title."""
+    name: str
+    brand: str
+
+
+# listing condition (e.g. "Open Box") followed by the rest of the title
+CONDITION_PATTERN = re.compile(r"(?i)^(?:(Refurbished|Open Box) +)?(.*)$", re.S)
+
+CPU_NAME_PATTERN = re.compile(r"^(AMD Ryzen \d \w*|Intel Core Ultra \d+ \w*|Intel Core i\d+-\d+\w*|AMD Ryzen Threadripper ?(PRO)? \d*\w*|Intel Pentium \w*)")
+CPU_BRAND_PATTERN = re.compile(r"^(AMD|Intel)")
+BRAND_PATTERN = re.compile(r"^(\w+)")
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def extract_cpu_info(full_title: str) -> Optional[TitleInfo]:
+    """Extract and return the clean CPU name and brand from <full_title>, or None if it
+    is not a recognised CPU. The listing condition (e.g. "Open Box") is kept in the name.
+    """
+    condition, title = CONDITION_PATTERN.match(full_title).groups()
+
+    name = CPU_NAME_PATTERN.match(title)
+    brand = CPU_BRAND_PATTERN.match(title)
+    if not name or not brand:
+        return None
+
+    return TitleInfo(f"{condition} {name.group(0)}" if condition else name.group(0), brand.group(0))
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def extract_gpu_info(full_title: str) -> Optional[TitleInfo]:
+    """Extract and return the clean GPU name and brand from <full_title>, or None if it has no brand."""
+    brand = BRAND_PATTERN.match(CONDITION_PATTERN.match(full_title).group(2))
+    if not brand:
+        return None
+
+    return TitleInfo(full_title, brand.group(1)) # get name later
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def extract_mobo_info(full_title: str) -> Optional[TitleInfo]:
+    """Extract and return the clean motherboard name and brand from <full_title>, or None if it has no brand."""
+    brand = BRAND_PATTERN.match(CONDITION_PATTERN.match(full_title).group(2))
+    if not brand:
+        return None
 
+    return TitleInfo(full_title, brand.group(1)) # get name later
 
-def extract_cpu_info(full_title: str) -> tuple[str, str]:
-    """Extract and return the clean CPU name and brand from <full_title>."""
-    match_name = r"^(AMD Ryzen \d \w*|Intel Core Ultra \d+ \w*|Intel Core i\d+-\d+\w*|AMD Ryzen Threadripper ?(PRO)? \d*\w*|Intel Pentium \w*)"
-    match_brand = r"^(AMD|Intel)"
 
-    name = re.match(match_name, full_title)
-    brand = re.match(match_brand, full_title)
+PRICE_PATTERN = re.compile(r"^\$?\s*(\d{1,3}(?:,\d{3})*|\d+)(?:\.(\d{1,2}))?$")
 
-    return name.group(0), brand.group(0)
 
+def price_to_cents(price: str) -> Optional[int]:
+    """Return <price> (e.g. "1,299.99") as an integer number of cents, or None if it is not a price (e.g. "N/A")."""
+    match = PRICE_PATTERN.match(price.strip()) if price else None
+    if not match:
+        return None
 
-def extract_gpu_info(full_title: str) -> tuple[str, str]:
-    """Extract and return the clean GPU name and brand from <full_title>."""
-    match_brand = r"(?i)^(?:(Refurbished|Open Box) +)?(\w+)"
+    dollars, cents = match.groups()
+    return int(dollars.replace(",", "")) * 100 + int((cents or "0").ljust(2, "0"))
 
-    brand = re.match(match_brand, full_title)
 
-    return full_title, brand.group(1) # get name later
+# the item number of a listing link, preferably from its Item query parameter, else from its /p/<item> path
+ITEM_PARAMETER_PATTERN = re.compile(r"[?&]Item=([A-Za-z0-9.-]+)")
+ITEM_PATH_PATTERN = re.compile(r"/p/([A-Za-z0-9][A-Za-z0-9.-]{5,})")
 
 
-def extract_mobo_info(full_title: str) -> tuple[str, str]:
-    """Extract and return the clean motherboard name and brand from <full_title>."""
-    match_brand = r"(?i)^(?:(Refurbished|Open Box) +)?(\w+)"
+def extract_item_id(link: str) -> Optional[str]:
+    """Return the retailer item number of the listing <link> (e.g. "N82E16819113843" in
+    "https://www.newegg.ca/amd-ryzen-7-9800x3d/p/N82E16819113843"), or None if it has none.
+    """
+    match = (ITEM_PARAMETER_PATTERN.search(link) or ITEM_PATH_PATTERN.search(link)) if link else None
+    if not match or not any(char.isdigit() for char in match.group(1)):
+        return None
+    return match.group(1).upper()
 
-    brand = re.match(match_brand, full_title)
 
-    return full_title, brand.group(1) # get name later
\ No newline at end of file
+def to_external_id(website: str, link: str) -> Optional[str]:
+    """Return the id identifying the product of the listing <link> on <website> (e.g.
+    "newegg:N82E16819113843"), or None if the link has no item number.
+    """
+    item_id = extract_item_id(link)
+    return f"{website}:{item_id}" if item_id else None
@@ -0,0 +1,59 @@
+"""
+Profiling of a whole update run, for finding where time and memory go.
+
+Wraps a block in cProfile (covering every thread started inside it, since the update
+pipeline runs its stages in threads) and tracemalloc, then prints the hottest
+functions and the largest allocation sites. Pages parsed in worker processes
+are not profiled.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def profiled(stats_path: str, top: int=25) -> Iterator[None]:
+    """Profile the with block, print its <top> hottest functions and allocation sites, and
+    save the profile to <stats_path> (readable with pstats or snakeviz).
+    """
+    profiler = cProfile.Profile()
+    thread_profilers = []
+    # from Python 3.12, cProfile is built on sys.monitoring and already sees every thread,
+    # and a second profiler cannot be enabled while the first one is
+    per_thread = sys.version_info < (3, 12)
+
+    def profile_thread(*args) -> None:
+        # called on the first event of every new thread: replace this hook by a profiler of the thread
+        sys.setprofile(None)
+        thread_profiler = cProfile.Profile()
+        thread_profilers.append(thread_profiler)
+        thread_profiler.enable()
+
+    tracemalloc.start()
+    if per_thread:
+        threading.setprofile(profile_thread)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if per_thread:
+            threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats = pstats.Stats(profiler, *thread_profilers)
+        stats.dump_stats(stats_path)
+
+        print(f"\n==== hottest functions ({len(thread_profilers) + 1 if per_thread else 'all'} threads) ====")
+        stats.sort_stats("cumulative").print_stats(top)
+        print(f"==== largest allocation sites (peak {peak / 2**20:.1f} MiB traced) ====")
+        for statistic in snapshot.statistics("lineno")[:top]:
+            print(statistic)
+        print(f"profile saved to {stats_path}")
@@ -0,0 +1,123 @@
+"""
+Benchmark for the price history analytics.
+
+Builds a synthetic price history of several million rows, then times loading it
+into arrays and computing the trends of every part, against computing the same
+metrics with a per-row Python loop over the same query. Both read every row
+through sqlite3, so the load dominates the total; the trends themselves are
+where the arrays pay off, and can be recomputed for other windows without
+reloading.
+
+Run with: python -m tests.benchmarks.bench_analytics [rows]
+"""
+
+import math
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+from app.analytics import price_history
+from app.database import migrations
+
+
+PARTS = 20_000 # distinct parts in the history
+START = date(2020, 1, 1)
+
+
+def _build(rows: int) -> sqlite3.Connection:
+    """Return an in-memory database holding <rows> cpu prices spread over <PARTS> parts."""
+    connection = sqlite3.connect(":memory:")
+    migrations.migrate(connection)
+    connection.executemany("INSERT INTO cpus (id, name, brand) VALUES (?, ?, 'AMD')",
+                           ((i, f"AMD Ryzen {i}") for i in range(1, PARTS + 1)))
+
+    def prices():
+        rng = random.Random(0)
+        per_part = rows // PARTS
+        for part in range(1, PARTS + 1):
+            cents = rng.randrange(5_000, 200_000)
+            for day in sorted(rng.sample(range(per_part * 2), per_part)):
+                cents = max(100, int(cents * rng.uniform(0.9, 1.1)))
+                yield (part, f"{cents / 100:.2f}", cents, (START + timedelta(days=day)).isoformat())
+
+    connection.executemany("INSERT INTO cpu_prices (cpu_id, price, price_cents, price_date, website, link) "
+                           "VALUES (?, ?, ?, ?, 'newegg', '')", prices())
+    connection.commit()
+    return connection
+
+
+def _python_trends(connection: sqlite3.Connection, today: int, days: int) -> dict[int, tuple]:
+    """Return the (change, drop from high, average, volatility) of every part over the window,
+    computed one row at a time.
+    """
+    window_start = today - days
+    trends = {}
+
+    def finish(part_id, rows):
+        latest = start = None
+        high = weighted = held = 0
+        returns = []
+        for i, (day, cents) in enumerate(rows):
+            if day > today:
+                break
+            latest = cents
+            high = max(high, cents)
+            if day <= window_start or start is None:
+                start = cents
+            if day > window_start and i > 0:
+                returns.append(math.log(cents) - math.log(rows[i - 1][1]))
+            end = rows[i + 1][0] if i + 1 < len(rows) else today + 1
+            span = max(0, min(end, today + 1) - max(day, window_start))
+            weighted += span * cents
+            held += span
+        if latest is None:
+            return
+        mean = sum(returns) / len(returns) if returns else 0
+        volatility = math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns)) if returns else 0
+        trends[part_id] = ((latest - start) / start * 100 if start else math.nan,
+                           (high - latest) / high * 100, weighted / held if held else math.nan, volatility)
+
+    query = "SELECT cpu_id, price_date, price_cents FROM cpu_prices ORDER BY cpu_id, price_date, id"
+    current, rows = None, []
+    for part_id, price_date, cents in connection.execute(query):
+        if part_id != current:
+            if rows:
+                finish(current, rows)
+            current, rows = part_id, []
+        rows.append((date.fromisoformat(price_date).toordinal(), cents))
+    if rows:
+        finish(current, rows)
+    return trends
+
+
+def main(rows: int=2_000_000, days: int=30) -> None:
+    begin = time.perf_counter()
+    connection = _build(rows)
+    print(f"rows: {rows} ({PARTS} parts), built in {time.perf_counter() - begin:.1f}s")
+    today = START.toordinal() + 2 * rows // PARTS
+
+    begin = time.perf_counter()
+    history = price_history.PriceHistory.load(connection, "cpu")
+    loaded = time.perf_counter()
+    trends = price_history.compute_trends(history, days, today=today)
+    trends.biggest_movers(10)
+    computed = time.perf_counter()
+
+    reference = _python_trends(connection, today, days)
+    python = time.perf_counter() - computed
+
+    print(f"numpy load:     {loaded - begin:8.3f}s")
+    print(f"numpy trends:   {computed - loaded:8.3f}s")
+    print(f"numpy total:    {computed - begin:8.3f}s")
+    print(f"python loop:    {python:8.3f}s")
+    print(f"speedup:        {python / (computed - begin):8.2f}x total, "
+          f"{python / (computed - loaded):.0f}x once loaded")
+
+    columns = [trends.change_pct, trends.drop_from_high_pct, trends.average_cents, trends.volatility]
+    for i, part_id in enumerate(trends.part_ids.tolist()):
+        for column, expected in zip(columns, reference[part_id]):
+            assert (math.isnan(expected) and math.isnan(column[i])) or abs(column[i] - expected) < 1e-6
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
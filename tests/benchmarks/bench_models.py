@@ -0,0 +1,57 @@
+"""
+Memory benchmark for part representations.
+
+Compares the memory used to hold a large price history as a list of part objects
+against the same history held by a PartBatch. Strings are created fresh for every
+row, as they are when read from the database.
+
+Run with: python -m tests.benchmarks.bench_models [rows]
+"""
+
+import sys
+import tracemalloc
+from app.models.cpu import CPU
+from app.models.part_batch import PartBatch
+
+
+PARTS = 3000 # distinct parts in the history
+DATES = 365 # distinct days in the history
+
+
+def _rows(count: int):
+    """Yield <count> fresh (name, website, link, price, date, brand) rows."""
+    for i in range(count):
+        part = i % PARTS
+        yield (f"AMD Ryzen {part % 10} {7000 + part}X", "".join(["new", "egg"]),
+               f"https://www.newegg.ca/p/N82E168191{part:05}", f"{100 + part % 900}.99",
+               f"2025-{(i // PARTS) % 12 + 1:02}-{(i // PARTS) % 28 + 1:02}", "".join(["A", "MD"]))
+
+
+def _measure(build) -> int:
+    """Return the peak number of bytes allocated while <build> runs and its result is alive."""
+    tracemalloc.start()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main(rows: int=1_000_000) -> None:
+    objects = _measure(lambda: [CPU(*row) for row in _rows(rows)])
+
+    def build_batch():
+        batch = PartBatch(CPU)
+        for row in _rows(rows):
+            batch.append(*row)
+        return batch
+    columnar = _measure(build_batch)
+
+    print(f"rows: {rows}")
+    print(f"list[CPU]:  {objects / 2**20:8.1f} MiB ({objects / rows:6.1f} bytes/row)")
+    print(f"PartBatch:  {columnar / 2**20:8.1f} MiB ({columnar / rows:6.1f} bytes/row)")
+    print(f"reduction:  {objects / columnar:8.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,54 @@
+"""
+Throughput benchmark for parsing listing pages in worker processes.
+
+Parses copies of the recorded listing page with an increasing number of worker
+processes, as the update pipeline does when re-parsing pages without fetching,
+and reports pages/sec and the speedup over parsing in-process.
+
+Run with: python -m tests.benchmarks.bench_parse_workers [pages]
+(set HTML_PARSER to compare parser backends, e.g. HTML_PARSER=html.parser)
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from app.scraper import scraper
+from app.utils.parsing import extract_gpu_info
+from tests.conftest import read_fixture
+
+
+def _rate(text: str, pages: int, workers: int) -> float:
+    """Return the pages/sec achieved parsing <pages> copies of <text> with <workers> processes."""
+    if workers == 1:
+        start = time.perf_counter()
+        for _ in range(pages):
+            scraper.parse_page_text(text, extract_gpu_info)
+        return pages / (time.perf_counter() - start)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        list(pool.map(scraper.parse_page_text, [text] * workers, [extract_gpu_info] * workers)) # start workers
+
+        start = time.perf_counter()
+        list(pool.map(scraper.parse_page_text, [text] * pages, [extract_gpu_info] * pages, chunksize=4))
+        return pages / (time.perf_counter() - start)
+
+
+def main(pages: int=400) -> None:
+    # a page with a realistic number of listings (~36)
+    listing = read_fixture("newegg_listing.html")
+    grid_start = listing.index('<div class="item-cell"')
+    grid_end = listing.index("  </div>\n</div>\n<footer>")
+    text = listing[:grid_end] + listing[grid_start:grid_end] * 5 + listing[grid_end:]
+
+    base = None
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        rate = _rate(text, pages, workers)
+        base = base or rate
+        print(f"{workers:2} workers: {rate:8.1f} pages/sec ({rate / base:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 400)
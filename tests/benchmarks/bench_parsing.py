@@ -0,0 +1,64 @@
+"""
+Micro-benchmark for the listing title extractors.
+
+Feeds the title corpus in tests/fixtures/titles.tsv, repeated up to the requested
+number of titles as recurring listings are on real runs, through the extractors
+and reports titles/sec with a cold and a warm title cache. The original approach
+(re.match on pattern strings, with no memoization) is measured for comparison.
+
+Run with: python -m tests.benchmarks.bench_parsing [titles]
+"""
+
+import re
+import sys
+import time
+from app.utils import parsing
+from tests.conftest import read_fixture
+
+
+EXTRACTORS = {"cpu": parsing.extract_cpu_info, "gpu": parsing.extract_gpu_info, "mobo": parsing.extract_mobo_info}
+
+
+def _corpus(count: int) -> list[tuple[str, str]]:
+    """Return <count> (category, title) pairs cycling through the fixture corpus."""
+    rows = [tuple(line.split("\t", 1)) for line in read_fixture("titles.tsv").splitlines() if line]
+    return [rows[i % len(rows)] for i in range(count)]
+
+
+def _legacy_extract(category: str, title: str):
+    """Extract a title the way the original (uncompiled, unmemoized) extractors did."""
+    if category == "cpu":
+        name = re.match(r"^(AMD Ryzen \d \w*|Intel Core Ultra \d+ \w*|Intel Core i\d+-\d+\w*|AMD Ryzen Threadripper ?(PRO)? \d*\w*|Intel Pentium \w*)", title)
+        brand = re.match(r"^(AMD|Intel)", title)
+        return (name.group(0), brand.group(0)) if name and brand else None
+    brand = re.match(r"(?i)^(?:(Refurbished|Open Box) +)?(\w+)", title)
+    return (title, brand.group(2)) if brand else None
+
+
+def _rate(corpus: list[tuple[str, str]], extract) -> float:
+    """Return the number of titles per second <extract> handles over <corpus>."""
+    start = time.perf_counter()
+    for category, title in corpus:
+        extract(category, title)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main(count: int=500_000) -> None:
+    corpus = _corpus(count)
+    unique = len(set(corpus))
+
+    legacy = _rate(corpus, _legacy_extract)
+
+    for extractor in EXTRACTORS.values():
+        extractor.cache_clear()
+    cold = _rate(corpus[:unique], lambda category, title: EXTRACTORS[category](title))
+    warm = _rate(corpus, lambda category, title: EXTRACTORS[category](title))
+
+    print(f"titles: {count} ({unique} unique)")
+    print(f"legacy:       {legacy:12,.0f} titles/sec")
+    print(f"cold cache:   {cold:12,.0f} titles/sec")
+    print(f"warm cache:   {warm:12,.0f} titles/sec ({warm / legacy:.1f}x legacy)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
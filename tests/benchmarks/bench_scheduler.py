@@ -0,0 +1,108 @@
+"""
+Simulation benchmark of the adaptive crawl scheduler.
+
+Simulates daily updates of listing pages whose prices change at very different
+rates (GPU pages daily, CPU pages every few days, motherboard pages rarely), and
+compares fetching every page on every update with spending a smaller budget of
+requests, either on the pages fetched longest ago (round robin) or on the pages
+the scheduler expects to have changed. Reports the requests made, the share of
+pages up to date after each update, how long a change goes unseen on average, and
+the longest time a page went without being fetched.
+
+Run with: python -m tests.benchmarks.bench_scheduler [--days N] [--seed N]
+"""
+
+import argparse
+import math
+import random
+from datetime import datetime, timedelta
+from app.cli import scheduler
+from app.database.crawl_history import PageHistory
+
+
+# category: (pages, median changes per day of a page)
+CATEGORIES = {
+    "gpu": (120, 0.8),
+    "cpu": (60, 0.25),
+    "mobo": (120, 0.03),
+}
+
+MAX_STALENESS = 7
+START = datetime(2025, 1, 1)
+
+
+def _pages(rng: random.Random) -> dict[str, tuple[str, float]]:
+    """Return a mapping from url to the category and true change rate of every simulated page."""
+    return {f"{category}/{i}": (category, median * math.exp(rng.gauss(0, 0.75)))
+            for category, (count, median) in CATEGORIES.items() for i in range(count)}
+
+
+def _simulate(pages: dict[str, tuple[str, float]], days: int, budget: int | None, adaptive: bool,
+              seed: int) -> dict[str, float]:
+    """Return the requests, freshness, change lag, and longest staleness of <days> daily updates of <pages>."""
+    rng = random.Random(seed)
+    history = {}
+    unseen = {url: [] for url in pages} # times of the changes since the last fetch of every page
+    requests, fresh, lags, longest = 0, 0, [], 0.0
+
+    for day in range(days + 1):
+        now = START + timedelta(days=day)
+        # every page changes as a Poisson process; record the times of the day's changes
+        for url, (_, rate) in pages.items():
+            t = day - 1 + rng.expovariate(rate)
+            while day > 0 and t < day:
+                unseen[url].append(t)
+                t += rng.expovariate(rate)
+
+        if not history: # the first update fetches everything
+            selected = list(pages)
+        else:
+            rates = scheduler.estimate_rates(history) if adaptive else dict.fromkeys(history, 1.0)
+            selected = scheduler.plan_crawl(history, rates, budget, MAX_STALENESS, now).selected
+
+        for url in selected:
+            changed = bool(unseen[url])
+            lags.extend(day - t for t in unseen[url])
+            unseen[url] = []
+            page = history.get(url)
+            if page is None:
+                history[url] = PageHistory(url, pages[url][0], 36, 1, 0, 0.0, now, now)
+                continue
+            longest = max(longest, (now - page.last_fetched).days)
+            page.fetches += 1
+            page.changes += changed
+            page.observed_days += (now - page.last_fetched).days
+            page.last_fetched = now
+            if changed:
+                page.last_changed = now
+
+        if day > 0:
+            requests += len(selected)
+            fresh += sum(1 for url in pages if not unseen[url]) / len(pages)
+
+    return {"requests": requests, "fresh": fresh / days, "lag": sum(lags) / len(lags), "longest": longest}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulation benchmark of the adaptive crawl scheduler")
+    parser.add_argument("--days", type=int, default=60, help="days of daily updates simulated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pages = _pages(random.Random(args.seed))
+    total = len(pages)
+    print(f"{total} pages, {args.days} daily updates, max staleness {MAX_STALENESS} days")
+    print(f"{'policy':<24}{'requests':>10}{'fresh':>8}{'lag (days)':>12}{'max age':>9}")
+
+    runs = [("every page", None, False)]
+    for share in (0.5, 0.35, 0.25):
+        budget = round(total * share)
+        runs += [(f"round robin, {budget}/day", budget, False), (f"adaptive, {budget}/day", budget, True)]
+
+    for label, budget, adaptive in runs:
+        result = _simulate(pages, args.days, budget, adaptive, args.seed)
+        print(f"{label:<24}{result['requests']:>10}{result['fresh']:>8.1%}{result['lag']:>12.2f}{result['longest']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
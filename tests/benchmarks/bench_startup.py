@@ -0,0 +1,106 @@
+"""
+Startup time benchmark for the CLI commands.
+
+Imports the entry point and the modules of each command in a fresh interpreter
+with python -X importtime, and reports the import time of the app's modules
+(interpreter startup excluded) against a budget per command. Bytecode is compiled
+first, so the numbers do not include compiling stale sources.
+
+Run with: python -m tests.benchmarks.bench_startup [--runs N] [--budget COMMAND=MS ...]
+Exits with status 1 if a command is over its budget.
+"""
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+
+# the modules each command imports (see app/main.py)
+COMMANDS = {
+    "--help": ["app.main"],
+    "--interactive": ["app.main", "app.cli.interactive"],
+    "--compact": ["app.main", "app.cli.updater"],
+    "--trends": ["app.main", "app.cli.trends"],
+    "--update": ["app.main", "app.cli.updater", "app.cli.pipeline", "app.utils.profiling"],
+    "export": ["app.main", "app.cli.export"],
+    "--serve": ["app.main", "app.cli.server"],
+}
+
+# milliseconds; generous enough for a slow machine, tight enough to catch a heavy import
+BUDGETS = {
+    "--help": 25,
+    "--interactive": 50,
+    "--compact": 50,
+    "--trends": 250,
+    "--update": 400,
+    "export": 50,
+    "--serve": 150,
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _parse_importtime(output: str) -> list[tuple[int, int, str]]:
+    """Return the (cumulative microseconds, depth, module) of every import in -X importtime <output>."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports.append((int(cumulative), (len(name) - len(name.lstrip())) // 2, name.strip()))
+    return imports
+
+
+def measure(modules: list[str]) -> tuple[float, list[tuple[int, str]]]:
+    """Return the milliseconds spent importing <modules> in a fresh interpreter, and the
+    (microseconds, module) of their heaviest direct dependencies outside the app.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    imports = _parse_importtime(result.stderr)
+
+    # the app's imports start at the first top-level app module; everything before is interpreter startup
+    start = next(i for i, (_, depth, name) in enumerate(imports) if depth == 0 and name.split(".")[0] == "app")
+    total = sum(cumulative for cumulative, depth, _ in imports[start:] if depth == 0)
+
+    # dependencies imported directly by an app module (a module's imports are listed before it)
+    dependencies = []
+    for i in range(start, len(imports)):
+        cumulative, depth, name = imports[i]
+        parent = next((parent for _, parent_depth, parent in imports[i + 1:] if parent_depth < depth), "")
+        if name.split(".")[0] != "app" and parent.split(".")[0] == "app":
+            dependencies.append((cumulative, name))
+    return total / 1000, sorted(dependencies, reverse=True)[:3]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="CLI startup time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="runs per command; the fastest is reported")
+    parser.add_argument("--budget", action="append", default=[], metavar="COMMAND=MS",
+                        help="override the budget of a command, e.g. --budget=--interactive=40")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for override in args.budget:
+        command, milliseconds = override.rsplit("=", 1)
+        budgets[command] = float(milliseconds)
+
+    compileall.compile_dir(os.path.join(PROJECT_ROOT, "app"), quiet=1)
+
+    over = []
+    for command, modules in COMMANDS.items():
+        runs = [measure(modules) for _ in range(args.runs)]
+        milliseconds, dependencies = min(runs)
+        status = "ok" if milliseconds <= budgets[command] else "OVER BUDGET"
+        if status != "ok":
+            over.append(command)
+        heaviest = ", ".join(f"{name} {cumulative / 1000:.1f}" for cumulative, name in dependencies)
+        print(f"{command:14} {milliseconds:7.1f} ms (budget {budgets[command]:5.0f}) {status:11} {heaviest}")
+
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
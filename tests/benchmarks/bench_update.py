@@ -0,0 +1,200 @@
+"""
+End-to-end benchmark of a database update, run offline against a MockRetailer.
+
+Runs the real scrape_newegg_* -> insert_all_* path of every category into a fresh
+database, then times fetch_* queries on the result. Reports pages/sec, parse
+ms/page, inserts/sec, fetch_* latency, and peak RSS, and saves them as JSON so
+runs can be compared; with --compare, metrics that regressed by more than
+--threshold are listed and the exit status is 1.
+
+Run with: python -m tests.benchmarks.bench_update [--pages N] [--latency S] [--error-rate P]
+                                                 [--compare OLD.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from app.database import database, migrations
+from app.scraper import scraper
+from app.scraper.cache import PageCache, set_cache
+from app.scraper.categories import CATEGORIES
+from app.scraper.client import HttpClient, set_client
+from tests.benchmarks.mock_retailer import MockRetailer
+
+
+RESULTS_DIR = ".benchmarks"
+
+STEPS = {
+    "cpu": (scraper.scrape_newegg_cpus, database.insert_all_cpus, database.fetch_cpus),
+    "gpu": (scraper.scrape_newegg_gpus, database.insert_all_gpus, database.fetch_gpus),
+    "mobo": (scraper.scrape_newegg_mobos, database.insert_all_mobos, database.fetch_mobos),
+}
+
+# metrics where a higher value is better; for every other metric lower is better
+HIGHER_IS_BETTER = {"pages_per_sec", "inserts_per_sec"}
+
+
+def _peak_rss_mb() -> float | None:
+    """Return the peak resident set size of this process in MiB, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10 # bytes on macOS, KiB elsewhere
+
+
+def _latency_ms(query, repeat: int) -> dict[str, float]:
+    """Return the median and 95th percentile latency of <query> in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"median": statistics.median(times), "p95": times[min(len(times) - 1, int(len(times) * 0.95))]}
+
+
+def _bench_category(retailer: MockRetailer, connection, name: str, repeat: int) -> dict:
+    """Return the metrics of updating and querying the category <name>."""
+    scrape, insert_all, fetch = STEPS[name]
+    category = retailer.category(name)
+    requests = retailer.requests
+
+    registered = CATEGORIES[name]
+    CATEGORIES[name] = category # the scrape_newegg_* functions read the registry
+    try:
+        start = time.perf_counter()
+        parts = scrape()
+        scraped = time.perf_counter() - start
+    finally:
+        CATEGORIES[name] = registered
+
+    pages = len(category.listing_urls) * retailer.pages
+    bodies = [retailer.render(name, listing, page)
+              for listing in range(len(category.listing_urls)) for page in range(1, retailer.pages + 1)]
+    start = time.perf_counter()
+    for body in bodies:
+        scraper.parse_page_text(body, category.extract_info)
+    parse_ms = (time.perf_counter() - start) * 1000 / len(bodies)
+
+    start = time.perf_counter()
+    insert_all(connection, parts)
+    inserted = time.perf_counter() - start
+
+    sample = parts.names[0].split()[-1] if len(parts) else ""
+    return {
+        "pages": pages,
+        "requests": retailer.requests - requests,
+        "listings": len(parts),
+        "pages_per_sec": pages / scraped,
+        "parse_ms_per_page": parse_ms,
+        "inserts_per_sec": len(parts) / inserted if inserted > 0 else 0,
+        "fetch_all_ms": _latency_ms(lambda: fetch(connection), repeat),
+        "fetch_search_ms": _latency_ms(lambda: fetch(connection, sample), repeat),
+    }
+
+
+def run(pages: int, items_per_page: int, latency: float, error_rate: float, repeat: int) -> dict:
+    """Return the results of one benchmark run."""
+    config = {"pages": pages, "items_per_page": items_per_page, "latency": latency, "error_rate": error_rate,
+              "repeat": repeat}
+    results = {"timestamp": datetime.now().isoformat(timespec="seconds"), "config": config, "categories": {}}
+
+    with tempfile.TemporaryDirectory() as directory, \
+            MockRetailer(pages, items_per_page, latency, error_rate) as retailer:
+        set_client(HttpClient(backoff=0.01, rate_limit=False))
+        set_cache(PageCache(os.path.join(directory, "cache.db")))
+        connection = database.get_connection(os.path.join(directory, "parts.db"))
+        migrations.migrate(connection)
+        try:
+            for name in STEPS:
+                results["categories"][name] = _bench_category(retailer, connection, name, repeat)
+        finally:
+            connection.close()
+            set_client(None)
+            set_cache(None)
+        results["errors_served"] = retailer.errors
+
+    results["peak_rss_mb"] = _peak_rss_mb()
+    return results
+
+
+def _flatten(results: dict) -> dict[str, float]:
+    """Return every numeric metric of <results> keyed by its dotted path."""
+    flat = {}
+    for name, metrics in results["categories"].items():
+        for metric, value in metrics.items():
+            if isinstance(value, dict):
+                flat.update({f"{name}.{metric}.{key}": v for key, v in value.items()})
+            elif metric.endswith(("_per_sec", "_ms_per_page")):
+                flat[f"{name}.{metric}"] = value
+    if results.get("peak_rss_mb"):
+        flat["peak_rss_mb"] = results["peak_rss_mb"]
+    return flat
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[str]:
+    """Print how every metric of <new> changed since <old>, and return the metrics that
+    got worse by more than <threshold> (a fraction).
+    """
+    if old["config"] != new["config"]:
+        print(f"warning: comparing runs with different configurations ({old['config']} vs {new['config']}).")
+
+    old_metrics, new_metrics = _flatten(old), _flatten(new)
+    regressions = []
+    for metric, value in new_metrics.items():
+        if metric not in old_metrics or not old_metrics[metric]:
+            continue
+        change = (value - old_metrics[metric]) / old_metrics[metric]
+        worse = -change if metric.split(".")[-1] in HIGHER_IS_BETTER else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(metric)
+        print(f"{metric:32} {old_metrics[metric]:12.2f} -> {value:12.2f} ({change:+.1%}){flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end update benchmark")
+    parser.add_argument("--pages", type=int, default=20, help="pages of every listing")
+    parser.add_argument("--items", type=int, default=36, help="listings per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed by")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 response")
+    parser.add_argument("--repeat", type=int, default=20, help="runs of every fetch_* query")
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/update-<time>.json)")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.items, args.latency, args.error_rate, args.repeat)
+
+    for name, metrics in results["categories"].items():
+        print(f"{name:5} {metrics['pages']:4} pages  {metrics['pages_per_sec']:8.1f} pages/sec  "
+              f"parse {metrics['parse_ms_per_page']:6.2f} ms/page  {metrics['inserts_per_sec']:9.0f} inserts/sec  "
+              f"fetch {metrics['fetch_all_ms']['median']:7.2f} ms  search {metrics['fetch_search_ms']['median']:6.2f} ms")
+    if results["peak_rss_mb"] is not None:
+        print(f"peak RSS: {results['peak_rss_mb']:.1f} MiB")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"update-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"saved {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Load test of the read API (python -m app.main --serve) on localhost.
+
+Builds a database of synthetic parts, serves it from a separate process, and has
+<connections> concurrent keep-alive clients request a mix of parts pages, summary
+pages, searches, and latest-price lookups for <duration> seconds. Reports requests
+per second, latency percentiles, errors, and the share of responses served from the
+response cache. Use --cache-size 0 to measure the server without its cache, or --url
+to load a server that is already running.
+
+Run with: python -m tests.benchmarks.load_server [--connections N] [--duration S]
+                                                 [--readers N] [--cache-size N] [--url URL]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import quote, urlsplit
+from app.database import connection, database, migrations
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+from app.models.motherboard import MOBO
+
+
+PARTS = 2000 # parts per category
+DAYS = 5 # observed prices per part
+
+NAMES = {
+    "cpu": (CPU, ["AMD Ryzen 5", "AMD Ryzen 7", "AMD Ryzen 9", "Intel Core i5", "Intel Core i7", "Intel Core i9"]),
+    "gpu": (GPU, ["ASUS GeForce RTX", "MSI GeForce RTX", "Gigabyte Radeon RX", "Sapphire Radeon RX", "EVGA GeForce GTX"]),
+    "mobo": (MOBO, ["ASUS ROG Strix", "MSI MAG Tomahawk", "Gigabyte Aorus Elite", "ASRock Steel Legend"]),
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _build(path: str) -> None:
+    """Create a database at <path> with <PARTS> parts of every category, each priced on <DAYS> days."""
+    rng = random.Random(0)
+    with connection.writer(path) as writer:
+        migrations.migrate(writer)
+        for part_type, (part_class, series) in NAMES.items():
+            for day in range(1, DAYS + 1):
+                database.insert_parts(writer, [
+                    part_class(f"{series[i % len(series)]} {i}", "newegg", f"https://example.com/{part_type}/{i}",
+                               f"{rng.randrange(50, 2000)}.99", f"2025-01-{day:02d}", series[i % len(series)].split()[0])
+                    for i in range(PARTS)])
+
+
+def _target(rng: random.Random) -> str:
+    """Return a random request target, weighted towards the lookups tools make most."""
+    part_type = rng.choice(list(NAMES))
+    series = NAMES[part_type][1]
+    kind = rng.choices(["latest", "search", "summaries", "parts"], weights=[4, 3, 2, 1])[0]
+    if kind == "latest":
+        ids = ",".join(str(rng.randrange(1, PARTS + 1)) for _ in range(rng.randint(1, 5)))
+        return f"/{part_type}/latest?id={ids}"
+    if kind == "search":
+        return f"/{part_type}/search?q={quote(rng.choice(series).split()[-1])}&limit=10"
+    if kind == "summaries":
+        return f"/{part_type}/summaries?limit=25&offset={25 * rng.randrange(20)}"
+    return f"/{part_type}/parts?limit=25&after={25 * rng.randrange(100)}"
+
+
+async def _client(host: str, port: int, deadline: float, seed: int, results: list) -> None:
+    """Send requests over one keep-alive connection until <deadline>, appending the
+    (seconds, status, cache) of every response to <results>.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(f"GET {_target(rng)} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+            headers = dict(line.split(": ", 1) for line in head.split("\r\n")[1:] if ": " in line)
+            await reader.readexactly(int(headers["Content-Length"]))
+            results.append((time.perf_counter() - start, int(head.split(" ", 2)[1]), headers.get("X-Cache", "")))
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        results.append((0.0, 0, type(e).__name__))
+    finally:
+        writer.close()
+
+
+async def _load(host: str, port: int, connections: int, duration: float) -> tuple[list, float]:
+    """Return the results of <connections> concurrent clients running for <duration> seconds, and the elapsed time."""
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, start + duration, seed, results) for seed in range(connections)))
+    return results, time.perf_counter() - start
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float=30) -> None:
+    """Wait until the server at <url> answers its health check."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"the server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(url + "/health", timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("the server did not start")
+
+
+def _free_port() -> int:
+    """Return a local port that is free to listen on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _report(results: list, elapsed: float) -> None:
+    """Print the throughput, latency, errors, and cache use of <results>."""
+    latencies = sorted(seconds * 1000 for seconds, status, _ in results if status == 200)
+    errors = sum(1 for _, status, _ in results if status != 200)
+    hits = sum(1 for _, status, cache in results if status == 200 and cache in ("HIT", "SHARED"))
+    if not latencies:
+        print(f"no successful requests ({errors} errors)")
+        return
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))]
+
+    print(f"{len(results)} requests in {elapsed:.1f} s: {len(results) / elapsed:,.0f} requests/sec")
+    print(f"latency ms: p50 {percentile(0.5):.2f}, p95 {percentile(0.95):.2f}, p99 {percentile(0.99):.2f}, "
+          f"max {latencies[-1]:.2f}")
+    print(f"errors: {errors}, cached responses: {hits / len(latencies):.0%}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test of the read API on localhost")
+    parser.add_argument("--connections", type=int, default=100, help="concurrent keep-alive clients")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--readers", type=int, default=4, help="read-only connections of the server")
+    parser.add_argument("--cache-size", type=int, default=1024, help="responses cached by the server (0 disables)")
+    parser.add_argument("--url", help="load this running server instead of starting one on a synthetic database")
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        results, elapsed = asyncio.run(_load(url.hostname, url.port or 80, args.connections, args.duration))
+        _report(results, elapsed)
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "parts.db")
+        print(f"building a database of {PARTS * len(NAMES)} parts...")
+        _build(path)
+
+        port = _free_port()
+        env = {**os.environ, "SERVER_READERS": str(args.readers), "SERVER_CACHE_SIZE": str(args.cache_size)}
+        process = subprocess.Popen([sys.executable, "-c", f"from app.cli import server; "
+                                    f"server.run_server('127.0.0.1', {port}, {path!r})"],
+                                   cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL)
+        try:
+            _wait_until_up(f"http://127.0.0.1:{port}", process)
+            print(f"{args.connections} connections for {args.duration:g} s, {args.readers} readers, "
+                  f"cache size {args.cache_size}")
+            results, elapsed = asyncio.run(_load("127.0.0.1", port, args.connections, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+        _report(results, elapsed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+A local stand-in for the Newegg listing pages, used by the benchmarks.
+
+Pages are generated from the recorded listing page, with the listings of each
+category drawn from the recorded titles in fixtures/titles.tsv, so parsing and
+title extraction do realistic work. The number of pages, listings per page,
+response latency, and rate of failed responses are configurable.
+"""
+
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import parse_qs, urlparse
+from app.scraper.categories import Category, CATEGORIES
+from tests.conftest import read_fixture
+
+
+def _load_titles() -> dict[str, list[str]]:
+    """Return the recorded listing titles of every category."""
+    titles = {}
+    for line in read_fixture("titles.tsv").splitlines():
+        category, title = line.split("\t", 1)
+        titles.setdefault(category, []).append(title)
+    return titles
+
+
+class _RetailerHandler(BaseHTTPRequestHandler):
+    """Serves /<category>/<listing>?page=N from the pages of <server.retailer>."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        retailer = self.server.retailer
+        url = urlparse(self.path)
+        category, listing = url.path.strip("/").split("/")
+        page = int(parse_qs(url.query).get("page", ["1"])[0])
+
+        if retailer.latency:
+            time.sleep(retailer.latency)
+        body = retailer.render(category, int(listing), page).encode()
+
+        with retailer.lock:
+            retailer.requests += 1
+            failed = retailer.random.random() < retailer.error_rate
+            retailer.errors += failed
+        if failed:
+            self.send_error(503)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class MockRetailer():
+    """A local HTTP server serving generated listing pages of every registered category.
+
+    === Attributes ===
+    pages: the number of pages of every listing
+    items_per_page: the number of listings on every page
+    latency: seconds every response is delayed by
+    error_rate: the probability that a response is a 503 error
+    requests: the number of requests served
+    errors: the number of error responses served
+    """
+    pages: int
+    items_per_page: int
+    latency: float
+    error_rate: float
+    requests: int
+    errors: int
+
+    def __init__(self, pages: int=10, items_per_page: int=36, latency: float=0.0,
+                 error_rate: float=0.0, seed: int=0) -> None:
+        """Initialize a new MockRetailer. It serves requests once started."""
+        self.pages = pages
+        self.items_per_page = items_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        listing = read_fixture("newegg_listing.html")
+        grid_start = listing.index('<div class="item-cell"')
+        grid_end = listing.index("  </div>\n</div>\n<footer>")
+        self._head = listing[:grid_start]
+        self._tail = listing[grid_end:]
+        self._cell = listing[grid_start:listing.index('<div class="item-cell"', grid_start + 1)]
+        self._titles = _load_titles()
+        self._rendered = {}
+        self._httpd = None
+
+    def render(self, category: str, listing: int, page: int) -> str:
+        """Return the body of page <page> of the listing <listing> of <category>."""
+        key = (category, listing, page)
+        if key not in self._rendered:
+            titles = self._titles[category]
+            cells = []
+            for i in range(self.items_per_page):
+                index = ((listing * self.pages + page - 1) * self.items_per_page + i)
+                title = titles[index % len(titles)]
+                link = f"https://www.newegg.ca/p/N82E168{listing}{index:07}"
+                dollars = 50 + (index * 37 + page) % 1500
+                cell = re.sub(r'href="[^"]*"', f'href="{link}"', self._cell)
+                cell = re.sub(r'(class="item-title"[^>]*>)[^<]*', lambda m: m.group(1) + escape(title), cell)
+                cell = re.sub(r"<strong>[\d,]+</strong><sup>\.\d+</sup>",
+                              f"<strong>{dollars:,}</strong><sup>.99</sup>", cell)
+                cells.append(cell)
+
+            head = self._head.replace("1<!-- -->/<!-- -->7", f"{page}<!-- -->/<!-- -->{self.pages}")
+            self._rendered[key] = head + "".join(cells) + self._tail
+        return self._rendered[key]
+
+    def start(self) -> "MockRetailer":
+        """Start serving requests in a background thread."""
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _RetailerHandler)
+        self._httpd.retailer = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving requests."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockRetailer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def category(self, name: str) -> Category:
+        """Return the registered category <name>, with its listings served by this retailer."""
+        registered = CATEGORIES[name]
+        host = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        return Category(registered.name, registered.label, registered.part_class, registered.website,
+                        [f"{host}/{name}/{listing}?page={{page}}" for listing in range(len(registered.listing_urls))],
+                        registered.extract_info)
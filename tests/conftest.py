@@ -0,0 +1,86 @@
+"""Shared fixtures for the test suite."""
+
+import os
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from app.database import migrations
+from app.models.cpu import CPU
+from app.scraper.cache import PageCache, set_cache
+from app.scraper.client import HttpClient, set_client
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name: str) -> str:
+    """Return the contents of the fixture file <name>."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_cpu(name: str, price: str="199.99", date: str="2025-01-01") -> CPU:
+    """Return a Newegg listing of the cpu <name> at <price> on <date>, branded by its first word."""
+    return CPU(name, "newegg", f"https://www.newegg.ca/p/{name.replace(' ', '-')}", price, date, name.split()[0])
+
+
+@pytest.fixture
+def connection():
+    """Return a connection to an empty, migrated in-memory database, usable from any thread."""
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrations.migrate(connection)
+    yield connection
+    connection.close()
+
+
+class _ListingHandler(BaseHTTPRequestHandler):
+    """Serves the recorded listing page for every ?page=N, with the pagination set to <server.pages>.
+    Pages in <server.failing> are not found.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+        self.server.requested.append(page)
+        if page in self.server.failing:
+            self.send_error(404)
+            return
+
+        body = self.server.listing.replace("1<!-- -->/<!-- -->7", f"{page}<!-- -->/<!-- -->{self.server.pages}")
+        body = body.encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def listing_server(tmp_path):
+    """Run a local stand-in for the Newegg listing pages, and route the scrapers through
+    an unlimited HTTP client and a temporary cache while it runs.
+    """
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ListingHandler)
+    httpd.listing = read_fixture("newegg_listing.html")
+    httpd.pages = 3
+    httpd.requested = []
+    httpd.failing = set()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/p/pl?N=100007708&page={{page}}"
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    set_client(HttpClient(backoff=0, rate_limit=False))
+    set_cache(PageCache(str(tmp_path / "cache.db")))
+
+    yield httpd
+
+    set_client(None)
+    set_cache(None)
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,123 @@
+"""Testing module for the price history analytics in price_history.py"""
+
+import sqlite3
+from datetime import date
+import numpy as np
+import pytest
+from app.analytics import price_history
+from app.database import database, migrations
+from tests.conftest import make_cpu
+
+TODAY = date(2025, 3, 31).toordinal()
+
+
+@pytest.fixture
+def connection(connection):
+    """Return a connection to an in-memory database holding a small cpu price history."""
+    database.insert_parts(connection, [
+        make_cpu("AMD Ryzen 5 7600", "200.00", "2025-01-01"),
+        make_cpu("AMD Ryzen 5 7600", "250.00", "2025-02-01"),
+        make_cpu("AMD Ryzen 5 7600", "150.00", "2025-03-21"),
+        make_cpu("Intel Core i5-13400F", "300.00", "2025-01-15"),
+        make_cpu("Intel Core i5-13400F", "300.00", "2025-03-30"),
+        make_cpu("AMD Ryzen 7 7800X3D", "400.00", "2025-03-11"),
+        make_cpu("AMD Ryzen 7 7800X3D", "440.00", "2025-03-21"),
+    ])
+    return connection
+
+
+def _trends_by_name(connection, days: int) -> dict[str, dict]:
+    history = price_history.PriceHistory.load(connection, "cpu")
+    trends = price_history.compute_trends(history, days, today=TODAY)
+    names = price_history.part_names(connection, "cpu", trends.part_ids)
+    columns = ["latest_cents", "start_cents", "change_pct", "drop_from_high_pct", "average_cents", "volatility"]
+    return {names[int(part_id)]: {column: getattr(trends, column)[i] for column in columns}
+            for i, part_id in enumerate(trends.part_ids)}
+
+
+def test_load_reads_sorted_columns(connection) -> None:
+    """Test that the history is one sorted row per stored price."""
+    history = price_history.PriceHistory.load(connection, "cpu")
+
+    assert len(history) == 6  # the unchanged Intel price extends its first row
+    assert list(history.parts) == sorted(set(history.part_ids.tolist()))
+    assert history.days[0] == date(2025, 1, 1).toordinal()
+    assert history.cents.dtype == np.int64
+
+
+def test_price_on(connection) -> None:
+    """Test the price in effect on a given day, including before a part was priced."""
+    history = price_history.PriceHistory.load(connection, "cpu")
+
+    assert list(history.price_on(date(2025, 2, 15).toordinal())) == [25000, 30000, -1]
+    assert list(history.price_on(date(2025, 2, 1).toordinal())) == [25000, 30000, -1]
+    assert list(history.price_on(date(2024, 12, 31).toordinal())) == [-1, -1, -1]
+
+
+def test_compute_trends(connection) -> None:
+    """Test every metric against values worked out by hand."""
+    trends = _trends_by_name(connection, days=20)
+
+    ryzen5 = trends["AMD Ryzen 5 7600"]
+    assert ryzen5["start_cents"] == 25000 and ryzen5["latest_cents"] == 15000
+    assert ryzen5["change_pct"] == pytest.approx(-40)
+    assert ryzen5["drop_from_high_pct"] == pytest.approx(40)
+    # 10 days at 250.00 (Mar 11-20), 11 days at 150.00 (Mar 21-31)
+    assert ryzen5["average_cents"] == pytest.approx((10 * 25000 + 11 * 15000) / 21)
+    assert ryzen5["volatility"] == 0  # a single move in the window
+
+    intel = trends["Intel Core i5-13400F"]
+    assert intel["change_pct"] == 0 and intel["volatility"] == 0
+
+    ryzen7 = trends["AMD Ryzen 7 7800X3D"]
+    assert ryzen7["start_cents"] == 40000
+    assert ryzen7["change_pct"] == pytest.approx(10)
+    assert ryzen7["drop_from_high_pct"] == 0
+
+
+def test_compute_trends_part_priced_after_window_start(connection) -> None:
+    """Test that parts first listed during the window change from their first price."""
+    ryzen7 = _trends_by_name(connection, days=30)["AMD Ryzen 7 7800X3D"]
+
+    assert ryzen7["start_cents"] == 40000
+    assert ryzen7["change_pct"] == pytest.approx(10)
+    # averaged only over the days it was priced
+    assert ryzen7["average_cents"] == pytest.approx((10 * 40000 + 11 * 44000) / 21)
+
+
+def test_volatility_matches_log_returns() -> None:
+    """Test that volatility is the standard deviation of the log returns in the window."""
+    cents = np.array([100, 200, 100, 150], dtype=np.int64)
+    days = np.arange(4, dtype=np.int64) + TODAY - 3
+    history = price_history.PriceHistory("cpu", np.ones(4, dtype=np.int64), days, cents)
+
+    trends = price_history.compute_trends(history, days=10, today=TODAY)
+
+    assert trends.volatility[0] == pytest.approx(np.std(np.diff(np.log(cents))))
+
+
+def test_biggest_movers(connection) -> None:
+    """Test that movers are ordered by the size of their change and exclude unmoved parts."""
+    history = price_history.PriceHistory.load(connection, "cpu")
+    trends = price_history.compute_trends(history, days=20, today=TODAY)
+    names = price_history.part_names(connection, "cpu", trends.part_ids)
+
+    movers = [names[int(trends.part_ids[i])] for i in trends.biggest_movers(5)]
+
+    assert movers == ["AMD Ryzen 5 7600", "AMD Ryzen 7 7800X3D"]
+
+
+def test_empty_history() -> None:
+    """Test that an empty category yields empty trends."""
+    connection = sqlite3.connect(":memory:")
+    migrations.migrate(connection)
+
+    history = price_history.PriceHistory.load(connection, "gpu")
+    trends = price_history.compute_trends(history, today=TODAY)
+
+    assert len(history) == 0 and len(trends) == 0
+    assert len(trends.biggest_movers()) == 0
+
+
+if __name__ == "__main__":
+    pytest.main(["test_analytics.py"])
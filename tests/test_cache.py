@@ -0,0 +1,95 @@
+"""Testing module for the HTTP response cache in cache.py"""
+
+import os
+import time
+from app.models.cpu import CPU
+from app.scraper import scraper
+from app.scraper.cache import PageCache, set_cache
+from app.scraper.categories import Category
+from app.utils.parsing import extract_cpu_info
+
+
+LISTING = """
+<div class="item-cell">
+  <a class="item-title" href="https://www.newegg.ca/p/N82E16819113843">AMD Ryzen 7 9800X3D - Desktop Processor</a>
+  <ul><li class="price-current">$<strong>629</strong><sup>.99</sup></li></ul>
+</div>
+<div class="item-cell">
+  <a class="item-title" href="https://www.newegg.ca/p/N82E16819118505">Intel Core i5-14600K Desktop Processor</a>
+  <ul><li class="price-current"></li></ul>
+</div>
+"""
+
+
+def test_put_and_get(tmp_path) -> None:
+    """Test that a stored response is returned with its validators."""
+    cache = PageCache(str(tmp_path / "cache.db"))
+    cache.put("https://a/1", "body", etag='"abc"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+    entry = cache.get("https://a/1")
+    assert entry.text == "body"
+    assert entry.items is None
+    assert entry.conditional_headers() == {"If-None-Match": '"abc"',
+                                           "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.get("https://a/2") is None
+
+
+def test_items_kept_only_for_unchanged_body(tmp_path) -> None:
+    """Test that extracted items survive a re-fetch of the same body, but not of a new one."""
+    cache = PageCache(str(tmp_path / "cache.db"))
+    entry = cache.put("https://a/1", "body")
+    cache.set_items("https://a/1", entry.body_hash, [["title", "link", "1.00"]])
+
+    assert cache.put("https://a/1", "body").items == [["title", "link", "1.00"]]
+    assert cache.put("https://a/1", "new body").items is None
+
+
+def test_ttl_and_size_eviction(tmp_path) -> None:
+    """Test that expired entries and least recently used entries over the cap are evicted."""
+    cache = PageCache(str(tmp_path / "cache.db"), ttl=0)
+    cache.put("https://a/1", "body")
+    time.sleep(0.01)
+    assert cache.get("https://a/1") is None
+
+    # random hex bodies compress to about 130 bytes each, so only two fit
+    cache = PageCache(str(tmp_path / "lru.db"), max_bytes=300)
+    cache.put("https://a/1", os.urandom(100).hex())
+    time.sleep(0.01)
+    cache.put("https://a/2", os.urandom(100).hex())
+    time.sleep(0.01)
+    cache.get("https://a/1")
+    cache.put("https://a/3", os.urandom(100).hex())
+
+    assert cache.get("https://a/1") is not None
+    assert cache.get("https://a/2") is None
+    assert cache.get("https://a/3") is not None
+
+
+def test_unchanged_page_is_not_parsed(tmp_path, monkeypatch) -> None:
+    """Test that the listings of an unchanged page come from the cache instead of the parser."""
+    category = Category("cpu", "CPUs", CPU, "newegg", ["https://a/{page}"], extract_cpu_info)
+    cache = PageCache(str(tmp_path / "cache.db"))
+    set_cache(cache)
+    try:
+        entry = cache.put("https://a/1", LISTING)
+        batch = scraper.parse_category_page(category, scraper.Page(entry.url, entry.text, entry.body_hash, entry.items))
+        assert list(zip(batch.names, batch.links, batch.prices)) == [
+            ("AMD Ryzen 7 9800X3D", "https://www.newegg.ca/p/N82E16819113843", "629.99"),
+            ("Intel Core i5-14600K", "https://www.newegg.ca/p/N82E16819118505", "N/A")]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("page was parsed again")
+        monkeypatch.setattr(scraper, "get_parser", fail)
+
+        entry = cache.put("https://a/1", LISTING)
+        assert entry.items is not None
+        cached = scraper.parse_category_page(category, scraper.Page(entry.url, entry.text, entry.body_hash, entry.items))
+        assert list(zip(cached.names, cached.links, cached.prices)) == list(zip(batch.names, batch.links, batch.prices))
+    finally:
+        set_cache(None)
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_cache.py"])
@@ -0,0 +1,95 @@
+"""Testing module for the HTTP client in client.py, run against a local stand-in server."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.scraper.client import HttpClient
+from app.utils.metrics import set_metrics
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the statuses queued in <server.statuses>, then 200 once the queue is empty."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.server.hits += 1
+        self.server.ports.add(self.client_address[1])
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        body = f"page {self.path}".encode()
+
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    """Run a local HTTP server for the duration of a test."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.statuses, httpd.hits, httpd.ports = [], 0, set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path: str="/p/pl?page=1") -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_connections_are_reused(server) -> None:
+    """Test that consecutive requests share one keep-alive connection."""
+    client = HttpClient(backoff=0, rate_limit=False)
+    for page in range(5):
+        assert client.get(_url(server, f"/p/pl?page={page}")).text == f"page /p/pl?page={page}"
+
+    assert server.hits == 5
+    assert len(server.ports) == 1
+    client.close()
+
+
+def test_retries_transient_errors(server) -> None:
+    """Test that 429 and 5xx responses are retried until the request succeeds."""
+    server.statuses = [503, 429, 500]
+    client = HttpClient(max_retries=3, backoff=0, rate_limit=False)
+    metrics = set_metrics(None)
+
+    assert client.get(_url(server)).status_code == 200
+    assert server.hits == 4
+    assert metrics.counter("http_retries_total") == 3
+    assert metrics.counter("http_requests_total", status=503) == 1
+    assert metrics.counter("http_requests_total", status=200) == 1
+    assert metrics.histograms[("http_request_seconds", ())].count == 4
+    client.close()
+
+
+def test_gives_up_after_max_retries(server) -> None:
+    """Test that a persistent error status raises once retries are exhausted."""
+    server.statuses = [503] * 10
+    client = HttpClient(max_retries=2, backoff=0, rate_limit=False)
+
+    with pytest.raises(requests.HTTPError):
+        client.get(_url(server))
+    assert server.hits == 3
+    client.close()
+
+
+def test_client_errors_are_not_retried(server) -> None:
+    """Test that a 404 is raised immediately."""
+    server.statuses = [404]
+    client = HttpClient(max_retries=3, backoff=0, rate_limit=False)
+
+    with pytest.raises(requests.HTTPError):
+        client.get(_url(server))
+    assert server.hits == 1
+    client.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["test_client.py"])
@@ -0,0 +1,64 @@
+"""Testing module for the database connections in connection.py"""
+
+import sqlite3
+import pytest
+from app.database import connection, database, migrations
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    """Return the path of a migrated database file."""
+    path = str(tmp_path / "parts.db")
+    with connection.writer(path) as writer:
+        migrations.migrate(writer)
+    return path
+
+
+def test_writer_pragmas(db_path) -> None:
+    """Test that connections use WAL and the configured pragmas."""
+    with connection.writer(db_path) as writer:
+        assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert writer.execute("PRAGMA synchronous").fetchone()[0] == 1 # NORMAL
+        assert writer.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+        assert writer.execute("PRAGMA cache_size").fetchone()[0] < 0
+
+
+def test_readers_do_not_block_on_writer(db_path) -> None:
+    """Test that a reader sees the last committed state while the writer holds a write transaction."""
+    with connection.writer(db_path) as writer, connection.reader(db_path) as reader:
+        writer.execute("INSERT INTO cpus (brand, name) VALUES ('AMD', 'AMD Ryzen 5 7600')")
+        writer.commit()
+
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO cpus (brand, name) VALUES ('Intel', 'Intel Core i5-13400F')")
+        assert reader.execute("SELECT name FROM cpus").fetchall() == [("AMD Ryzen 5 7600",)]
+        writer.commit()
+
+        assert len(reader.execute("SELECT name FROM cpus").fetchall()) == 2
+
+
+def test_reader_is_read_only(db_path) -> None:
+    """Test that reader connections reject writes."""
+    with connection.reader(db_path) as reader:
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("INSERT INTO cpus (brand, name) VALUES ('AMD', 'AMD Ryzen 5 7600')")
+
+
+def test_connections_are_closed(db_path) -> None:
+    """Test that the context managers close their connection on exit, even on errors."""
+    with pytest.raises(ValueError):
+        with connection.reader(db_path) as reader:
+            raise ValueError()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        reader.execute("SELECT 1")
+
+
+def test_get_connection_raises(tmp_path) -> None:
+    """Test that a database that cannot be opened raises instead of returning None."""
+    with pytest.raises(sqlite3.Error):
+        database.get_connection(str(tmp_path / "missing" / "parts.db"))
+
+
+if __name__ == "__main__":
+    pytest.main(["test_connection.py"])
@@ -0,0 +1,200 @@
+"""Testing module for the database functions in database.py"""
+
+import sqlite3
+import pytest
+from app.database import checkpoints, database, migrations
+from app.models.gpu import GPU
+from tests.conftest import make_cpu
+
+
+def test_insert_parts_matches_single_inserts(connection) -> None:
+    """Test that bulk inserts store exactly what inserting one part at a time stores."""
+    cpus = [make_cpu("AMD Ryzen 7 7800X3D"), make_cpu("Intel Core i5-13400F"), make_cpu("AMD Ryzen 7 7800X3D", "379.99")]
+
+    assert database.insert_parts(connection, cpus, batch_size=2) == 3
+
+    reference = sqlite3.connect(":memory:")
+    migrations.migrate(reference)
+    for cpu in cpus:
+        database.insert_cpu(reference, cpu)
+
+    query = "SELECT * FROM cpus ORDER BY id"
+    assert connection.execute(query).fetchall() == reference.execute(query).fetchall()
+    query = "SELECT * FROM cpu_prices ORDER BY id"
+    assert connection.execute(query).fetchall() == reference.execute(query).fetchall()
+
+
+def test_insert_parts_reuses_existing_ids(connection) -> None:
+    """Test that parts already in the database are not inserted again."""
+    database.insert_all_cpus(connection, [make_cpu("AMD Ryzen 5 7600X")])
+    database.insert_all_cpus(connection, [make_cpu("AMD Ryzen 5 7600X", "189.99", "2025-01-02"), make_cpu("Intel Pentium G7400")])
+
+    assert connection.execute("SELECT id, name FROM cpus ORDER BY id").fetchall() == [(1, "AMD Ryzen 5 7600X"),
+                                                                                    (2, "Intel Pentium G7400")]
+    assert connection.execute("SELECT cpu_id, price_date FROM cpu_prices ORDER BY id").fetchall() == [
+        (1, "2025-01-01"), (1, "2025-01-02"), (2, "2025-01-01")]
+
+
+def test_insert_parts_per_type(connection) -> None:
+    """Test that parts are written to the tables of their own type."""
+    database.insert_all_gpus(connection, [GPU("ASUS TUF RTX 4070", "newegg", "link", "899.99", "2025-01-01", "ASUS")])
+
+    assert connection.execute("SELECT COUNT(*) FROM gpu_prices").fetchone()[0] == 1
+    assert connection.execute("SELECT COUNT(*) FROM cpu_prices").fetchone()[0] == 0
+
+
+def test_search_multi_word_prefix(connection) -> None:
+    """Test that searches match every word as a prefix, in any order, best matches first."""
+    gpus = [GPU(name, "newegg", "link", "999.99", "2025-01-01", name.split()[0]) for name in (
+        "ASUS TUF Gaming GeForce RTX 4070 Ti SUPER 16GB GDDR6X",
+        "MSI Ventus 2X GeForce RTX 4070 12GB GDDR6X",
+        "GIGABYTE GeForce RTX 4070 Ti SUPER WINDFORCE OC 16G",
+        "ASUS ROG Strix GeForce RTX 4090 24GB",
+    )]
+    database.insert_all_gpus(connection, gpus)
+
+    names = [name for _, name, _ in database.search_parts(connection, "gpu", "4070 ti super")]
+    assert sorted(names) == sorted([gpus[0].name, gpus[2].name])
+
+    assert [gpu.name for gpu in database.fetch_gpus(connection, "super 4070 gigabyte")] == [gpus[2].name]
+    assert len(database.fetch_gpus(connection, "asus")) == 2
+    assert len(database.fetch_gpus(connection, "RTX 40")) == 4
+    assert database.fetch_gpus(connection, "4080") == []
+
+
+def test_iter_parts_streams_in_chunks(connection) -> None:
+    """Test that iterating parts yields the same entries as fetching them all."""
+    database.insert_all_cpus(connection, [make_cpu(f"AMD Ryzen 5 {7000 + i}X", date=f"2025-01-{i % 28 + 1:02}")
+                                          for i in range(25)])
+
+    iterator = database.iter_parts(connection, "cpu", chunk_size=4)
+    assert next(iterator).name == "AMD Ryzen 5 7000X"
+    assert len(list(iterator)) == 24
+    assert [str(cpu) for cpu in database.iter_cpus(connection)] == [str(cpu) for cpu in database.fetch_cpus(connection)]
+
+
+def test_keyset_pagination(connection) -> None:
+    """Test that pages cover every entry exactly once, with or without a search."""
+    database.insert_all_cpus(connection, [make_cpu(f"{brand} {i}") for i in range(10) for brand in ("AMD", "Intel")])
+
+    names, after = [], None
+    while True:
+        page, after = database.fetch_cpus_page(connection, limit=3, after=after)
+        names += [cpu.name for cpu in page]
+        if after is None:
+            break
+    assert names == [cpu.name for cpu in database.fetch_cpus(connection)]
+
+    page, after = database.fetch_cpus_page(connection, "intel", limit=10)
+    assert len(page) == 10 and all(cpu.brand == "Intel" for cpu in page)
+    assert database.fetch_cpus_page(connection, "intel", limit=10, after=after) == ([], None)
+
+
+def test_change_only_recording(connection) -> None:
+    """Test that unchanged prices extend the latest row instead of adding new ones."""
+    history = [("299.99", "2025-01-01"), ("299.99", "2025-01-01"), ("299.99", "2025-01-02"),
+               ("279.99", "2025-01-03"), ("299.99", "2025-01-04"), ("299.99", "2025-01-05")]
+    for price, date in history:
+        database.insert_parts(connection, [make_cpu("AMD Ryzen 5 7600X", price, date)])
+
+    assert connection.execute("SELECT price, price_date, last_seen, observations FROM cpu_prices ORDER BY id").fetchall() == [
+        ("299.99", "2025-01-01", "2025-01-02", 3), ("279.99", "2025-01-03", "2025-01-03", 1),
+        ("299.99", "2025-01-04", "2025-01-05", 2)]
+
+
+def test_compact_price_history(connection) -> None:
+    """Test that compacting a full history gives the table change-only recording would have built."""
+    history = [(name, price, date) for date, prices in [("2025-01-01", ("1.00", "5.00")), ("2025-01-01", ("1.00", "5.00")),
+                                                        ("2025-01-02", ("2.00", "5.00")), ("2025-01-03", ("1.00", "N/A"))]
+               for name, price in zip(("AMD Ryzen 5 7600X", "Intel Pentium G7400"), prices)]
+
+    for name, price, date in history:
+        database.insert_parts(connection, [make_cpu(name, price, date)], recording="all")
+    assert database.compact_price_history(connection, "cpu") == 3
+
+    reference = sqlite3.connect(":memory:")
+    migrations.migrate(reference)
+    for name, price, date in history:
+        database.insert_parts(reference, [make_cpu(name, price, date)], recording="changes")
+
+    query = "SELECT cpu_id, price, price_cents, link, price_date, last_seen, observations FROM cpu_prices ORDER BY cpu_id, price_date"
+    assert connection.execute(query).fetchall() == reference.execute(query).fetchall()
+    assert database.compact_price_history(connection, "cpu") == 0
+
+
+def test_price_summaries(connection) -> None:
+    """Test that summaries track the latest, lowest, and highest prices as they are ingested."""
+    history = [("299.99", "2025-01-01"), ("N/A", "2025-01-02"), ("249.99", "2025-01-03"),
+               ("319.99", "2025-01-04"), ("249.99", "2025-01-05"), ("279.99", "2025-01-06")]
+    for price, date in history:
+        database.insert_parts(connection, [make_cpu("AMD Ryzen 5 7600X", price, date)])
+    database.insert_parts(connection, [make_cpu("Intel Pentium G7400", "N/A")])
+
+    amd, intel = database.fetch_price_summaries(connection, "cpu")
+    assert (amd.latest_price, amd.latest_date, amd.observations) == ("279.99", "2025-01-06", 6)
+    assert (amd.lowest_cents, amd.lowest_date) == (24999, "2025-01-03")
+    assert (amd.highest_cents, amd.highest_date) == (31999, "2025-01-04")
+    assert (intel.latest_price, intel.lowest_cents, intel.highest_date) == ("N/A", None, None)
+
+    assert [summary.name for summary in database.fetch_price_summaries(connection, "cpu", "pentium")] == ["Intel Pentium G7400"]
+    assert str(amd) == ("(AMD Ryzen 5 7600X, now 279.99 (2025-01-06), low 249.99 (2025-01-03), "
+                        "high 319.99 (2025-01-04), 6 observations)")
+
+
+def test_insert_parts_checkpoint_is_atomic(connection) -> None:
+    """Test that a checkpoint commits together with the parts, and a failing one rolls them back."""
+    def record(conn):
+        checkpoints.record_page(conn, run_id, "cpu", "page-1", 1)
+
+    def fail(conn):
+        raise sqlite3.IntegrityError("checkpoint failed")
+
+    run_id, _ = checkpoints.start_run(connection)
+    database.insert_parts(connection, [make_cpu("AMD Ryzen 7 7800X3D")], checkpoint=record)
+    with pytest.raises(sqlite3.IntegrityError):
+        database.insert_parts(connection, [make_cpu("Intel Core i5-13400F")], checkpoint=fail)
+    database.insert_parts(connection, [], checkpoint=lambda conn: checkpoints.record_page(conn, run_id, "cpu", "page-2", 0))
+
+    assert [name for name, in connection.execute("SELECT name FROM cpus")] == ["AMD Ryzen 7 7800X3D"]
+    assert checkpoints.get_stored_pages(connection, run_id) == {"page-1", "page-2"}
+
+
+def _gpu(name: str, item: str, price: str="599.99", date: str="2025-01-01") -> GPU:
+    return GPU(name, "newegg", f"https://www.newegg.ca/{name.lower().replace(' ', '-')}/p/{item}", price, date, "ASUS")
+
+
+def test_title_edit_keeps_history(connection) -> None:
+    """Test that a listing keeps its part, and its history, when its title changes."""
+    database.insert_parts(connection, [_gpu("ASUS TUF RTX 4070", "N82E16814126640")])
+    database.insert_parts(connection, [_gpu("ASUS TUF Gaming RTX 4070 OC", "N82E16814126640", "579.99", "2025-01-02")])
+
+    assert connection.execute("SELECT id, name, external_id FROM gpus").fetchall() == [
+        (1, "ASUS TUF Gaming RTX 4070 OC", "newegg:N82E16814126640")]
+    assert connection.execute("SELECT gpu_id, price FROM gpu_prices ORDER BY id").fetchall() == [(1, "599.99"), (1, "579.99")]
+    # the old title still finds the part
+    assert database.get_part_ids(connection, "gpu", ["ASUS TUF RTX 4070"]) == {"ASUS TUF RTX 4070": 1}
+    assert database.get_part_id(connection, _gpu("Another title", "N82E16814126640")) == 1
+
+
+def test_products_sharing_a_name_stay_apart(connection) -> None:
+    """Test that listings with different item numbers are different parts, even under the same name."""
+    database.insert_parts(connection, [_gpu("ASUS RTX 4070", "N82E16814126640", "599.99"), _gpu("ASUS RTX 4070", "N82E16814932601", "649.99")])
+    database.insert_parts(connection, [_gpu("ASUS RTX 4070", "N82E16814932601", "629.99", "2025-01-02")])
+
+    assert connection.execute("SELECT id, external_id FROM gpus ORDER BY id").fetchall() == [
+        (1, "newegg:N82E16814126640"), (2, "newegg:N82E16814932601")]
+    assert connection.execute("SELECT gpu_id, price FROM gpu_prices ORDER BY id").fetchall() == [
+        (1, "599.99"), (2, "649.99"), (2, "629.99")]
+
+
+def test_listing_without_item_number(connection) -> None:
+    """Test that listings without an item number are matched by name, and keyed once listed with one."""
+    database.insert_parts(connection, [_gpu("ASUS RTX 4070", "x", "599.99")])
+    database.insert_parts(connection, [_gpu("ASUS RTX 4070", "N82E16814126640", "599.99", "2025-01-02")])
+
+    assert connection.execute("SELECT id, external_id FROM gpus").fetchall() == [(1, "newegg:N82E16814126640")]
+    assert connection.execute("SELECT COUNT(*) FROM gpu_prices WHERE gpu_id = 1").fetchone()[0] == 2
+
+
+if __name__ == "__main__":
+    pytest.main(["test_database.py"])
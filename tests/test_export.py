@@ -0,0 +1,101 @@
+"""Testing module for the query and export commands in export.py"""
+
+import argparse
+import csv
+import io
+import json
+import pytest
+from app import main
+from app.cli import export
+from app.database import connection, database, migrations
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch) -> str:
+    """Return the path of a database holding a small cpu and gpu price history, used by the commands."""
+    path = str(tmp_path / "parts.db")
+    with connection.writer(path) as writer:
+        migrations.migrate(writer)
+        database.insert_parts(writer, [
+            CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "229.99", "2025-01-01", "AMD"),
+            CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "229.99", "2025-01-10", "AMD"),
+            CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "199.99", "2025-02-01", "AMD"),
+            CPU("Intel Core i5-13400F", "newegg", "https://a/2", "1,299.00", "2025-01-05", "Intel"),
+        ])
+        database.insert_parts(writer, [GPU("ASUS GeForce RTX 4070", "newegg", "https://a/3", "799.99", "2025-01-03", "ASUS")])
+    monkeypatch.setattr(export, "DB_PATH", path)
+    return path
+
+
+def _args(**overrides) -> argparse.Namespace:
+    values = {"category": None, "name": None, "brand": None, "since": None, "until": None,
+              "min_price": None, "max_price": None, "format": "jsonl", "output": None}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_export_history_jsonl(db_path, capsys) -> None:
+    """Test that the export streams every price row, one JSON object per line."""
+    assert export.run("export", _args(category=["cpu"])) == 0
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(row["name"], row["price_cents"]) for row in rows] == [
+        ("AMD Ryzen 5 7600", 22999), ("AMD Ryzen 5 7600", 19999), ("Intel Core i5-13400F", 129900)]
+    # the unchanged observation extended the first row
+    assert (rows[0]["first_seen"], rows[0]["last_seen"], rows[0]["observations"]) == ("2025-01-01", "2025-01-10", 2)
+
+
+def test_export_filters(db_path, capsys) -> None:
+    """Test the name, brand, date range, and price range filters."""
+    def names(**filters) -> list[str]:
+        assert export.run("export", _args(**filters)) == 0
+        return [json.loads(line)["name"] for line in capsys.readouterr().out.splitlines()]
+
+    assert names(name="ryzen") == ["AMD Ryzen 5 7600", "AMD Ryzen 5 7600"]
+    assert names(brand="intel") == ["Intel Core i5-13400F"]
+    assert names(max_price="1,000") == ["AMD Ryzen 5 7600", "AMD Ryzen 5 7600", "ASUS GeForce RTX 4070"]
+    # the first Ryzen price was last seen on 2025-01-10, the Intel price only on 2025-01-05
+    assert names(since="2025-01-08", until="2025-01-31") == ["AMD Ryzen 5 7600"]
+    assert names(category=["gpu"], min_price="800") == []
+
+
+def test_query_current_prices_csv(db_path) -> None:
+    """Test that the query writes the latest price of every part, with one CSV header for all categories."""
+    output = io.StringIO()
+
+    assert export.stream("query", ["cpu", "gpu"], output, "csv") == 3
+
+    rows = list(csv.reader(io.StringIO(output.getvalue())))
+    assert rows[0] == list(database.CURRENT_COLUMNS)
+    assert [(row[1], row[3], row[7]) for row in rows[1:]] == [
+        ("AMD Ryzen 5 7600", "199.99", "19999"), ("Intel Core i5-13400F", "1,299.00", "129900"),
+        ("ASUS GeForce RTX 4070", "799.99", "79999")]
+
+
+def test_run_writes_file(db_path, tmp_path, capsys) -> None:
+    """Test writing to a file, and rejecting an invalid price."""
+    path = tmp_path / "prices.csv"
+
+    assert export.run("query", _args(format="csv", output=str(path))) == 0
+    assert len(path.read_text().splitlines()) == 4
+    assert "wrote 3 rows" in capsys.readouterr().err
+
+    assert export.run("query", _args(min_price="cheap")) == 2
+
+
+@pytest.mark.parametrize("argv", [["--category", "gpu", "export"], ["export", "--category", "gpu"]])
+def test_main_passes_category(argv, monkeypatch) -> None:
+    """Test that --category reaches the command whether it is given before or after it."""
+    calls = []
+    monkeypatch.setattr(export, "run", lambda command, args: calls.append((command, args.category)) or 0)
+    monkeypatch.setattr("sys.argv", ["main.py", *argv])
+
+    with pytest.raises(SystemExit):
+        main.main()
+    assert calls == [("export", ["gpu"])]
+
+
+if __name__ == "__main__":
+    pytest.main(["test_export.py"])
@@ -0,0 +1,112 @@
+"""Testing module for the update metrics in metrics.py"""
+
+import json
+import pstats
+import sqlite3
+import threading
+from app.cli import pipeline
+from app.database import migrations
+from app.models.gpu import GPU
+from app.scraper.categories import Category
+from app.utils import profiling
+from app.utils.metrics import Histogram, Metrics, set_metrics
+from app.utils.parsing import extract_gpu_info
+
+
+def test_histogram() -> None:
+    """Test that observations land in the first bucket holding them."""
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2, 3):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 2]
+    assert histogram.count == 5 and histogram.total == 5.65
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(1) == float("inf")
+    assert Histogram().quantile(0.5) is None
+
+
+def test_counters_by_label() -> None:
+    """Test that counters are kept per set of labels, and summed when no labels are given."""
+    metrics = Metrics()
+    metrics.inc("http_requests_total", status=200)
+    metrics.inc("http_requests_total", 2, status="200")
+    metrics.inc("http_requests_total", status=503)
+
+    assert metrics.counter("http_requests_total", status=200) == 3
+    assert metrics.counter("http_requests_total") == 4
+    assert metrics.counter("rows_inserted_total") == 0
+
+
+def test_prometheus_format() -> None:
+    """Test the text exposition format, with cumulative histogram buckets."""
+    metrics = Metrics()
+    metrics.inc("rows_inserted_total", 36, category="gpu")
+    metrics.observe("parse_seconds", 0.003, category="gpu")
+    metrics.observe("parse_seconds", 0.02, category="gpu")
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert "# TYPE pcparts_rows_inserted_total counter" in lines
+    assert 'pcparts_rows_inserted_total{category="gpu"} 36' in lines
+    assert "# TYPE pcparts_parse_seconds histogram" in lines
+    assert 'pcparts_parse_seconds_bucket{category="gpu",le="0.005"} 1' in lines
+    assert 'pcparts_parse_seconds_bucket{category="gpu",le="0.025"} 2' in lines
+    assert 'pcparts_parse_seconds_bucket{category="gpu",le="+Inf"} 2' in lines
+    assert 'pcparts_parse_seconds_count{category="gpu"} 2' in lines
+
+
+def test_write_reports(tmp_path) -> None:
+    """Test that both report files are written, with the extra fields in the JSON report."""
+    metrics = Metrics()
+    metrics.inc("http_retries_total")
+    metrics.write_reports(str(tmp_path / "update.json"), str(tmp_path / "update.prom"), run_id=3)
+
+    report = json.loads((tmp_path / "update.json").read_text())
+    assert report["run_id"] == 3
+    assert report["counters"]["http_retries_total"] == [{"labels": {}, "value": 1}]
+    assert "pcparts_http_retries_total 1" in (tmp_path / "update.prom").read_text()
+
+
+def test_pipeline_records_every_stage(listing_server) -> None:
+    """Test that an update run records the metrics of its fetch, parse, and write stages."""
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    migrations.migrate(connection)
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+    metrics = set_metrics(None)
+
+    pipeline.run_pipeline(connection, [category])
+
+    assert metrics.counter("pages_fetched_total", category="gpu") == 3
+    assert metrics.counter("http_requests_total", status=200) == 3
+    assert metrics.counter("http_response_bytes_total") > 0
+    assert metrics.counter("rows_inserted_total", category="gpu") == 18
+    assert metrics.histograms[("fetch_seconds", ())].count == 3
+    for stage in ("parse_seconds", "db_write_seconds"):
+        assert metrics.histograms[(stage, (("category", "gpu"),))].count == 3
+    connection.close()
+
+
+def _busy_worker(results: list) -> None:
+    results.append(sum(i * i for i in range(10000)))
+
+
+def test_profiled_covers_threads(tmp_path, capsys) -> None:
+    """Test that the profile of a block includes the threads started inside it."""
+    path = str(tmp_path / "run.pstats")
+    results = []
+    with profiling.profiled(path, top=5):
+        thread = threading.Thread(target=_busy_worker, args=(results,))
+        thread.start()
+        thread.join()
+
+    assert results == [sum(i * i for i in range(10000))]
+    assert "_busy_worker" in {function for _, _, function in pstats.Stats(path).stats}
+    assert "profile saved to" in capsys.readouterr().out
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_metrics.py"])
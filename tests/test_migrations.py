@@ -0,0 +1,90 @@
+"""Testing module for the schema migrations in migrations.py"""
+
+import sqlite3
+from app.database import database, migrations
+
+
+def _legacy_database(path: str) -> sqlite3.Connection:
+    """Return a connection to a database in the unversioned schema, with some history."""
+    connection = sqlite3.connect(path)
+    for part_type in migrations.PART_TYPES:
+        getattr(database, f"create_{part_type}s_table")(connection)
+        database.create_part_prices_table(connection, part_type)
+
+    with connection:
+        connection.executemany("INSERT INTO cpus (brand, name) VALUES (?, ?)",
+                               [("AMD", "AMD Ryzen 5 7600X"), ("Intel", "Intel Core i5-13400F"), ("AMD", "AMD Ryzen 5 7600X")])
+        connection.executemany("INSERT INTO cpu_prices (cpu_id, website, price, link, price_date) VALUES (?, ?, ?, ?, ?)",
+                               [(1, "newegg", "299.99", "a", "2025-01-01"), (2, "newegg", "N/A", "b", "2025-01-01"),
+                                (3, "newegg", "1,289.00", "c", "2025-01-02")])
+    return connection
+
+
+def test_upgrade_in_place(tmp_path) -> None:
+    """Test that an existing unversioned database is upgraded to the latest version."""
+    connection = _legacy_database(str(tmp_path / "parts.db"))
+
+    assert migrations.migrate(connection) == len(migrations.MIGRATIONS)
+
+    assert connection.execute("SELECT id, name FROM cpus ORDER BY id").fetchall() == [(1, "AMD Ryzen 5 7600X"),
+                                                                                    (2, "Intel Core i5-13400F")]
+    assert connection.execute("SELECT cpu_id, price, price_cents FROM cpu_prices ORDER BY id").fetchall() == [
+        (1, "299.99", 29999), (2, "N/A", None), (1, "1,289.00", 128900)]
+
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"idx_cpus_name", "idx_cpu_prices_part_date", "idx_mobos_name", "idx_mobo_prices_part_date"} <= indexes
+
+    plan = connection.execute("EXPLAIN QUERY PLAN SELECT id FROM cpus WHERE name=?", ("x",)).fetchall()
+    assert "idx_cpus_name" in plan[0][-1]
+
+    assert database.search_parts(connection, "cpu", "ryzen 76") == [(1, "AMD Ryzen 5 7600X", "AMD")]
+
+    summaries = {summary.name: summary for summary in database.fetch_price_summaries(connection, "cpu")}
+    assert (summaries["AMD Ryzen 5 7600X"].latest_price, summaries["AMD Ryzen 5 7600X"].lowest_cents) == ("1,289.00", 29999)
+    assert summaries["AMD Ryzen 5 7600X"].observations == 2
+    assert summaries["Intel Core i5-13400F"].highest_cents is None
+
+
+def test_migrate_is_idempotent(tmp_path) -> None:
+    """Test that migrating an up to date database changes nothing."""
+    connection = sqlite3.connect(str(tmp_path / "parts.db"))
+    version = migrations.migrate(connection)
+
+    assert migrations.migrate(connection) == version
+    assert database.ensure_tables(connection)
+
+
+def test_rekey_by_item_number(tmp_path, monkeypatch) -> None:
+    """Test that upgrading to external ids merges title edits and splits products sharing a name."""
+    connection = sqlite3.connect(str(tmp_path / "parts.db"))
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS[:7])
+    migrations.migrate(connection)
+    monkeypatch.undo()
+
+    old, new = "https://www.newegg.ca/p/N82E16814126640", "https://www.newegg.ca/p/N82E16814932601"
+    with connection:
+        connection.executemany("INSERT INTO gpus (brand, name) VALUES (?, ?)",
+                               [("ASUS", "ASUS TUF RTX 4070"), ("ASUS", "ASUS TUF Gaming RTX 4070 OC"), ("ASUS", "ASUS RTX 4060")])
+        connection.executemany("INSERT INTO gpu_prices (gpu_id, website, price, price_cents, link, price_date, last_seen) "
+                               "VALUES (?, 'newegg', ?, ?, ?, ?5, ?5)",
+                               [(1, "599.99", 59999, old, "2025-01-01"), (3, "399.99", 39999, new, "2025-01-01"),
+                                (2, "579.99", 57999, old, "2025-01-02"), (3, "449.99", 44999, "https://www.newegg.ca/p/N82E16814500555", "2025-01-02")])
+
+    assert migrations.migrate(connection) == len(migrations.MIGRATIONS)
+
+    assert connection.execute("SELECT id, name, external_id FROM gpus ORDER BY id").fetchall() == [
+        (1, "ASUS TUF Gaming RTX 4070 OC", "newegg:N82E16814126640"), (3, "ASUS RTX 4060", "newegg:N82E16814932601"),
+        (4, "ASUS RTX 4060", "newegg:N82E16814500555")]
+    assert connection.execute("SELECT gpu_id, price FROM gpu_prices ORDER BY id").fetchall() == [
+        (1, "599.99"), (3, "399.99"), (1, "579.99"), (4, "449.99")]
+    assert dict(connection.execute("SELECT name, gpu_id FROM gpu_aliases").fetchall()) == {"ASUS TUF RTX 4070": 1}
+
+    summaries = {summary.latest_link: summary for summary in database.fetch_price_summaries(connection, "gpu")}
+    assert (summaries[old].observations, summaries[old].lowest_cents, summaries[old].latest_price) == (2, 57999, "579.99")
+    assert sorted(summary.observations for summary in summaries.values()) == [1, 1, 2]
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_migrations.py"])
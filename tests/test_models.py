@@ -0,0 +1,53 @@
+"""Testing module for the part models and the PartBatch container"""
+
+import sqlite3
+import pytest
+from app.database import database, migrations
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+from app.models.part_batch import PartBatch
+
+
+def test_parts_are_slotted() -> None:
+    """Test that part objects carry no per-instance dict."""
+    cpu = CPU("AMD Ryzen 5 7600X", "newegg", "link", "299.99", "2025-01-01", "AMD")
+
+    assert not hasattr(cpu, "__dict__")
+    with pytest.raises(AttributeError):
+        cpu.socket = "AM5"
+
+
+def test_batch_round_trip() -> None:
+    """Test that a PartBatch gives back the parts it was built from, with repeated strings shared."""
+    gpus = [GPU("MSI RTX 4070", "newegg", f"link{i}", f"{600 + i}.99", "2025-01-01", "MSI") for i in range(3)]
+    batch = PartBatch.from_parts(GPU, gpus)
+
+    assert len(batch) == 3
+    assert batch.part_type == "gpu"
+    assert [str(gpu) for gpu in batch] == [str(gpu) for gpu in gpus]
+    assert isinstance(batch[1], GPU) and batch[1].link == "link1"
+
+    fresh = "".join(["MSI RTX ", "4070"])
+    batch.append(fresh, "newegg", "link3", "N/A", "2025-01-02", "MSI")
+    assert batch.names[3] is batch.names[0]
+
+
+def test_batch_database_round_trip() -> None:
+    """Test that a PartBatch is inserted and fetched like a list of parts."""
+    connection = sqlite3.connect(":memory:")
+    migrations.migrate(connection)
+
+    batch = PartBatch(CPU)
+    for i in range(5):
+        batch.append(f"Intel Core i5-1{i}400F", "newegg", f"link{i}", "199.99", "2025-01-01", "Intel")
+
+    assert database.insert_parts(connection, batch) == 5
+
+    fetched = database.fetch_parts_batch(connection, "cpu")
+    assert fetched.names == batch.names
+    assert fetched.prices == batch.prices
+    assert [str(cpu) for cpu in fetched] == [str(cpu) for cpu in database.fetch_cpus(connection)]
+
+
+if __name__ == "__main__":
+    pytest.main(["test_models.py"])
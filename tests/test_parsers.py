@@ -0,0 +1,42 @@
+"""Testing module for the HTML parser backends in parsers.py"""
+
+import pytest
+from app.scraper.parsers import available_backends, get_parser
+from tests.conftest import read_fixture
+
+
+@pytest.fixture
+def listing() -> str:
+    """Return a recorded Newegg listing page."""
+    return read_fixture("newegg_listing.html")
+
+
+def test_html_parser_items(listing: str) -> None:
+    """Test that the standard library backend extracts every listing."""
+    items = get_parser("html.parser").parse_items(listing)
+
+    assert len(items) == 6
+    assert items[0] == ("AMD Ryzen 7 9800X3D - Ryzen 7 9000 Series Granite Ridge (Zen 5) 8-Core 4.7 GHz - Socket AM5 120W - Radeon Graphics Processor - 100-100001084WOF",
+                        "https://www.newegg.ca/amd-ryzen-7-9800x3d/p/N82E16819113843", "629.99")
+    assert items[1][0].endswith("Processor & Cooler Bundle - BX8071514600K")
+    assert items[1][2] == "1,299.00"
+    assert [item[2] for item in items[2:]] == ["N/A", "N/A", "N/A", "789.99"]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_match(listing: str, backend: str) -> None:
+    """Test that every installed backend returns exactly what the standard library backend returns."""
+    expected = get_parser("html.parser")
+
+    assert get_parser(backend).parse_items(listing) == expected.parse_items(listing)
+    assert get_parser(backend).parse_page_count(listing) == expected.parse_page_count(listing) == 7
+
+
+def test_unknown_backend() -> None:
+    """Test that an unknown backend is rejected."""
+    with pytest.raises(ValueError):
+        get_parser("regex")
+
+
+if __name__ == "__main__":
+    pytest.main(["test_parsers.py"])
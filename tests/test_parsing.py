@@ -1,6 +1,7 @@
 """Testing module for the parsing functions in parsing.py"""
 
 from app.utils import parsing
+from tests.conftest import read_fixture
 
 
 def test_extract_cpu_info() -> None:
@@ -24,6 +25,69 @@ def test_extract_cpu_info() -> None:
     assert parsing.extract_cpu_info(pentium) == ("Intel Pentium G7400", "Intel")
 
 
+def test_extract_info_conditions_and_brands() -> None:
+    """Test that listing conditions are handled and brands are found after them."""
+    assert parsing.extract_cpu_info("Open Box AMD Ryzen 9 9950X - 16-Core 4.3 GHz") == ("Open Box AMD Ryzen 9 9950X", "AMD")
+    assert parsing.extract_gpu_info("ASUS TUF Gaming GeForce RTX 4070") == ("ASUS TUF Gaming GeForce RTX 4070", "ASUS")
+    assert parsing.extract_gpu_info("Refurbished MSI GeForce RTX 3060").brand == "MSI"
+    assert parsing.extract_mobo_info("open box GIGABYTE B650 AORUS ELITE AX").brand == "GIGABYTE"
+
+
+def test_extract_info_unmatched() -> None:
+    """Test that unrecognised titles return None instead of raising."""
+    assert parsing.extract_cpu_info("Noctua NH-D15 CPU Cooler") is None
+    assert parsing.extract_cpu_info("") is None
+    assert parsing.extract_gpu_info("") is None
+    assert parsing.extract_mobo_info("  - ") is None
+
+
+def test_extract_info_corpus() -> None:
+    """Test that every title of the fixture corpus is extracted without raising."""
+    extractors = {"cpu": parsing.extract_cpu_info, "gpu": parsing.extract_gpu_info, "mobo": parsing.extract_mobo_info}
+    unmatched = []
+
+    for line in read_fixture("titles.tsv").splitlines():
+        category, title = line.split("\t", 1)
+        if extractors[category](title) is None:
+            unmatched.append(title)
+
+    assert unmatched == ["Noctua NH-D15 chromax.black Dual-Tower CPU Cooler"]
+
+
+def test_extract_info_is_memoized() -> None:
+    """Test that repeated titles are answered from the cache."""
+    title = "Intel Core i7-14700K - Core i7 14th Gen Raptor Lake 20-Core Desktop Processor"
+    parsing.extract_cpu_info.cache_clear()
+
+    first = parsing.extract_cpu_info(title)
+    assert parsing.extract_cpu_info(title) is first
+    assert parsing.extract_cpu_info.cache_info().hits == 1
+
+
+def test_price_to_cents() -> None:
+    """Test that scraped prices are converted to integer cents."""
+    assert parsing.price_to_cents("629.99") == 62999
+    assert parsing.price_to_cents("1,299.00") == 129900
+    assert parsing.price_to_cents("$5.5") == 550
+    assert parsing.price_to_cents("729") == 72900
+
+    assert parsing.price_to_cents("N/A") is None
+    assert parsing.price_to_cents("") is None
+    assert parsing.price_to_cents("12,34") is None
+
+
+def test_extract_item_id() -> None:
+    """Test that the retailer item number is parsed from listing links."""
+    assert parsing.extract_item_id("https://www.newegg.ca/amd-ryzen-7-9800x3d/p/N82E16819113843") == "N82E16819113843"
+    assert parsing.extract_item_id("https://www.newegg.ca/p/n82e16819113788") == "N82E16819113788"
+    assert parsing.extract_item_id("https://www.newegg.ca/i5/p/1FT-0004-00012?Item=9SIA1234567") == "9SIA1234567"
+    assert parsing.to_external_id("newegg", "https://www.newegg.ca/p/N82E16819113788") == "newegg:N82E16819113788"
+
+    assert parsing.extract_item_id("https://www.newegg.ca/p/pl?N=100007670&page=2") is None
+    assert parsing.extract_item_id("https://a/1") is None
+    assert parsing.to_external_id("newegg", "") is None
+
+
 if __name__ == "__main__":
     import pytest
 
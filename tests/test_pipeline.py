@@ -0,0 +1,139 @@
+"""Testing module for the update pipeline in pipeline.py, run against a local stand-in listing server."""
+
+import sqlite3
+import threading
+import pytest
+from app.cli import pipeline
+from app.database import checkpoints, migrations
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+from app.scraper import scraper
+from app.scraper.categories import Category
+from app.utils.parsing import extract_cpu_info, extract_gpu_info
+
+
+def test_scrape_category(listing_server) -> None:
+    """Test that every page of every listing of a category is scraped once."""
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url, listing_server.url + "&x=1"], extract_gpu_info)
+
+    parts = scraper.scrape_category(category)
+
+    assert len(parts) == 2 * 3 * 6
+    assert sorted(listing_server.requested) == [1, 1, 2, 2, 3, 3]
+    assert parts.prices[:2] == ["629.99", "1,299.00"]
+
+
+def test_pipeline_stores_every_page(listing_server, connection) -> None:
+    """Test that the pipeline streams every listing into the database."""
+    listing_server.pages = 5
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+
+    assert pipeline.run_pipeline(connection, [category], queue_size=1) == {"gpu": 30}
+    # every page lists the same prices, so each part has one row covering five observations
+    assert connection.execute("SELECT COUNT(*), SUM(observations) FROM gpu_prices").fetchone() == (6, 30)
+    assert connection.execute("SELECT COUNT(*) FROM gpus").fetchone()[0] == 6
+
+
+def test_pipeline_parse_processes(listing_server, connection, monkeypatch) -> None:
+    """Test that parsing in worker processes stores the same listings, in the same order."""
+    monkeypatch.setattr(scraper, "CACHE_ENABLED", False) # every page must be parsed
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+    reference = sqlite3.connect(":memory:", check_same_thread=False)
+    migrations.migrate(reference)
+
+    pipeline.run_pipeline(reference, [category], parse_workers=1)
+    assert pipeline.run_pipeline(connection, [category], parse_workers=2) == {"gpu": 18}
+
+    query = "SELECT gpus.name, gpu_prices.price, gpu_prices.link FROM gpu_prices JOIN gpus ON gpus.id = gpu_id ORDER BY gpu_prices.id"
+    assert connection.execute(query).fetchall() == reference.execute(query).fetchall()
+
+
+def test_pipeline_cpu_titles(listing_server, connection) -> None:
+    """Test that CPU titles are normalised, keeping the listing condition in the name."""
+    category = Category("cpu", "CPUs", CPU, "newegg", [listing_server.url], extract_cpu_info)
+
+    pipeline.run_pipeline(connection, [category])
+    assert [row[0] for row in connection.execute("SELECT name FROM cpus ORDER BY id")] == [
+        "AMD Ryzen 7 9800X3D", "Intel Core i5-14600K", "AMD Ryzen 5 7600X", "Intel Core i9-14900K",
+        "Open Box AMD Ryzen 9 9950X", "Intel Core Ultra 9 285K"]
+
+
+def test_pipeline_raises_stage_errors(listing_server, connection) -> None:
+    """Test that an error in a stage stops the pipeline and is raised."""
+    def broken_extractor(title: str):
+        raise ValueError(title)
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], broken_extractor)
+
+    with pytest.raises(ValueError):
+        pipeline.run_pipeline(connection, [category])
+
+
+def test_pipeline_resumes_interrupted_run(listing_server, connection) -> None:
+    """Test that a failed run keeps the pages it stored, and resuming it only fetches the rest."""
+    listing_server.pages = 4
+    listing_server.failing = {3}
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+    run_id, resumed = checkpoints.start_run(connection)
+    assert not resumed
+
+    with pytest.raises(Exception):
+        pipeline.run_pipeline(connection, [category], run_id=run_id)
+    assert checkpoints.get_stored_counts(connection, run_id) == {"gpu": 12}
+    assert checkpoints.start_run(connection) == (run_id, True)
+
+    listing_server.failing = set()
+    listing_server.requested = []
+    assert pipeline.run_pipeline(connection, [category], run_id=run_id) == {"gpu": 24}
+    # the first page is fetched again for its page count, but not stored twice
+    assert sorted(listing_server.requested) == [1, 3, 4]
+    assert connection.execute("SELECT SUM(observations) FROM gpu_prices").fetchone()[0] == 24
+
+    checkpoints.finish_run(connection, run_id)
+    assert checkpoints.start_run(connection) == (run_id + 1, False)
+
+
+def test_pipeline_failed_write_is_resumed(listing_server, connection, monkeypatch) -> None:
+    """Test that a page whose write fails stops the run unfinished, and is fetched again on resume."""
+    listing_server.pages = 3
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+    record_page = pipeline._record_page
+
+    def failing_record_page(conn, run_id, category, url, batch):
+        if url.endswith("page=2"):
+            raise sqlite3.OperationalError("disk I/O error")
+        record_page(conn, run_id, category, url, batch)
+
+    monkeypatch.setattr(pipeline, "_record_page", failing_record_page)
+    run_id, _ = checkpoints.start_run(connection)
+    with pytest.raises(sqlite3.OperationalError):
+        pipeline.run_pipeline(connection, [category], run_id=run_id)
+    assert listing_server.url.format(page=2) not in checkpoints.get_stored_pages(connection, run_id)
+    assert checkpoints.start_run(connection) == (run_id, True) # the run is not finished
+
+    monkeypatch.setattr(pipeline, "_record_page", record_page)
+    listing_server.requested = []
+    assert pipeline.run_pipeline(connection, [category], run_id=run_id) == {"gpu": 18}
+    assert 2 in listing_server.requested
+    assert checkpoints.get_stored_pages(connection, run_id) == {listing_server.url.format(page=page) for page in (1, 2, 3)}
+
+
+def test_pipeline_interrupt_stops_stages(listing_server, connection, monkeypatch) -> None:
+    """Test that interrupting the writer stops the fetch and parse threads."""
+    listing_server.pages = 20
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(pipeline.database, "insert_parts", interrupt)
+
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run_pipeline(connection, [category], queue_size=1)
+    for thread in threading.enumerate():
+        if thread.name in ("fetch", "parse"):
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+    assert len(listing_server.requested) < 20
+
+
+if __name__ == "__main__":
+    pytest.main(["test_pipeline.py"])
@@ -0,0 +1,70 @@
+"""Testing module for the query result cache in query_cache.py"""
+
+import pytest
+from app.database import connection, database, migrations
+from app.database.query_cache import QueryCache
+from tests.conftest import make_cpu
+
+
+@pytest.fixture
+def connections(tmp_path):
+    """Return a writer and a reader connection to a migrated database file holding one CPU."""
+    path = str(tmp_path / "parts.db")
+    with connection.writer(path) as writer, connection.reader(path) as reader:
+        migrations.migrate(writer)
+        database.insert_parts(writer, [make_cpu("AMD Ryzen 5 7600")])
+        yield writer, reader
+
+
+def test_repeated_queries_are_cached(connections) -> None:
+    """Test that a repeated query returns the cached result without running again."""
+    _, reader = connections
+    queries = QueryCache(reader)
+
+    first = queries.call(database.fetch_cpus, None)
+    assert queries.call(database.fetch_cpus, None) is first
+    assert queries.call(database.fetch_cpus, "Ryzen") is not first
+    assert (queries.hits, queries.misses) == (1, 2)
+
+
+def test_commits_of_other_connections_invalidate(connections) -> None:
+    """Test that results are never stale after another connection commits."""
+    writer, reader = connections
+    queries = QueryCache(reader)
+    assert len(queries.call(database.fetch_cpus, None)) == 1
+
+    database.insert_parts(writer, [make_cpu("Intel Core i5-13400F")])
+
+    assert len(queries.call(database.fetch_cpus, None)) == 2
+    assert queries.misses == 2
+
+
+def test_own_writes_invalidate(connections) -> None:
+    """Test that writes through the cached connection itself also invalidate it."""
+    writer, _ = connections
+    queries = QueryCache(writer)
+    queries.call(database.fetch_price_summaries, "cpu", None)
+
+    database.insert_parts(writer, [make_cpu("AMD Ryzen 5 7600", "149.99")])
+
+    assert queries.call(database.fetch_price_summaries, "cpu", None)[0].latest_price == "149.99"
+
+
+def test_least_recently_used_is_evicted(connections) -> None:
+    """Test that the cache keeps at most <max_entries> results, dropping the least recently used."""
+    _, reader = connections
+    queries = QueryCache(reader, max_entries=2)
+
+    queries.call(database.fetch_cpus, "AMD")
+    queries.call(database.fetch_cpus, "Intel")
+    queries.call(database.fetch_cpus, "AMD")
+    queries.call(database.fetch_cpus, "Ryzen") # evicts "Intel"
+
+    assert len(queries) == 2
+    queries.call(database.fetch_cpus, "AMD")
+    queries.call(database.fetch_cpus, "Intel")
+    assert (queries.hits, queries.misses) == (2, 4)
+
+
+if __name__ == "__main__":
+    pytest.main(["test_query_cache.py"])
@@ -0,0 +1,35 @@
+"""Testing module for the rate limiting in ratelimit.py"""
+
+import time
+from app.scraper.ratelimit import TokenBucket, get_limiter
+
+
+def test_token_bucket_burst_then_rate() -> None:
+    """Test that a TokenBucket allows its capacity back to back, then limits to its rate."""
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert time.monotonic() - start < 0.04
+
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.15
+
+
+def test_get_limiter_per_host() -> None:
+    """Test that limiters are shared per host."""
+    a = get_limiter("https://www.newegg.ca/p/pl?page=1")
+    b = get_limiter("https://www.newegg.ca/p/pl?page=2")
+    c = get_limiter("https://www.bestbuy.ca/")
+
+    assert a is b
+    assert a is not c
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main(["test_ratelimit.py"])
@@ -0,0 +1,117 @@
+"""Testing module for the crawl history in crawl_history.py and the crawl scheduler in scheduler.py"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.cli import pipeline, scheduler
+from app.database import crawl_history, database
+from app.database.crawl_history import PageHistory
+from app.models.cpu import CPU
+from app.models.gpu import GPU
+from app.models.part_batch import PartBatch
+from app.scraper.categories import Category
+from app.utils.parsing import extract_gpu_info
+
+
+NOW = datetime(2025, 3, 1, 12)
+
+
+def _batch(price: str) -> PartBatch:
+    return PartBatch.from_parts(GPU, [GPU("ASUS GeForce RTX 4070", "newegg", "https://a/1", price, "2025-03-01", "ASUS")])
+
+
+def _page(url: str, category: str="gpu", changes: int=0, observed_days: float=0, age: float=1) -> PageHistory:
+    return PageHistory(url, category, 36, 1 + changes, changes, observed_days, NOW - timedelta(days=age), NOW)
+
+
+def test_record_fetch(connection) -> None:
+    """Test that fetches are counted as changes only when the listings of the page changed."""
+    assert not crawl_history.record_fetch(connection, "gpu", "https://p/1", _batch("599.99"), NOW)
+    assert not crawl_history.record_fetch(connection, "gpu", "https://p/1", _batch("599.99"), NOW + timedelta(days=1))
+    assert crawl_history.record_fetch(connection, "gpu", "https://p/1", _batch("549.99"), NOW + timedelta(days=3))
+
+    page = crawl_history.get_page_history(connection)["https://p/1"]
+    assert (page.fetches, page.changes, page.observed_days, page.listings) == (3, 1, 3.0, 1)
+    assert page.last_fetched == page.last_changed == NOW + timedelta(days=3)
+
+
+def test_forget_pages(connection) -> None:
+    """Test that pages left behind by the latest fetches of their category are forgotten."""
+    crawl_history.record_fetch(connection, "gpu", "https://p/1", _batch("599.99"), NOW)
+    crawl_history.record_fetch(connection, "gpu", "https://p/2", _batch("599.99"), NOW - timedelta(days=20))
+    crawl_history.record_fetch(connection, "cpu", "https://p/3", _batch("599.99"), NOW - timedelta(days=20))
+
+    assert crawl_history.forget_pages(connection, 14) == 1
+    assert set(crawl_history.get_page_history(connection)) == {"https://p/1", "https://p/3"}
+
+
+def test_price_change_rate(connection) -> None:
+    """Test the changes per part per day measured from the price history."""
+    assert crawl_history.get_price_change_rate(connection, "cpu") is None
+
+    database.insert_parts(connection, [
+        CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "229.99", "2025-01-01", "AMD"),
+        CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "219.99", "2025-01-05", "AMD"),
+        CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "219.99", "2025-01-11", "AMD"),
+        CPU("Intel Core i5-13400F", "newegg", "https://a/2", "199.99", "2025-01-01", "Intel"),
+        CPU("Intel Core i5-13400F", "newegg", "https://a/2", "199.99", "2025-01-11", "Intel"),
+    ])
+
+    # one change over two parts watched for 10 days each
+    assert crawl_history.get_price_change_rate(connection, "cpu") == pytest.approx(1 / 20)
+
+
+def test_estimate_rates() -> None:
+    """Test that page rates are learned from their history and shrunk towards their category."""
+    history = {
+        "busy": _page("busy", changes=20, observed_days=20),
+        "quiet": _page("quiet", changes=0, observed_days=20),
+        "new": _page("new"),
+        "board": _page("board", category="mobo", changes=0, observed_days=60),
+    }
+
+    rates = scheduler.estimate_rates(history, priors={"mobo": 0.1})
+
+    assert rates["busy"] > rates["new"] > rates["quiet"] > 0
+    # a page without history changes like its category
+    gpu_rate = (20 + scheduler.PRIOR_DAYS * scheduler.DEFAULT_RATE) / (40 + scheduler.PRIOR_DAYS)
+    assert rates["new"] == pytest.approx(gpu_rate)
+    assert rates["board"] < 0.01
+
+
+def test_plan_crawl() -> None:
+    """Test that the budget goes to the pages most likely changed, after the first and overdue pages."""
+    history = {url: _page(url, age=age) for url, age in
+               [("first", 0.5), ("stale", 10), ("old", 3), ("recent", 0.5), ("older", 4)]}
+    rates = dict.fromkeys(history, 0.2)
+
+    plan = scheduler.plan_crawl(history, rates, budget=3, max_staleness=7, now=NOW, always={"first"})
+
+    assert plan.selected == ["stale", "first", "older"]
+    assert sorted(plan.skipped) == ["old", "recent"]
+    assert plan.overdue == 2
+    assert 0 < plan.expected_changes < plan.total_expected_changes
+
+    assert scheduler.plan_crawl(history, rates, budget=0, max_staleness=7, now=NOW).selected == ["stale"]
+    assert not scheduler.plan_crawl(history, rates, budget=None, now=NOW).skipped
+
+
+def test_pipeline_skips_unscheduled_pages(listing_server, connection) -> None:
+    """Test that skipped pages are not fetched, except for the page count, and fetched pages are recorded."""
+    listing_server.pages = 4
+    category = Category("gpu", "GPUs", GPU, "newegg", [listing_server.url], extract_gpu_info)
+    urls = [listing_server.url.format(page=page) for page in range(1, 5)]
+
+    pipeline.run_pipeline(connection, [category])
+    listing_server.requested = []
+    plan = scheduler.plan_update(connection, 2, [category])
+
+    # the first page is always due, and the other pages are equally likely to have changed
+    assert plan.selected[0] == urls[0] and len(plan.selected) == 2
+    pipeline.run_pipeline(connection, [category], skip=plan.skipped)
+    assert sorted(listing_server.requested) == sorted(int(url.split("page=")[1]) for url in plan.selected)
+    history = crawl_history.get_page_history(connection)
+    assert sorted(page.fetches for page in history.values()) == [1, 1, 2, 2]
+
+
+if __name__ == "__main__":
+    pytest.main(["test_scheduler.py"])
@@ -0,0 +1,153 @@
+"""Testing module for the read API in server.py"""
+
+import asyncio
+import http.client
+import json
+import socket
+import threading
+import pytest
+from app.cli import server
+from app.database import connection, database, migrations
+from app.models.cpu import CPU
+from app.utils.metrics import set_metrics
+
+
+def _build(path: str) -> str:
+    """Create a database of three cpus at <path>, and return <path>."""
+    with connection.writer(path) as writer:
+        migrations.migrate(writer)
+        database.insert_parts(writer, [
+            CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "229.99", "2025-01-01", "AMD"),
+            CPU("AMD Ryzen 7 7700X", "newegg", "https://a/2", "329.99", "2025-01-01", "AMD"),
+            CPU("Intel Core i5-13400F", "newegg", "https://a/3", "199.99", "2025-01-01", "Intel"),
+        ])
+    return path
+
+
+@pytest.fixture
+def api(tmp_path):
+    """Serve a database of three cpus on a free local port, and yield a function requesting
+    a path from it and returning the status, headers, and decoded JSON body of the response.
+    """
+    path = _build(str(tmp_path / "parts.db"))
+    set_metrics(None)
+
+    api_server = server.ApiServer(path, readers=2, cache_size=16)
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(api_server.start("127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    client = http.client.HTTPConnection("127.0.0.1", listener.sockets[0].getsockname()[1], timeout=5)
+
+    def get(target: str, method: str="GET") -> tuple[int, dict, object]:
+        client.request(method, target)
+        response = client.getresponse()
+        body = response.read()
+        content = json.loads(body) if response.getheader("Content-Type") == "application/json" else body.decode()
+        return response.status, dict(response.getheaders()), content
+
+    get.db_path = path
+    get.port = listener.sockets[0].getsockname()[1]
+    yield get
+
+    async def shutdown() -> None:
+        listener.close()
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    client.close()
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    api_server.close()
+
+
+def test_parts_pages(api) -> None:
+    """Test that pages of price entries link to the next page, over one keep-alive connection."""
+    status, _, first = api("/cpu/parts?limit=2")
+    assert status == 200
+    assert [part["name"] for part in first["items"]] == ["AMD Ryzen 5 7600", "AMD Ryzen 7 7700X"]
+    assert first["items"][0] == {"name": "AMD Ryzen 5 7600", "website": "newegg", "link": "https://a/1",
+                                 "price": "229.99", "date": "2025-01-01", "brand": "AMD"}
+
+    _, _, second = api(f"/cpu/parts?limit=2&after={first['next']}")
+    assert [part["name"] for part in second["items"]] == ["Intel Core i5-13400F"]
+    assert second["next"] is None
+
+
+def test_search_then_latest(api) -> None:
+    """Test looking up the latest prices of the parts found by a search."""
+    _, _, found = api("/cpu/search?q=ryzen")
+    ids = [part["id"] for part in found["items"]]
+    assert len(ids) == 2
+
+    _, _, latest = api(f"/cpu/latest?id={ids[1]}&id={ids[0]}")
+    assert [(part["id"], part["latest_price"]) for part in latest["items"]] == [(1, "229.99"), (2, "329.99")]
+
+    _, _, summaries = api("/cpu/summaries?limit=2&offset=1")
+    assert [summary["name"] for summary in summaries["items"]] == ["AMD Ryzen 7 7700X", "Intel Core i5-13400F"]
+    assert summaries["next"] is None
+
+
+@pytest.mark.parametrize("target, method, status", [
+    ("/cpu/parts?limit=0", "GET", 400),
+    ("/cpu/parts?limit=1000", "GET", 400),
+    ("/cpu/search", "GET", 400),
+    ("/cpu/latest?id=x", "GET", 400),
+    ("/ram/parts", "GET", 404),
+    ("/cpu/parts", "POST", 405),
+])
+def test_invalid_requests(api, target, method, status) -> None:
+    """Test that invalid requests are answered with an error status and message."""
+    code, _, body = api(target, method)
+    assert code == status
+    assert body["error"]
+
+
+def test_negative_content_length(api) -> None:
+    """Test that a request with a negative body length is answered with 400."""
+    with socket.create_connection(("127.0.0.1", api.port), timeout=5) as client:
+        client.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nContent-Length: -5\r\n\r\n")
+        assert client.recv(4096).startswith(b"HTTP/1.1 400")
+
+
+def test_cache_until_database_changes(api) -> None:
+    """Test that responses are cached until another connection commits a change."""
+    assert api("/cpu/summaries")[1]["X-Cache"] == "MISS"
+    assert api("/cpu/summaries")[1]["X-Cache"] == "HIT"
+
+    with connection.writer(api.db_path) as writer:
+        database.insert_parts(writer, [CPU("AMD Ryzen 5 7600", "newegg", "https://a/1", "209.99", "2025-01-02", "AMD")])
+
+    _, headers, summaries = api("/cpu/summaries")
+    assert headers["X-Cache"] == "MISS"
+    assert summaries["items"][0]["latest_price"] == "209.99"
+
+    _, _, metrics = api("/metrics")
+    assert 'pcparts_server_requests_total{cache="hit",endpoint="summaries",status="200"} 1' in metrics
+
+
+def test_concurrent_requests_share_one_query(tmp_path) -> None:
+    """Test that concurrent requests for the same uncached response run its query once."""
+    api_server = server.ApiServer(_build(str(tmp_path / "parts.db")), readers=2)
+
+    async def requests() -> list[bytes]:
+        listener = await api_server.start("127.0.0.1", 0)
+        listener.close()
+        return await asyncio.gather(*(api_server.respond("GET", "/cpu/summaries") for _ in range(50)))
+
+    try:
+        responses = asyncio.run(requests())
+    finally:
+        api_server.close()
+
+    assert len(set(response.split(b"\r\n\r\n")[1] for response in responses)) == 1
+    assert sum(b"X-Cache: MISS" in response for response in responses) == 1
+    assert sum(b"X-Cache: SHARED" in response for response in responses) == 49
+
+
+if __name__ == "__main__":
+    pytest.main(["test_server.py"])
@@ -0,0 +1,33 @@
+"""Testing module for the imports of the CLI commands in main.py"""
+
+import json
+import subprocess
+import sys
+import pytest
+
+
+HEAVY = ["requests", "bs4", "lxml", "selectolax", "numpy"]
+
+
+def _imported(modules: str) -> set[str]:
+    """Return the heavy dependencies loaded by importing <modules> in a fresh interpreter."""
+    code = f"import sys, json, {modules}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout))
+
+
+@pytest.mark.parametrize("modules, allowed", [
+    ("app.main", set()),
+    ("app.main, app.cli.interactive", set()),
+    ("app.main, app.cli.updater", set()), # --compact
+    ("app.main, app.cli.trends", {"numpy"}),
+    ("app.main, app.cli.export", set()),
+    ("app.main, app.cli.server", set()),
+])
+def test_commands_only_import_what_they_use(modules, allowed) -> None:
+    """Test that the entry point and the commands not scraping never load the scraping stack."""
+    assert _imported(modules) <= allowed
+
+
+if __name__ == "__main__":
+    pytest.main(["test_startup.py"])